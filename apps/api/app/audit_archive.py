@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import gzip
+import heapq
+import json
+import os
+from collections.abc import Callable, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import AuditArchive, AuditArchiveCase, AuditEvent, User
+
+_DELETE_CHUNK_SIZE = 500
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes for values that were written as UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def hot_cutoff(now: datetime, hot_months: int) -> datetime:
+    """Start of the oldest month that stays in the live ``audit_events`` table."""
+    year, month = now.year, now.month - hot_months
+    while month <= 0:
+        month += 12
+        year -= 1
+    return datetime(year, month, 1, tzinfo=timezone.utc)
+
+
+def _period(value: datetime) -> str:
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def _event_key(fields: dict[str, Any]) -> tuple[datetime, int]:
+    return fields["created_at"], fields["id"]
+
+
+class _SegmentWriter:
+    def __init__(self, root: Path, org_id: int, period: str) -> None:
+        self.org_id = org_id
+        self.period = period
+        directory = root / f"org-{org_id}"
+        directory.mkdir(parents=True, exist_ok=True)
+        self.path = directory / f"{period}-{uuid4().hex[:12]}.ndjson.gz"
+        self._temp_path = self.path.with_suffix(".gz.tmp")
+        self._raw = self._temp_path.open("wb")
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb", mtime=0)
+        self.event_ids: list[int] = []
+        self.case_ids: set[int] = set()
+        self.first_event_at: datetime | None = None
+        self.last_event_at: datetime | None = None
+
+    def write(self, event: AuditEvent, actor_email: str | None) -> None:
+        created_at = as_utc(event.created_at)
+        case_id = event.case_id
+        if case_id is None:
+            case_id = AuditEvent.case_id_for(
+                event.entity_type, event.entity_id, event.metadata_json
+            )
+        line = json.dumps(
+            {
+                "id": event.id,
+                "org_id": event.org_id,
+                "user_id": event.user_id,
+                "actor_email": actor_email,
+                "action": event.action,
+                "entity_type": event.entity_type,
+                "entity_id": event.entity_id,
+                "metadata": event.metadata_json,
+                "case_id": case_id,
+                "created_at": created_at.isoformat(),
+            },
+            sort_keys=True,
+            ensure_ascii=True,
+        )
+        self._gzip.write(line.encode("utf-8") + b"\n")
+        self.event_ids.append(event.id)
+        if case_id is not None:
+            self.case_ids.add(case_id)
+        self.first_event_at = self.first_event_at or created_at
+        self.last_event_at = created_at
+
+    def close(self) -> None:
+        self._gzip.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self._temp_path, self.path)
+
+
+def archive_cold_audit_events(
+    db: Session,
+    *,
+    now: datetime | None = None,
+    hot_months: int | None = None,
+    archive_dir: str | None = None,
+) -> list[AuditArchive]:
+    """Move audit events older than the hot window into compressed monthly segments.
+
+    Each (org, month) run of cold events is written to a gzip NDJSON file, indexed in
+    ``audit_archives`` (with its case ids in ``audit_archive_cases``) and deleted
+    from ``audit_events`` in the same transaction.
+    """
+    settings = get_settings()
+    cutoff = hot_cutoff(now or datetime.now(timezone.utc), hot_months or settings.audit_hot_months)
+    root = Path(archive_dir or settings.audit_archive_dir)
+
+    newest_id = db.query(func.max(AuditEvent.id)).scalar()
+    if newest_id is None:
+        return []
+
+    rows = (
+        db.query(AuditEvent, User.email)
+        .outerjoin(User, User.id == AuditEvent.user_id)
+        # Never empty the table: SQLite would reuse archived ids for new rows.
+        .filter(AuditEvent.created_at < cutoff, AuditEvent.id < newest_id)
+        .order_by(AuditEvent.org_id.asc(), AuditEvent.created_at.asc(), AuditEvent.id.asc())
+        .yield_per(1000)
+    )
+
+    segments: list[_SegmentWriter] = []
+    current: _SegmentWriter | None = None
+    try:
+        for event, actor_email in rows:
+            period = _period(as_utc(event.created_at))
+            if current is None or current.org_id != event.org_id or current.period != period:
+                if current is not None:
+                    current.close()
+                current = _SegmentWriter(root, event.org_id, period)
+                segments.append(current)
+            current.write(event, actor_email)
+        if current is not None:
+            current.close()
+    except Exception:
+        for segment in segments:
+            segment.path.unlink(missing_ok=True)
+            segment._temp_path.unlink(missing_ok=True)
+        raise
+
+    archives: list[AuditArchive] = []
+    for segment in segments:
+        archive = AuditArchive(
+            org_id=segment.org_id,
+            period=segment.period,
+            storage_path=str(segment.path),
+            event_count=len(segment.event_ids),
+            first_event_at=segment.first_event_at,
+            last_event_at=segment.last_event_at,
+        )
+        try:
+            db.add(archive)
+            db.flush()
+            db.add_all(
+                AuditArchiveCase(archive_id=archive.id, case_id=case_id)
+                for case_id in segment.case_ids
+            )
+            for start in range(0, len(segment.event_ids), _DELETE_CHUNK_SIZE):
+                chunk = segment.event_ids[start : start + _DELETE_CHUNK_SIZE]
+                db.query(AuditEvent).filter(AuditEvent.id.in_(chunk)).delete(
+                    synchronize_session=False
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            segment.path.unlink(missing_ok=True)
+            raise
+        archives.append(archive)
+
+    return archives
+
+
+def read_archive_segment(archive: AuditArchive) -> Iterator[dict[str, Any]]:
+    with gzip.open(archive.storage_path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            fields = json.loads(line)
+            fields["created_at"] = datetime.fromisoformat(fields["created_at"])
+            yield fields
+
+
+def _archives_in_range(
+    db: Session,
+    org_id: int,
+    created_after: datetime | None,
+    created_before: datetime | None,
+    case_id: int | None = None,
+) -> list[AuditArchive]:
+    query = db.query(AuditArchive).filter(AuditArchive.org_id == org_id)
+    if created_after is not None:
+        query = query.filter(AuditArchive.last_event_at >= created_after)
+    if created_before is not None:
+        query = query.filter(AuditArchive.first_event_at <= created_before)
+    if case_id is not None:
+        with_case = db.query(AuditArchiveCase.archive_id).filter(
+            AuditArchiveCase.case_id == case_id
+        )
+        query = query.filter(
+            or_(AuditArchive.id.in_(with_case), AuditArchive.cases_indexed.is_(False))
+        )
+    return query.order_by(AuditArchive.last_event_at.desc(), AuditArchive.id.desc()).all()
+
+
+def search_archived_events(
+    db: Session,
+    org_id: int,
+    *,
+    limit: int,
+    predicate: Callable[[dict[str, Any]], bool] | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    before: tuple[datetime, int] | None = None,
+) -> list[dict[str, Any]]:
+    """Newest-first page of archived events matching the filters.
+
+    The ``audit_archives`` index is used to skip segments outside the time range and
+    to stop once the remaining segments are all older than the page being built.
+    """
+    upper = before[0] if before is not None else created_before
+    results: list[dict[str, Any]] = []
+    for archive in _archives_in_range(db, org_id, created_after, upper):
+        if len(results) >= limit and as_utc(archive.last_event_at) < results[-1]["created_at"]:
+            break
+
+        matches = (
+            fields
+            for fields in read_archive_segment(archive)
+            if (created_after is None or fields["created_at"] >= created_after)
+            and (created_before is None or fields["created_at"] < created_before)
+            and (before is None or _event_key(fields) < before)
+            and (predicate is None or predicate(fields))
+        )
+        results = heapq.nlargest(
+            limit, [*results, *heapq.nlargest(limit, matches, key=_event_key)], key=_event_key
+        )
+
+    return results
+
+
+def iter_archived_events(
+    db: Session,
+    org_id: int,
+    *,
+    created_after: datetime | None = None,
+    case_id: int | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Oldest-first archived events; with ``case_id``, only segments holding that case are read."""
+    for archive in reversed(_archives_in_range(db, org_id, created_after, None, case_id)):
+        for fields in read_archive_segment(archive):
+            if created_after is not None and fields["created_at"] < created_after:
+                continue
+            if case_id is None or archived_case_id(fields) == case_id:
+                yield fields
+
+
+def backfill_audit_archive_cases(engine) -> int:
+    """Record the case ids of segments archived before ``audit_archive_cases`` existed."""
+    indexed = 0
+    with Session(engine) as db:
+        pending = db.query(AuditArchive).filter(AuditArchive.cases_indexed.is_(False)).all()
+        for archive in pending:
+            try:
+                case_ids = {archived_case_id(fields) for fields in read_archive_segment(archive)}
+            except FileNotFoundError:
+                # Left unindexed: case reads keep opening it and surface the missing file.
+                continue
+            case_ids.discard(None)
+            db.add_all(
+                AuditArchiveCase(archive_id=archive.id, case_id=case_id) for case_id in case_ids
+            )
+            archive.cases_indexed = True
+            db.commit()
+            indexed += 1
+    return indexed
+
+
+def archived_case_id(fields: dict[str, Any]) -> int | None:
+    if fields.get("case_id") is not None:
+        return fields["case_id"]
+    # Segments archived before events carried case_id, or written with a null one.
+    return AuditEvent.case_id_for(fields["entity_type"], fields["entity_id"], fields["metadata"])
+
+
+def archived_event_model(fields: dict[str, Any]) -> AuditEvent:
+    """Detached ``AuditEvent`` view of an archived record, for code that expects ORM rows."""
+    return AuditEvent(
+        id=fields["id"],
+        org_id=fields["org_id"],
+        user_id=fields["user_id"],
+        action=fields["action"],
+        entity_type=fields["entity_type"],
+        entity_id=fields["entity_id"],
+        metadata_json=fields["metadata"],
+        case_id=archived_case_id(fields),
+        created_at=fields["created_at"],
+    )
@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any
+from uuid import uuid4
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db import get_session_local
+from app.models import AuditEvent, utc_now
+
+_PENDING_KEY = "pending_audit_events"
+_WAL_TOKEN_KEY = "audit_wal_token"
+
+
+class AuditSink:
+    """Destination for audit events recorded during a request."""
+
+    def record(self, db: Session, fields: dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> int:
+        return 0
+
+    def drain(self) -> int:
+        """Flush every buffered event; readers call this before querying ``audit_events``."""
+        return 0
+
+    def start(self) -> None:
+        return None
+
+    def stop(self) -> None:
+        return None
+
+    def runtime_status(self) -> dict[str, Any]:
+        raise NotImplementedError
+
+
+class InlineAuditSink(AuditSink):
+    """Writes audit events in the caller's transaction (the original behavior)."""
+
+    def record(self, db: Session, fields: dict[str, Any]) -> None:
+        db.add(AuditEvent(**fields))
+
+    def runtime_status(self) -> dict[str, Any]:
+        return {"mode": "inline", "buffered": 0, "flushed": 0, "batches": 0}
+
+
+class BufferedAuditSink(AuditSink):
+    """Batches committed audit events into bulk inserts on a background thread.
+
+    A transaction's events are appended to a local write-ahead file just before it
+    commits, and reach the flush buffer once the commit succeeds; a failed commit
+    drops them from the file again. The file is trimmed once the batch containing an
+    event has been inserted, so a crash at any point after the commit is recovered by
+    replaying the file on the next start. A crash during the commit itself may replay
+    events of a change that never committed, which is preferred to losing those of
+    one that did.
+
+    Each sink (one per API worker process) appends to its own file next to the
+    configured path and holds a lock on it while alive, so workers never rewrite each
+    other's events. On start, files whose owner has exited are replayed by whichever
+    worker gets to them first.
+    """
+
+    def __init__(self, wal_path: str, flush_interval_seconds: float, batch_size: int) -> None:
+        configured = Path(wal_path)
+        self.wal_dir = configured.parent
+        self._wal_stem = configured.stem
+        self._wal_suffix = configured.suffix
+        self.wal_path = self.wal_dir / (
+            f"{configured.stem}.{os.getpid()}-{uuid4().hex[:8]}{configured.suffix}"
+        )
+        self._owner_lock: IO[str] | None = None
+        self.flush_interval_seconds = max(flush_interval_seconds, 0.01)
+        self.batch_size = max(batch_size, 1)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer: list[dict[str, Any]] = []
+        # Events already in the WAL whose transaction is still committing, by token.
+        self._in_flight: dict[int, list[dict[str, Any]]] = {}
+        self._tokens = itertools.count()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._flushed = 0
+        self._batches = 0
+        self._replayed = 0
+        self._last_error: str | None = None
+
+    def record(self, db: Session, fields: dict[str, Any]) -> None:
+        db.info.setdefault(_PENDING_KEY, []).append(fields)
+
+    def write_ahead(self, events: list[dict[str, Any]]) -> int:
+        """Durably append a committing transaction's events; returns a token for them."""
+        lines = "".join(_serialize_event(item) + "\n" for item in events)
+        with self._lock:
+            self._claim_wal_locked()
+            with self.wal_path.open("a", encoding="utf-8") as handle:
+                handle.write(lines)
+                handle.flush()
+                os.fsync(handle.fileno())
+            token = next(self._tokens)
+            self._in_flight[token] = events
+        return token
+
+    def committed(self, token: int) -> None:
+        with self._lock:
+            events = self._in_flight.pop(token, None)
+            if not events:
+                return
+            self._buffer.extend(events)
+            should_wake = len(self._buffer) >= self.batch_size
+
+        if should_wake:
+            self._wake.set()
+
+    def rolled_back(self, token: int) -> None:
+        with self._lock:
+            if self._in_flight.pop(token, None) is not None:
+                self._rewrite_wal_locked()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch = self._buffer[: self.batch_size]
+            if not batch:
+                return 0
+
+            db = get_session_local()()
+            try:
+                db.execute(insert(AuditEvent), batch)
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                self._last_error = str(exc)
+                raise
+            finally:
+                db.close()
+
+            with self._lock:
+                del self._buffer[: len(batch)]
+                self._rewrite_wal_locked()
+            self._flushed += len(batch)
+            self._batches += 1
+            return len(batch)
+
+    def drain(self) -> int:
+        drained = 0
+        while flushed := self.flush():
+            drained += flushed
+        return drained
+
+    def start(self) -> None:
+        self._replay_orphaned_wals()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-sink-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.drain()
+        with self._lock:
+            self._release_wal_locked()
+
+    def runtime_status(self) -> dict[str, Any]:
+        with self._lock:
+            buffered = len(self._buffer)
+        return {
+            "mode": "buffered",
+            "buffered": buffered,
+            "flushed": self._flushed,
+            "batches": self._batches,
+            "replayed": self._replayed,
+            "last_error": self._last_error,
+        }
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval_seconds)
+            self._wake.clear()
+            try:
+                self.drain()
+            except Exception:
+                # Events stay buffered and in the WAL; the next tick retries.
+                continue
+
+    def _rewrite_wal_locked(self) -> None:
+        pending = [item for events in self._in_flight.values() for item in events] + self._buffer
+        if not pending:
+            self.wal_path.unlink(missing_ok=True)
+            return
+
+        temp_path = self.wal_path.with_suffix(self.wal_path.suffix + ".tmp")
+        with temp_path.open("w", encoding="utf-8") as handle:
+            handle.write("".join(_serialize_event(item) + "\n" for item in pending))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, self.wal_path)
+
+    def _claim_wal_locked(self) -> None:
+        if self._owner_lock is None:
+            self.wal_dir.mkdir(parents=True, exist_ok=True)
+            self._owner_lock = _lock_file(_owner_lock_path(self.wal_path), blocking=True)
+
+    def _release_wal_locked(self) -> None:
+        if self._owner_lock is None:
+            return
+        if not self.wal_path.exists():
+            _owner_lock_path(self.wal_path).unlink(missing_ok=True)
+        # Unflushed events stay in the file for the next start to replay.
+        self._owner_lock.close()
+        self._owner_lock = None
+
+    def _replay_orphaned_wals(self) -> None:
+        self.wal_dir.mkdir(parents=True, exist_ok=True)
+        # Workers start together: one at a time decides which files are orphaned.
+        scan_lock = _lock_file(
+            self.wal_dir / f"{self._wal_stem}{self._wal_suffix}.replay.lock", blocking=True
+        )
+        try:
+            with self._lock:
+                self._claim_wal_locked()
+            # Also matches the unsuffixed file written before WALs were per process.
+            for path in sorted(self.wal_dir.glob(f"{self._wal_stem}*{self._wal_suffix}")):
+                if path == self.wal_path:
+                    continue
+                owner_lock = _lock_file(_owner_lock_path(path), blocking=False)
+                if owner_lock is None:
+                    # Its worker is alive and still flushing it.
+                    continue
+                try:
+                    self._adopt_wal(path)
+                finally:
+                    _owner_lock_path(path).unlink(missing_ok=True)
+                    owner_lock.close()
+        finally:
+            scan_lock.close()
+        self.drain()
+
+    def _adopt_wal(self, path: Path) -> None:
+        recovered: list[dict[str, Any]] = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                recovered.append(_deserialize_event(line))
+            except (ValueError, KeyError):
+                # A torn final line from a crash mid-append is not a committed event.
+                continue
+
+        db = get_session_local()()
+        try:
+            # The WAL may still hold events whose batch was inserted just before a crash.
+            missing = [item for item in recovered if not _event_exists(db, item)]
+        finally:
+            db.close()
+
+        with self._lock:
+            self._buffer = missing + self._buffer
+            # Durable in this sink's file before the orphan is removed.
+            self._rewrite_wal_locked()
+        path.unlink()
+        path.with_suffix(path.suffix + ".tmp").unlink(missing_ok=True)
+        self._replayed += len(missing)
+
+
+def _owner_lock_path(wal_path: Path) -> Path:
+    return wal_path.with_suffix(wal_path.suffix + ".lock")
+
+
+def _lock_file(path: Path, *, blocking: bool) -> IO[str] | None:
+    """Hold an exclusive ``flock`` on ``path`` until the returned handle is closed."""
+    import fcntl  # POSIX only, and needed by the buffered sink alone.
+
+    handle = path.open("a", encoding="utf-8")
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        handle.close()
+        return None
+    return handle
+
+
+def _serialize_event(fields: dict[str, Any]) -> str:
+    payload = dict(fields)
+    payload["created_at"] = fields["created_at"].isoformat()
+    return json.dumps(payload, sort_keys=True, ensure_ascii=True)
+
+
+def _deserialize_event(line: str) -> dict[str, Any]:
+    payload = json.loads(line)
+    payload["created_at"] = datetime.fromisoformat(payload["created_at"])
+    if "case_id" not in payload:
+        # WAL lines written before events carried case_id.
+        payload["case_id"] = AuditEvent.case_id_for(
+            payload["entity_type"], payload["entity_id"], payload["metadata_json"]
+        )
+    return payload
+
+
+def _event_exists(db: Session, fields: dict[str, Any]) -> bool:
+    return (
+        db.query(AuditEvent.id)
+        .filter(
+            AuditEvent.org_id == fields["org_id"],
+            AuditEvent.user_id == fields["user_id"],
+            AuditEvent.action == fields["action"],
+            AuditEvent.entity_type == fields["entity_type"],
+            AuditEvent.entity_id == fields["entity_id"],
+            AuditEvent.created_at == fields["created_at"],
+        )
+        .first()
+        is not None
+    )
+
+
+_sink: AuditSink | None = None
+
+
+def get_audit_sink() -> AuditSink:
+    global _sink
+    if _sink is None:
+        settings = get_settings()
+        if settings.audit_sink_mode == "buffered":
+            _sink = BufferedAuditSink(
+                wal_path=settings.audit_wal_path,
+                flush_interval_seconds=settings.audit_flush_interval_seconds,
+                batch_size=settings.audit_batch_size,
+            )
+        else:
+            _sink = InlineAuditSink()
+    return _sink
+
+
+def reset_audit_sink() -> None:
+    global _sink
+    if _sink is not None:
+        _sink.stop()
+    _sink = None
+
+
+def record_audit_event(
+    db: Session,
+    *,
+    org_id: int,
+    user_id: int | None,
+    action: str,
+    entity_type: str,
+    entity_id: str | None,
+    metadata_json: dict[str, Any] | None = None,
+) -> None:
+    get_audit_sink().record(
+        db,
+        {
+            "org_id": org_id,
+            "user_id": user_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "metadata_json": metadata_json,
+            "case_id": AuditEvent.case_id_for(entity_type, entity_id, metadata_json),
+            "created_at": utc_now(),
+        },
+    )
+
+
+@event.listens_for(Session, "before_commit")
+def _write_ahead_committing_events(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        sink = get_audit_sink()
+        if isinstance(sink, BufferedAuditSink):
+            session.info[_WAL_TOKEN_KEY] = (sink, sink.write_ahead(pending))
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_off_committed_events(session: Session) -> None:
+    written = session.info.pop(_WAL_TOKEN_KEY, None)
+    if written is not None:
+        sink, token = written
+        sink.committed(token)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted_events(session: Session, transaction: Any) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
+        # Written ahead, but the commit failed: the events must not be replayed.
+        written = session.info.pop(_WAL_TOKEN_KEY, None)
+        if written is not None:
+            sink, token = written
+            sink.rolled_back(token)
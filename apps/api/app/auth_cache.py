@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+
+from app.config import Settings, get_settings
+from app.models import User
+
+
+@dataclass(frozen=True)
+class AuthenticatedUserSnapshot:
+    id: int
+    org_id: int
+    email: str
+    full_name: str
+    role: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUserSnapshot":
+        return cls(
+            id=user.id,
+            org_id=user.org_id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+        )
+
+    def to_user(self) -> User:
+        # Transient (session-less) instance so handlers keep their ``User`` contract
+        # without sharing one ORM object across requests.
+        return User(
+            id=self.id,
+            org_id=self.org_id,
+            email=self.email,
+            full_name=self.full_name,
+            role=self.role,
+        )
+
+
+class AuthenticatedUserCache:
+    """Size-bounded LRU of bearer token -> user snapshot with a short TTL.
+
+    Entries never outlive the token's own ``exp`` and are dropped whenever the
+    user row is updated or deleted, or the settings snapshot is reloaded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, AuthenticatedUserSnapshot]] = OrderedDict()
+        self._settings: Settings | None = None
+        self._hits = 0
+        self._misses = 0
+
+    def _current_settings(self) -> Settings:
+        settings = get_settings()
+        if settings is not self._settings:
+            # New secret, TTL or size limits: start from an empty cache.
+            self._entries.clear()
+            self._settings = settings
+        return settings
+
+    def get(self, token: str) -> AuthenticatedUserSnapshot | None:
+        with self._lock:
+            settings = self._current_settings()
+            if not settings.auth_user_cache_enabled:
+                return None
+
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[token]
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, token: str, payload: dict[str, Any], snapshot: AuthenticatedUserSnapshot) -> None:
+        with self._lock:
+            settings = self._current_settings()
+            if not settings.auth_user_cache_enabled or settings.auth_user_cache_max_entries <= 0:
+                return
+
+            ttl = settings.auth_user_cache_ttl_seconds
+            token_exp = payload.get("exp")
+            if isinstance(token_exp, (int, float)):
+                ttl = min(ttl, token_exp - time.time())
+            if ttl <= 0:
+                return
+
+            self._entries[token] = (time.monotonic() + ttl, snapshot)
+            self._entries.move_to_end(token)
+            while len(self._entries) > settings.auth_user_cache_max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            stale = [token for token, (_, item) in self._entries.items() if item.id == user_id]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            settings = self._current_settings()
+            lookups = self._hits + self._misses
+            return {
+                "enabled": settings.auth_user_cache_enabled,
+                "entries": len(self._entries),
+                "max_entries": settings.auth_user_cache_max_entries,
+                "ttl_seconds": settings.auth_user_cache_ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+            }
+
+
+_cache = AuthenticatedUserCache()
+
+
+def get_auth_user_cache() -> AuthenticatedUserCache:
+    return _cache
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(_mapper: Any, _connection: Any, target: User) -> None:
+    _cache.invalidate_user(target.id)
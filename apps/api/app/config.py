@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import os
 import secrets
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any
 
 DEFAULT_SQLITE_URL = "sqlite:///./data/packetpilot.db"
 DEFAULT_ALLOWED_ORIGINS = "http://localhost:3000,http://127.0.0.1:3000"
@@ -12,35 +15,103 @@ DEFAULT_ALLOWED_UPLOAD_CONTENT_TYPES = (
     "text/plain,text/markdown,text/csv,application/pdf,image/png,image/jpeg"
 )
 DEFAULT_MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+DEFAULT_EXPORT_STORAGE_DIR = "./data/exports"
+DEFAULT_AUDIT_WAL_PATH = "./data/audit-wal.ndjson"
+DEFAULT_AUDIT_ARCHIVE_DIR = "./data/audit-archive"
+DEFAULT_FHIR_CACHE_TTLS = "Patient=300,Coverage=300"
 
 _PROCESS_EPHEMERAL_SECRET = secrets.token_urlsafe(48)
 
 
+def _parse_ttls(raw: str) -> dict[str, float]:
+    # "Patient=300,Observation=60" -> per-resource-type TTL overrides.
+    ttls: dict[str, float] = {}
+    for item in raw.split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip():
+            ttls[name.strip()] = float(seconds)
+    return ttls
+
+
 class Settings:
+    """Immutable snapshot of the environment, parsed once and shared via ``get_settings``."""
+
     def __init__(self) -> None:
         self.database_url = os.getenv("DATABASE_URL", DEFAULT_SQLITE_URL)
         configured_secret = os.getenv("APP_SECRET", "").strip()
         self.jwt_secret = configured_secret or _PROCESS_EPHEMERAL_SECRET
         self.jwt_algorithm = "HS256"
         self.jwt_exp_minutes = int(os.getenv("JWT_EXP_MINUTES", "1440"))
+        self.bcrypt_rounds = min(max(int(os.getenv("BCRYPT_ROUNDS", "12")), 4), 31)
+        self.password_hash_workers = int(
+            os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+        )
+        self.password_hash_max_queue = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+        self.auth_user_cache_enabled = os.getenv(
+            "AUTH_USER_CACHE_ENABLED", "1"
+        ).lower().strip() in {"1", "true", "yes", "on"}
+        self.auth_user_cache_ttl_seconds = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+        self.auth_user_cache_max_entries = int(os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", "1024"))
         self.fhir_base_url = os.getenv("FHIR_BASE_URL", DEFAULT_FHIR_BASE_URL).rstrip("/")
         self.fhir_timeout_seconds = float(os.getenv("FHIR_TIMEOUT_SECONDS", "10"))
+        self.fhir_max_connections = int(os.getenv("FHIR_MAX_CONNECTIONS", "20"))
+        self.fhir_max_keepalive_connections = int(os.getenv("FHIR_MAX_KEEPALIVE_CONNECTIONS", "10"))
+        self.fhir_keepalive_expiry_seconds = float(os.getenv("FHIR_KEEPALIVE_EXPIRY_SECONDS", "30"))
+        self.fhir_http2 = os.getenv("FHIR_HTTP2", "1").lower().strip() in {
+            "1",
+            "true",
+            "yes",
+            "on",
+        }
+        self.fhir_breaker_failure_threshold = int(os.getenv("FHIR_BREAKER_FAILURE_THRESHOLD", "5"))
+        self.fhir_breaker_reset_seconds = float(os.getenv("FHIR_BREAKER_RESET_SECONDS", "30"))
+        self.fhir_breaker_half_open_max_calls = int(
+            os.getenv("FHIR_BREAKER_HALF_OPEN_MAX_CALLS", "1")
+        )
+        self.fhir_page_size = max(int(os.getenv("FHIR_PAGE_SIZE", "50")), 1)
+        self.fhir_max_resources = int(os.getenv("FHIR_MAX_RESOURCES", "5000"))
+        self.fhir_snapshot_strategy = os.getenv("FHIR_SNAPSHOT_STRATEGY", "auto").lower().strip()
+        self.fhir_local_store_mode = os.getenv("FHIR_LOCAL_STORE_MODE", "prefer").lower().strip()
+        self.fhir_bulk_poll_interval_seconds = float(
+            os.getenv("FHIR_BULK_POLL_INTERVAL_SECONDS", "5")
+        )
+        self.fhir_bulk_timeout_seconds = float(os.getenv("FHIR_BULK_TIMEOUT_SECONDS", "3600"))
+        self.fhir_cache_mode = os.getenv("FHIR_CACHE_MODE", "memory").lower().strip()
+        self.fhir_cache_ttl_seconds = float(os.getenv("FHIR_CACHE_TTL_SECONDS", "30"))
+        self.fhir_cache_ttls = MappingProxyType(
+            _parse_ttls(os.getenv("FHIR_CACHE_TTLS", DEFAULT_FHIR_CACHE_TTLS))
+        )
+        self.fhir_cache_max_entries = int(os.getenv("FHIR_CACHE_MAX_ENTRIES", "512"))
+        self.fhir_cache_max_bytes = int(os.getenv("FHIR_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+        self.patient_verification_mode = (
+            os.getenv("PATIENT_VERIFICATION_MODE", "sync").lower().strip()
+        )
         self.upload_dir = os.getenv("UPLOAD_DIR", DEFAULT_UPLOAD_DIR)
+        self.export_storage_dir = os.getenv("EXPORT_STORAGE_DIR", DEFAULT_EXPORT_STORAGE_DIR)
+        self.export_mode = os.getenv("EXPORT_MODE", "sync").lower().strip()
+        # One render worker per core, leaving one core for the API process itself.
+        self.export_workers = int(
+            os.getenv("EXPORT_WORKERS", str(max(1, (os.cpu_count() or 1) - 1)))
+        )
+        self.export_worker_kind = os.getenv("EXPORT_WORKER_KIND", "process").lower().strip()
+        self.packet_fragment_cache_max_entries = int(
+            os.getenv("PACKET_FRAGMENT_CACHE_MAX_ENTRIES", "10000")
+        )
         self.max_upload_bytes = int(os.getenv("MAX_UPLOAD_BYTES", str(DEFAULT_MAX_UPLOAD_BYTES)))
-        self.allowed_upload_extensions = {
+        self.allowed_upload_extensions = frozenset(
             item.strip().lower()
             for item in os.getenv(
                 "ALLOWED_UPLOAD_EXTENSIONS", DEFAULT_ALLOWED_UPLOAD_EXTENSIONS
             ).split(",")
             if item.strip()
-        }
-        self.allowed_upload_content_types = {
+        )
+        self.allowed_upload_content_types = frozenset(
             item.strip().lower()
             for item in os.getenv(
                 "ALLOWED_UPLOAD_CONTENT_TYPES", DEFAULT_ALLOWED_UPLOAD_CONTENT_TYPES
             ).split(",")
             if item.strip()
-        }
+        )
         self.model_mode = os.getenv("MODEL_MODE", "mock").lower().strip()
         self.model_id = os.getenv("MODEL_ID", "google/medgemma-1.5-4b-it")
         self.model_device = os.getenv("MODEL_DEVICE", "cpu")
@@ -50,12 +121,32 @@ class Settings:
             "yes",
             "on",
         }
-        self.allowed_origins = [
+        self.audit_sink_mode = os.getenv("AUDIT_SINK_MODE", "inline").lower().strip()
+        self.audit_wal_path = os.getenv("AUDIT_WAL_PATH", DEFAULT_AUDIT_WAL_PATH)
+        self.audit_flush_interval_seconds = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "0.5"))
+        self.audit_batch_size = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+        self.audit_archive_dir = os.getenv("AUDIT_ARCHIVE_DIR", DEFAULT_AUDIT_ARCHIVE_DIR)
+        self.audit_hot_months = max(int(os.getenv("AUDIT_HOT_MONTHS", "3")), 1)
+        self.allowed_origins = tuple(
             origin.strip()
             for origin in os.getenv("ALLOWED_ORIGINS", DEFAULT_ALLOWED_ORIGINS).split(",")
             if origin.strip()
-        ]
+        )
+        self._frozen = True
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, "_frozen", False):
+            raise AttributeError("Settings are read-only; call reload_settings() instead")
+        super().__setattr__(name, value)
 
+
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     return Settings()
+
+
+def reload_settings() -> Settings:
+    """Re-read the environment (tests, SIGHUP). Engines and sinks built from the old
+    snapshot keep their configuration until they are reset."""
+    get_settings.cache_clear()
+    return get_settings()
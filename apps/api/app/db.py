@@ -3,11 +3,13 @@ from __future__ import annotations
 import os
 from collections.abc import Generator
 
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, inspect, text, update
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.audit_archive import backfill_audit_archive_cases
 from app.config import get_settings
-from app.models import Base
+from app.export_storage import move_legacy_export_pdfs
+from app.models import AuditEvent, Base
 
 _engine = None
 _SessionLocal = None
@@ -54,6 +56,32 @@ def init_db() -> None:
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
     _apply_sqlite_compat_migrations(engine)
+    _ensure_indexes(engine)
+    _move_legacy_export_pdfs(engine)
+
+
+def _ensure_indexes(engine) -> None:
+    # create_all skips tables that already exist, so add indexes introduced after first deploy.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+# Columns added after the first deploy; create_all does not alter existing tables.
+_SQLITE_ADDED_COLUMNS = (
+    ("case_documents", "document_kind", "VARCHAR(64) NOT NULL DEFAULT 'evidence'"),
+    ("cases", "patient_verification", "VARCHAR(32) NOT NULL DEFAULT 'verified'"),
+    ("cases", "patient_verified_at", "DATETIME"),
+    ("case_exports", "pdf_sha256", "VARCHAR(64)"),
+    ("case_exports", "pdf_size_bytes", "INTEGER"),
+    ("case_exports", "status", "VARCHAR(16) NOT NULL DEFAULT 'completed'"),
+    ("case_exports", "error", "TEXT"),
+    ("case_exports", "completed_at", "DATETIME"),
+    ("case_exports", "packet_sha256", "VARCHAR(64)"),
+    ("case_exports", "pdf_page_count", "INTEGER"),
+    ("audit_events", "case_id", "INTEGER"),
+    ("audit_archives", "cases_indexed", "BOOLEAN NOT NULL DEFAULT 0"),
+)
 
 
 def _apply_sqlite_compat_migrations(engine) -> None:
@@ -62,20 +90,66 @@ def _apply_sqlite_compat_migrations(engine) -> None:
 
     inspector = inspect(engine)
     table_names = set(inspector.get_table_names())
-    if "case_documents" not in table_names:
-        return
-
-    columns = {column["name"] for column in inspector.get_columns("case_documents")}
-    if "document_kind" in columns:
-        return
-
-    with engine.begin() as connection:
-        connection.execute(
-            text(
-                "ALTER TABLE case_documents "
-                "ADD COLUMN document_kind VARCHAR(64) NOT NULL DEFAULT 'evidence'"
+    for table, column, definition in _SQLITE_ADDED_COLUMNS:
+        if table not in table_names:
+            continue
+
+        columns = {item["name"] for item in inspector.get_columns(table)}
+        if column in columns:
+            continue
+
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+        backfill = _SQLITE_COLUMN_BACKFILLS.get((table, column))
+        if backfill is not None:
+            backfill(engine)
+
+
+_BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_audit_case_ids(engine) -> int:
+    """Derive ``audit_events.case_id`` for rows written before the column existed."""
+    updated = 0
+    last_id = 0
+    with Session(engine) as db:
+        while True:
+            rows = (
+                db.query(
+                    AuditEvent.id,
+                    AuditEvent.entity_type,
+                    AuditEvent.entity_id,
+                    AuditEvent.metadata_json,
+                )
+                .filter(AuditEvent.id > last_id)
+                .order_by(AuditEvent.id.asc())
+                .limit(_BACKFILL_BATCH_SIZE)
+                .all()
             )
-        )
+            if not rows:
+                return updated
+
+            last_id = rows[-1].id
+            changes = []
+            for row in rows:
+                case_id = AuditEvent.case_id_for(row.entity_type, row.entity_id, row.metadata_json)
+                if case_id is not None:
+                    changes.append({"id": row.id, "case_id": case_id})
+            if changes:
+                db.execute(update(AuditEvent), changes)
+                db.commit()
+                updated += len(changes)
+
+
+_SQLITE_COLUMN_BACKFILLS = {
+    ("audit_events", "case_id"): backfill_audit_case_ids,
+    ("audit_archives", "cases_indexed"): backfill_audit_archive_cases,
+}
+
+
+def _move_legacy_export_pdfs(engine) -> None:
+    with Session(engine) as db:
+        move_legacy_export_pdfs(db)
 
 
 def reset_db_engine() -> None:
@@ -4,6 +4,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
+from app.auth_cache import AuthenticatedUserSnapshot, get_auth_user_cache
 from app.db import get_db
 from app.models import User
 from app.security import decode_access_token
@@ -18,6 +19,11 @@ def get_current_user(
     if credentials is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing credentials")
 
+    cache = get_auth_user_cache()
+    cached = cache.get(credentials.credentials)
+    if cached is not None:
+        return cached.to_user()
+
     payload = decode_access_token(credentials.credentials)
     if payload is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
@@ -26,4 +32,5 @@ def get_current_user(
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
+    cache.put(credentials.credentials, payload, AuthenticatedUserSnapshot.from_user(user))
     return user
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from app.config import get_settings
+from app.db import get_session_local
+from app.export_service import render_packet_pdf
+from app.export_storage import store_rendered_pdf
+from app.models import CaseExport, utc_now
+
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class _ExportRenderer:
+    """Renders queued exports off the request path.
+
+    Dispatch threads load the stored packet and write the result back; the reportlab render
+    itself runs in worker processes (``EXPORT_WORKER_KIND=process``) so it does not hold the
+    API process's GIL while interactive requests are being served.
+    """
+
+    def __init__(self, workers: int, kind: str) -> None:
+        self.workers = max(workers, 1)
+        self._dispatch = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export")
+        self._render: ProcessPoolExecutor | None = None
+        if kind == "process":
+            self._render = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def submit(self, export_id: int) -> Future:
+        return self._dispatch.submit(self._run, export_id)
+
+    def _render_pdf(self, packet: dict[str, Any], path: str) -> int:
+        # Worker processes write the PDF straight to the scratch path; no bytes cross the pipe.
+        if self._render is None:
+            return render_packet_pdf(packet, path)
+        return self._render.submit(render_packet_pdf, packet, path).result()
+
+    def _run(self, export_id: int) -> None:
+        db = get_session_local()()
+        try:
+            record = db.get(CaseExport, export_id)
+            if record is None or record.status != PENDING:
+                return
+
+            try:
+                packet = record.packet_json
+                record.pdf_sha256, record.pdf_size_bytes, record.pdf_page_count = (
+                    store_rendered_pdf(lambda path: self._render_pdf(packet, path))
+                )
+                record.status = COMPLETED
+            except Exception as exc:
+                logger.exception("Rendering export %s failed", export_id)
+                record.status = FAILED
+                record.error = str(exc)[:500] or exc.__class__.__name__
+            record.completed_at = utc_now()
+            db.commit()
+        finally:
+            db.close()
+
+    def shutdown(self) -> None:
+        self._dispatch.shutdown(wait=False, cancel_futures=True)
+        if self._render is not None:
+            self._render.shutdown(wait=False, cancel_futures=True)
+
+
+_export_renderer: _ExportRenderer | None = None
+
+
+def _get_export_renderer() -> _ExportRenderer:
+    global _export_renderer
+    if _export_renderer is None:
+        settings = get_settings()
+        _export_renderer = _ExportRenderer(
+            workers=settings.export_workers, kind=settings.export_worker_kind
+        )
+    return _export_renderer
+
+
+def submit_export_render(export_id: int) -> Future:
+    return _get_export_renderer().submit(export_id)
+
+
+def resume_pending_exports() -> int:
+    """Re-queue exports left pending by a previous process; rendering is idempotent."""
+    db = get_session_local()()
+    try:
+        export_ids = [
+            export_id
+            for (export_id,) in db.query(CaseExport.id)
+            .filter(CaseExport.status == PENDING)
+            .order_by(CaseExport.id.asc())
+            .all()
+        ]
+    finally:
+        db.close()
+
+    for export_id in export_ids:
+        submit_export_render(export_id)
+    return len(export_ids)
+
+
+def shutdown_export_renderer() -> None:
+    global _export_renderer
+    if _export_renderer is not None:
+        _export_renderer.shutdown()
+    _export_renderer = None
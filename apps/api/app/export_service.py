@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 import io
 import json
-from typing import Any
+from collections.abc import Callable, Hashable, Iterator
+from dataclasses import dataclass
+from functools import cache, partial
+from typing import TYPE_CHECKING, Any, BinaryIO
 
-from reportlab.lib.pagesizes import LETTER
-from reportlab.pdfgen import canvas
+from sqlalchemy import inspect
+from sqlalchemy.orm import object_session
 
+from app.audit_archive import as_utc
 from app.models import (
     AuditEvent,
     Case,
@@ -17,47 +22,34 @@ from app.models import (
     CaseQuestionnaire,
     User,
 )
+from app.packet_cache import PacketFragment, get_packet_fragment_cache
 
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.pdfgen.textobject import PDFTextObject
 
-def _case_audit_summary(
-    case: Case, audit_events: list[AuditEvent], users_by_id: dict[int, User]
-) -> list[dict[str, Any]]:
-    summary: list[dict[str, Any]] = []
-    for event in audit_events:
-        if event.action == "packet_export":
-            continue
-        event_case_id = None
-        if event.metadata_json and isinstance(event.metadata_json, dict):
-            raw_case_id = event.metadata_json.get("case_id")
-            if raw_case_id is not None:
-                try:
-                    event_case_id = int(raw_case_id)
-                except (TypeError, ValueError):
-                    event_case_id = None
-
-        matches_case = (
-            event.entity_type == "case" and str(case.id) == str(event.entity_id)
-        ) or event_case_id == case.id
-        if not matches_case:
-            continue
 
-        summary.append(
-            {
-                "id": event.id,
-                "action": event.action,
-                "entity_type": event.entity_type,
-                "entity_id": event.entity_id,
-                "actor_email": (
-                    users_by_id.get(event.user_id).email if event.user_id in users_by_id else None
-                ),
-                "created_at": event.created_at.isoformat(),
-            }
-        )
+# Export bookkeeping is left out of the packet so regenerating does not change its content.
+_EXPORT_AUDIT_ACTIONS = frozenset({"packet_export", "packet_export_reused"})
 
-    return sorted(summary, key=lambda item: (item["created_at"], item["id"]))
 
+@dataclass(frozen=True)
+class AssembledPacket:
+    packet: dict[str, Any]
+    # Canonical JSON of each top-level section, in the packet's (sorted) key order.
+    section_json: dict[str, bytes]
 
-def build_packet_json(
+    def content_hash(self, export_type: str) -> str:
+        """``packet_content_hash`` of the packet, computed from the already-encoded sections."""
+        body = b",".join(
+            canonical_json_bytes(key) + b":" + section for key, section in self.section_json.items()
+        )
+        return hashlib.sha256(
+            b'{"export_type":' + canonical_json_bytes(export_type) + b',"packet":{' + body + b"}}"
+        ).hexdigest()
+
+
+def assemble_packet(
     case: Case,
     questionnaire: CaseQuestionnaire,
     documents: list[CaseDocument],
@@ -66,150 +58,371 @@ def build_packet_json(
     users_by_id: dict[int, User],
     export_type: str,
     denial: CaseDenial | None,
-) -> dict[str, Any]:
+) -> AssembledPacket:
+    """Build the canonical export packet from per-row fragments.
+
+    Fragments of rows unchanged since an earlier export come from the packet fragment cache,
+    so re-exporting after one answer edit only rebuilds and re-encodes the questionnaire (and
+    the new audit entries). ``documents`` may defer ``snippets_json``; it is only loaded for
+    documents missing from the cache.
+    """
     answers = questionnaire.answers_json or {}
-    answer_items = []
-    for field_id in sorted(answers.keys()):
-        answer = answers[field_id]
-        answer_items.append(
+    sections = {
+        "case_header": _fragment(
             {
-                "field_id": field_id,
-                "value": answer.get("value"),
-                "state": answer.get("state"),
-                "note": answer.get("note"),
+                "case_id": case.id,
+                "patient_id": case.patient_id,
+                "payer_label": case.payer_label,
+                "service_line_template_id": case.service_line_template_id,
+                "status": case.status,
+                "created_at": case.created_at.isoformat(),
+                "updated_at": case.updated_at.isoformat(),
+                "export_type": export_type,
             }
+        ),
+        "questionnaire": _cached_fragment(
+            ("questionnaire", questionnaire.id, questionnaire.updated_at),
+            lambda: _questionnaire_items(answers),
+        ),
+        "clinical_rationale_draft": _fragment(
+            str((answers.get("clinical_rationale") or {}).get("value") or "").strip()
+        ),
+        "evidence_documents": _list_fragment(_evidence_document_fragments(documents)),
+        "citation_map": _list_fragment(
+            [
+                _cached_fragment(
+                    ("citation", fill.id, fill.updated_at), partial(_citation_entry, fill)
+                )
+                for fill in sorted(autofills, key=lambda item: item.field_id)
+            ]
+        ),
+        "audit_log_summary": _list_fragment(
+            _audit_summary_fragments(case, audit_events, users_by_id)
+        ),
+    }
+    if denial is not None:
+        sections["denial"] = _cached_fragment(
+            ("denial", denial.id, denial.updated_at), partial(_denial_section, denial)
         )
 
-    evidence_documents = [
+    keys = sorted(sections)
+    return AssembledPacket(
+        packet={key: sections[key].value for key in keys},
+        section_json={key: sections[key].json_bytes for key in keys},
+    )
+
+
+def _fragment(value: Any) -> PacketFragment:
+    canonical = _canonical(value)
+    return PacketFragment(canonical, canonical_json_bytes(canonical))
+
+
+def _cached_fragment(key: Hashable, build: Callable[[], Any]) -> PacketFragment:
+    cache = get_packet_fragment_cache()
+    fragment = cache.get(key)
+    if fragment is None:
+        fragment = _fragment(build())
+        cache.put(key, fragment)
+    return fragment
+
+
+def _list_fragment(items: list[PacketFragment]) -> PacketFragment:
+    return PacketFragment(
+        [item.value for item in items], b"[" + b",".join(item.json_bytes for item in items) + b"]"
+    )
+
+
+def _questionnaire_items(answers: dict[str, Any]) -> list[dict[str, Any]]:
+    return [
         {
-            "document_id": item.id,
-            "filename": item.filename,
-            "content_type": item.content_type,
-            "document_kind": item.document_kind,
-            "snippets": item.snippets_json or [],
+            "field_id": field_id,
+            "value": answers[field_id].get("value"),
+            "state": answers[field_id].get("state"),
+            "note": answers[field_id].get("note"),
         }
-        for item in sorted(documents, key=lambda document: document.id)
+        for field_id in sorted(answers.keys())
     ]
 
-    citation_map = []
-    for fill in sorted(autofills, key=lambda item: item.field_id):
-        citation_map.append(
-            {
-                "field_id": fill.field_id,
-                "value": fill.value,
-                "status": fill.status,
-                "confidence": fill.confidence,
-                "citations": fill.citations_json,
-            }
+
+def _evidence_document_fragments(documents: list[CaseDocument]) -> list[PacketFragment]:
+    # Documents never change after upload, so their id and upload time are their version.
+    cache = get_packet_fragment_cache()
+    ordered = sorted(documents, key=lambda document: document.id)
+    keys = [("evidence_document", document.id, document.created_at) for document in ordered]
+    fragments = [cache.get(key) for key in keys]
+    missing = [document for document, fragment in zip(ordered, fragments) if fragment is None]
+    snippets = _document_snippets(missing)
+    for index, document in enumerate(ordered):
+        if fragments[index] is None:
+            fragments[index] = _fragment(
+                {
+                    "document_id": document.id,
+                    "filename": document.filename,
+                    "content_type": document.content_type,
+                    "document_kind": document.document_kind,
+                    "snippets": snippets[document.id],
+                }
+            )
+            cache.put(keys[index], fragments[index])
+    return fragments
+
+
+def _document_snippets(documents: list[CaseDocument]) -> dict[int, list[dict[str, Any]]]:
+    snippets = {}
+    deferred = []
+    for document in documents:
+        if "snippets_json" in inspect(document).unloaded:
+            deferred.append(document)
+        else:
+            snippets[document.id] = document.snippets_json or []
+    if deferred:
+        # One query for every miss instead of a lazy load per document.
+        rows = (
+            object_session(deferred[0])
+            .query(CaseDocument.id, CaseDocument.snippets_json)
+            .filter(CaseDocument.id.in_([document.id for document in deferred]))
+            .all()
         )
+        snippets.update((document_id, value or []) for document_id, value in rows)
+    return snippets
 
-    packet: dict[str, Any] = {
-        "case_header": {
-            "case_id": case.id,
-            "patient_id": case.patient_id,
-            "payer_label": case.payer_label,
-            "service_line_template_id": case.service_line_template_id,
-            "status": case.status,
-            "created_at": case.created_at.isoformat(),
-            "updated_at": case.updated_at.isoformat(),
-            "export_type": export_type,
-        },
-        "questionnaire": answer_items,
-        "clinical_rationale_draft": str(
-            (answers.get("clinical_rationale") or {}).get("value") or ""
-        ).strip(),
-        "evidence_documents": evidence_documents,
-        "citation_map": citation_map,
-        "audit_log_summary": _case_audit_summary(case, audit_events, users_by_id),
+
+def _citation_entry(fill: CaseAutofill) -> dict[str, Any]:
+    return {
+        "field_id": fill.field_id,
+        "value": fill.value,
+        "status": fill.status,
+        "confidence": fill.confidence,
+        "citations": fill.citations_json,
     }
 
-    if denial is not None:
-        packet["denial"] = {
-            "reasons": denial.reasons_json,
-            "missing_items": denial.missing_items_json,
-            "reference_id": denial.reference_id,
-            "deadline_text": denial.deadline_text,
-            "appeal_letter_draft": denial.appeal_letter_draft,
-            "citations": denial.citations_json,
-        }
 
-    return packet
-
-
-def _draw_wrapped_text(
-    c: canvas.Canvas,
-    lines: list[str],
-    *,
-    x: int = 50,
-    y_start: int = 740,
-    line_height: int = 14,
-    page_bottom: int = 60,
-) -> None:
-    y = y_start
-    for line in lines:
-        if y < page_bottom:
-            c.showPage()
-            c.setFont("Helvetica", 10)
-            y = y_start
-        c.drawString(x, y, line[:1200])
-        y -= line_height
+def _audit_summary_fragments(
+    case: Case, audit_events: list[AuditEvent], users_by_id: dict[int, User]
+) -> list[PacketFragment]:
+    fragments = []
+    for event in audit_events:
+        if event.action in _EXPORT_AUDIT_ACTIONS or event.case_id != case.id:
+            continue
 
+        actor = users_by_id.get(event.user_id) if event.user_id is not None else None
+        actor_email = actor.email if actor is not None else None
+        # Audit events are immutable; only the actor's email can change underneath them.
+        fragments.append(
+            _cached_fragment(
+                ("audit_event", event.id, actor_email),
+                partial(_audit_summary_item, event, actor_email),
+            )
+        )
 
-def build_packet_pdf_bytes(packet: dict[str, Any]) -> bytes:
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=LETTER, pageCompression=0, invariant=1)
-    c.setTitle("PacketPilot Prior Authorization Packet")
-    c.setAuthor("PacketPilot")
-    c.setCreator("PacketPilot")
-    c.setSubject("Prior Authorization Packet")
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(50, 770, "PacketPilot Prior Authorization Packet")
-    c.setFont("Helvetica", 10)
+    return sorted(fragments, key=lambda item: (item.value["created_at"], item.value["id"]))
+
+
+def _audit_summary_item(event: AuditEvent, actor_email: str | None) -> dict[str, Any]:
+    return {
+        "id": event.id,
+        "action": event.action,
+        "entity_type": event.entity_type,
+        "entity_id": event.entity_id,
+        "actor_email": actor_email,
+        # Live rows come back naive from SQLite and archived ones aware; both must hash alike.
+        "created_at": as_utc(event.created_at).isoformat(),
+    }
+
+
+def _denial_section(denial: CaseDenial) -> dict[str, Any]:
+    return {
+        "reasons": denial.reasons_json,
+        "missing_items": denial.missing_items_json,
+        "reference_id": denial.reference_id,
+        "deadline_text": denial.deadline_text,
+        "appeal_letter_draft": denial.appeal_letter_draft,
+        "citations": denial.citations_json,
+    }
+
+
+# reportlab is imported on first render or measurement, not when the API starts.
+_PAGE_SIZE = (612.0, 792.0)  # US Letter in points, reportlab's LETTER
+_PAGE_WIDTH = _PAGE_SIZE[0]
+_MARGIN_X = 50
+_TEXT_WIDTH = _PAGE_WIDTH - 2 * _MARGIN_X
+_TITLE_Y = 770
+_BODY_TOP = 740
+_BODY_BOTTOM = 60
+_LINE_HEIGHT = 14
+_FONT = "Helvetica"
+_FONT_SIZE = 10
 
+
+class _CharWidths(dict):
+    # Standard Type 1 fonts have no kerning here, so a string's width is the sum of its glyphs;
+    # caching per character avoids reportlab's per-call encoding work on every word.
+    def __missing__(self, char: str) -> float:
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        width = self[char] = stringWidth(char, _FONT, _FONT_SIZE)
+        return width
+
+
+_CHAR_WIDTHS = _CharWidths()
+
+
+@cache
+def _always_fits_chars() -> int:
+    # Lines short enough to fit even in the font's widest glyph never need measuring.
+    from reportlab.pdfbase.pdfmetrics import getFont
+
+    return int(_TEXT_WIDTH // (max(getFont(_FONT).widths) * _FONT_SIZE / 1000))
+
+
+def _text_width(text: str) -> float:
+    return sum(map(_CHAR_WIDTHS.__getitem__, text))
+
+
+def _fit_prefix(word: str, available: float) -> int:
+    width = 0.0
+    for index, char in enumerate(word):
+        width += _CHAR_WIDTHS[char]
+        if width > available:
+            return max(index, 1)
+    return len(word)
+
+
+def _wrap_line(line: str, max_width: float = _TEXT_WIDTH) -> Iterator[str]:
+    """Word-wrap one packet line to the text width; continuation lines keep its indent."""
+    if len(line) <= _always_fits_chars() or _text_width(line) <= max_width:
+        yield line
+        return
+
+    indent = line[: len(line) - len(line.lstrip())]
+    continuation = indent + "  "
+    space_width = _text_width(" ")
+    prefix = indent
+    width = _text_width(prefix)
+    words: list[str] = []
+    for word in line.split():
+        word_width = _text_width(word)
+        gap = space_width if words else 0.0
+        if width + gap + word_width <= max_width:
+            words.append(word)
+            width += gap + word_width
+            continue
+
+        if words:
+            yield prefix + " ".join(words)
+            words = []
+            prefix = continuation
+            width = _text_width(prefix)
+        # Tokens wider than a whole line (URLs, identifiers) are broken by character.
+        while width + word_width > max_width:
+            cut = _fit_prefix(word, max_width - width)
+            yield prefix + word[:cut]
+            word = word[cut:]
+            word_width = _text_width(word)
+            prefix = continuation
+            width = _text_width(prefix)
+        words.append(word)
+        width += word_width
+
+    if words:
+        yield prefix + " ".join(words)
+
+
+def iter_packet_lines(packet: dict[str, Any]) -> Iterator[str]:
     header = packet.get("case_header", {})
-    lines = [
-        f"Case ID: {header.get('case_id')}",
-        f"Patient ID: {header.get('patient_id')}",
-        f"Payer: {header.get('payer_label')}",
-        f"Template: {header.get('service_line_template_id')}",
-        f"Export Type: {header.get('export_type')}",
-        "",
-        "Questionnaire",
-    ]
+    yield f"Case ID: {header.get('case_id')}"
+    yield f"Patient ID: {header.get('patient_id')}"
+    yield f"Payer: {header.get('payer_label')}"
+    yield f"Template: {header.get('service_line_template_id')}"
+    yield f"Export Type: {header.get('export_type')}"
+    yield ""
+    yield "Questionnaire"
 
     for item in packet.get("questionnaire", []):
-        lines.append(
+        yield (
             f"- {item.get('field_id')}: {item.get('value') or '(empty)'} "
             f"[{item.get('state') or 'missing'}]"
         )
 
-    lines.extend(
-        [
-            "",
-            "Clinical Rationale Draft",
-            packet.get("clinical_rationale_draft") or "(empty)",
-            "",
-            "Evidence List with Citations",
-        ]
-    )
+    yield ""
+    yield "Clinical Rationale Draft"
+    yield packet.get("clinical_rationale_draft") or "(empty)"
+    yield ""
+    yield "Evidence List with Citations"
 
     for item in packet.get("citation_map", []):
-        lines.append(f"- Field {item.get('field_id')}: {item.get('value') or '(empty)'}")
+        yield f"- Field {item.get('field_id')}: {item.get('value') or '(empty)'}"
         for citation in item.get("citations", []):
-            lines.append(
+            yield (
                 f"  • Doc #{citation.get('doc_id')} p{citation.get('page')}: "
                 f"{str(citation.get('excerpt') or '').strip()[:120]}"
             )
 
     if "denial" in packet:
         denial = packet["denial"]
-        lines.extend(["", "Denial / Appeal"])
-        lines.extend([f"- Reason: {reason}" for reason in denial.get("reasons", [])])
-        lines.extend([f"- Missing: {item}" for item in denial.get("missing_items", [])])
-        lines.extend(["", "Appeal Letter Draft", denial.get("appeal_letter_draft") or "(empty)"])
+        yield ""
+        yield "Denial / Appeal"
+        for reason in denial.get("reasons", []):
+            yield f"- Reason: {reason}"
+        for item in denial.get("missing_items", []):
+            yield f"- Missing: {item}"
+        yield ""
+        yield "Appeal Letter Draft"
+        yield denial.get("appeal_letter_draft") or "(empty)"
 
-    _draw_wrapped_text(c, lines)
+
+def _iter_wrapped_lines(packet: dict[str, Any]) -> Iterator[str]:
+    for value in iter_packet_lines(packet):
+        # Multi-line values such as the appeal letter keep their breaks, blank lines and
+        # bullet indents: each physical line is wrapped on its own.
+        for physical_line in value.splitlines() or [""]:
+            yield from _wrap_line(physical_line)
+
+
+def render_packet_pdf(packet: dict[str, Any], out: str | BinaryIO) -> int:
+    """Render the packet PDF to a path or binary stream and return the page count.
+
+    Lines are produced and wrapped lazily and each page is flushed to its own text object, so
+    no packet-sized list of lines or intermediate buffer is built before reportlab writes.
+    """
+    from reportlab.pdfgen.canvas import Canvas
+
+    c = Canvas(out, pagesize=_PAGE_SIZE, pageCompression=0, invariant=1)
+    c.setTitle("PacketPilot Prior Authorization Packet")
+    c.setAuthor("PacketPilot")
+    c.setCreator("PacketPilot")
+    c.setSubject("Prior Authorization Packet")
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(_MARGIN_X, _TITLE_Y, "PacketPilot Prior Authorization Packet")
+
+    pages = 1
+    lines_per_page = int((_BODY_TOP - _BODY_BOTTOM) // _LINE_HEIGHT) + 1
+    text = _begin_page_text(c)
+    page_lines = 0
+    for line in _iter_wrapped_lines(packet):
+        if page_lines == lines_per_page:
+            c.drawText(text)
+            c.showPage()
+            pages += 1
+            text = _begin_page_text(c)
+            page_lines = 0
+        text.textLine(line)
+        page_lines += 1
+
+    c.drawText(text)
     c.save()
+    return pages
+
+
+def _begin_page_text(c: Canvas) -> PDFTextObject:
+    text = c.beginText(_MARGIN_X, _BODY_TOP)
+    text.setFont(_FONT, _FONT_SIZE, leading=_LINE_HEIGHT)
+    return text
+
+
+def build_packet_pdf_bytes(packet: dict[str, Any]) -> bytes:
+    buffer = io.BytesIO()
+    render_packet_pdf(packet, buffer)
     return buffer.getvalue()
 
 
@@ -217,6 +430,67 @@ def encode_pdf_base64(pdf_bytes: bytes) -> str:
     return base64.b64encode(pdf_bytes).decode("utf-8")
 
 
+def packet_content_hash(packet: dict[str, Any], export_type: str) -> str:
+    return hashlib.sha256(
+        canonical_json_bytes({"export_type": export_type, "packet": packet})
+    ).hexdigest()
+
+
+def canonical_json_bytes(data: Any) -> bytes:
+    """Compact, key-sorted, ASCII-escaped JSON for hashing."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=True).encode(
+        "ascii"
+    )
+
+
+_JSON_SCALARS = frozenset({str, int, float, bool, type(None)})
+
+
+def _json_key(key: Any) -> str:
+    # The key coercions json.dumps applies.
+    if isinstance(key, str):
+        return str.__str__(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if isinstance(key, float):
+        return float.__repr__(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def _canonical(value: Any) -> Any:
+    kind = type(value)
+    if kind is dict or isinstance(value, dict):
+        result = {}
+        for key in sorted(value):
+            item = value[key]
+            result[key if type(key) is str else _json_key(key)] = (
+                item if type(item) in _JSON_SCALARS else _canonical(item)
+            )
+        return result
+    if kind is list or kind is tuple or isinstance(value, (list, tuple)):
+        return [item if type(item) in _JSON_SCALARS else _canonical(item) for item in value]
+    if kind in _JSON_SCALARS:
+        return value
+    # Subclasses (str/int enums and the like) become the plain value json.dumps would emit.
+    if isinstance(value, str):
+        return str.__str__(value)
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return float(value)
+    raise TypeError(f"Object of type {kind.__name__} is not JSON serializable")
+
+
 def stable_json(data: dict[str, Any]) -> dict[str, Any]:
-    # Round-trip with sorted keys to produce deterministic structure ordering.
-    return json.loads(json.dumps(data, sort_keys=True, ensure_ascii=True))
+    """Deep copy of ``data`` with keys sorted at every level, as a JSON round-trip would give.
+
+    Built in one pass instead of ``json.loads(json.dumps(...))``, so large packets are not
+    serialized to a string and parsed back just to reorder their keys.
+    """
+    return _canonical(data)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+from collections.abc import Callable
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy.orm import Session, load_only
+
+from app.config import get_settings
+from app.models import CaseExport
+
+_LEGACY_BATCH_SIZE = 100
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def ensure_export_dir() -> Path:
+    root = Path(get_settings().export_storage_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def export_pdf_path(sha256: str) -> Path:
+    # Content-addressed: identical renders share one file.
+    return ensure_export_dir() / sha256[:2] / f"{sha256}.pdf"
+
+
+def store_export_pdf(pdf_bytes: bytes) -> tuple[str, int]:
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    destination = export_pdf_path(digest)
+    if not destination.exists():
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        partial = destination.with_name(f"{destination.name}.{uuid4().hex}.tmp")
+        partial.write_bytes(pdf_bytes)
+        os.replace(partial, destination)
+    return digest, len(pdf_bytes)
+
+
+def store_rendered_pdf(render: Callable[[str], int]) -> tuple[str, int, int]:
+    """Let ``render`` write a PDF to a scratch path, then hash it in chunks and move it into place.
+
+    ``render`` returns the page count; the result is ``(sha256, size_bytes, page_count)``. The PDF
+    never has to exist as one ``bytes`` object in this process.
+    """
+    scratch_dir = ensure_export_dir() / "tmp"
+    scratch_dir.mkdir(exist_ok=True)
+    scratch = scratch_dir / f"{uuid4().hex}.pdf"
+    try:
+        pages = render(str(scratch))
+        digest = hashlib.sha256()
+        size = 0
+        with scratch.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(_HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+                size += len(chunk)
+
+        destination = export_pdf_path(digest.hexdigest())
+        if not destination.exists():
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(scratch, destination)
+        return digest.hexdigest(), size, pages
+    finally:
+        scratch.unlink(missing_ok=True)
+
+
+def read_export_pdf(sha256: str) -> bytes:
+    return export_pdf_path(sha256).read_bytes()
+
+
+def move_legacy_export_pdfs(db: Session) -> int:
+    """Move PDFs stored inline as base64 into the export store; returns the rows moved.
+
+    Only completed rows with an inline PDF qualify: pending and failed exports have no PDF yet
+    (or ever), and must not be stamped with the hash of an empty file.
+    """
+    moved = 0
+    while True:
+        rows = (
+            db.query(CaseExport)
+            .options(load_only(CaseExport.id, CaseExport.pdf_base64))
+            .filter(
+                CaseExport.status == "completed",
+                CaseExport.pdf_sha256.is_(None),
+                CaseExport.pdf_base64.is_not(None),
+                CaseExport.pdf_base64 != "",
+            )
+            .order_by(CaseExport.id.asc())
+            .limit(_LEGACY_BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            return moved
+
+        for row in rows:
+            row.pdf_sha256, row.pdf_size_bytes = store_export_pdf(base64.b64decode(row.pdf_base64))
+            row.pdf_base64 = ""
+        db.commit()
+        moved += len(rows)
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+import httpx
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.fhir_client import (
+    SNAPSHOT_SEARCHES,
+    FhirClientError,
+    open_fhir_http_client,
+    partition_snapshot,
+)
+from app.models import FhirBulkImport, FhirResource, StagedFhirResource, utc_now
+
+BULK_RESOURCE_TYPES = ("Patient", *(resource_type for _, resource_type, _ in SNAPSHOT_SEARCHES))
+_PATIENT_REFERENCE_FIELDS = ("subject", "patient", "beneficiary")
+_STAGE_BATCH_SIZE = 500
+
+
+def patient_reference(resource: dict[str, Any]) -> str | None:
+    if resource.get("resourceType") == "Patient":
+        return resource.get("id")
+    for field in _PATIENT_REFERENCE_FIELDS:
+        reference = (resource.get(field) or {}).get("reference") or ""
+        if reference.startswith("Patient/"):
+            return reference.split("/", 1)[1]
+    return None
+
+
+def kick_off_export(http_client: httpx.Client, base_url: str, resource_types: Iterable[str]) -> str:
+    """Start a Patient-level ``$export`` and return the status polling URL."""
+    response = http_client.get(
+        f"{base_url}/Patient/$export",
+        params={"_type": ",".join(resource_types)},
+        headers={"Accept": "application/fhir+json", "Prefer": "respond-async"},
+    )
+    status_url = response.headers.get("Content-Location")
+    if response.status_code != 202 or not status_url:
+        raise FhirClientError(
+            f"Unable to start bulk export: status={response.status_code} body={response.text}"
+        )
+    return status_url
+
+
+def wait_for_manifest(
+    http_client: httpx.Client,
+    status_url: str,
+    *,
+    poll_interval_seconds: float,
+    timeout_seconds: float,
+    sleep: Callable[[float], None] = time.sleep,
+) -> dict[str, Any]:
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        response = http_client.get(status_url, headers={"Accept": "application/json"})
+        if response.status_code == 200:
+            return response.json()
+        if response.status_code != 202:
+            raise FhirClientError(
+                f"Bulk export failed: status={response.status_code} body={response.text}"
+            )
+        if time.monotonic() >= deadline:
+            raise FhirClientError(f"Bulk export did not finish within {timeout_seconds:.0f}s")
+
+        retry_after = response.headers.get("Retry-After", "")
+        sleep(float(retry_after) if retry_after.isdigit() else poll_interval_seconds)
+
+
+def iter_ndjson(http_client: httpx.Client, url: str) -> Iterator[dict[str, Any]]:
+    """Stream one export file line by line; only the current line is held in memory."""
+    with http_client.stream("GET", url, headers={"Accept": "application/fhir+ndjson"}) as response:
+        if response.status_code != 200:
+            response.read()
+            raise FhirClientError(
+                f"Unable to download bulk export file: status={response.status_code} url={url}"
+            )
+        for line in response.iter_lines():
+            if line.strip():
+                yield json.loads(line)
+
+
+def _stage_batch(db: Session, import_id: int, batch: dict[tuple[str, str], dict]) -> None:
+    by_type: dict[str, list[str]] = {}
+    for resource_type, resource_id in batch:
+        by_type.setdefault(resource_type, []).append(resource_id)
+
+    existing: dict[tuple[str, str], StagedFhirResource] = {}
+    for resource_type, resource_ids in by_type.items():
+        rows = db.query(StagedFhirResource).filter(
+            StagedFhirResource.import_id == import_id,
+            StagedFhirResource.resource_type == resource_type,
+            StagedFhirResource.resource_id.in_(resource_ids),
+        )
+        existing.update({(row.resource_type, row.resource_id): row for row in rows})
+
+    for key, resource in batch.items():
+        row = existing.get(key)
+        if row is None:
+            row = StagedFhirResource(import_id=import_id, resource_type=key[0], resource_id=key[1])
+            db.add(row)
+        row.patient_id = patient_reference(resource)
+        row.resource_json = resource
+    db.commit()
+
+
+def ingest_resources(
+    db: Session, import_id: int, resources: Iterable[dict[str, Any]]
+) -> dict[str, int]:
+    """Stage resources for ``import_id`` in fixed-size batches; live rows are untouched."""
+    counts: dict[str, int] = {}
+    batch: dict[tuple[str, str], dict[str, Any]] = {}
+    for resource in resources:
+        resource_type, resource_id = resource.get("resourceType"), resource.get("id")
+        if not resource_type or not resource_id:
+            continue
+        batch[(resource_type, str(resource_id))] = resource
+        counts[resource_type] = counts.get(resource_type, 0) + 1
+        if len(batch) >= _STAGE_BATCH_SIZE:
+            _stage_batch(db, import_id, batch)
+            batch = {}
+    if batch:
+        _stage_batch(db, import_id, batch)
+    return counts
+
+
+def _swap_in_staged(db: Session, import_id: int, resource_types: tuple[str, ...]) -> None:
+    """Replace the live rows of ``resource_types`` with the staged ones; the caller commits."""
+    db.query(FhirResource).filter(FhirResource.resource_type.in_(resource_types)).delete(
+        synchronize_session=False
+    )
+    staged = select(
+        StagedFhirResource.resource_type,
+        StagedFhirResource.resource_id,
+        StagedFhirResource.patient_id,
+        StagedFhirResource.resource_json,
+        StagedFhirResource.import_id,
+        StagedFhirResource.staged_at,
+    ).where(
+        StagedFhirResource.import_id == import_id,
+        StagedFhirResource.resource_type.in_(resource_types),
+    )
+    columns = ["resource_type", "resource_id", "patient_id", "resource_json", "import_id"]
+    db.execute(insert(FhirResource).from_select([*columns, "updated_at"], staged))
+    _drop_staged(db, import_id)
+
+
+def _drop_staged(db: Session, import_id: int) -> None:
+    db.query(StagedFhirResource).filter(StagedFhirResource.import_id == import_id).delete(
+        synchronize_session=False
+    )
+
+
+def run_bulk_import(
+    db: Session,
+    *,
+    base_url: str | None = None,
+    http_client: httpx.Client | None = None,
+    resource_types: Iterable[str] = BULK_RESOURCE_TYPES,
+    sleep: Callable[[float], None] = time.sleep,
+) -> FhirBulkImport:
+    """Export, download and stage, then replace the local rows in a single commit.
+
+    A run that fails partway leaves ``fhir_resources`` exactly as the last completed
+    import left it.
+    """
+    settings = get_settings()
+    base_url = (base_url or settings.fhir_base_url).rstrip("/")
+    http_client = http_client or open_fhir_http_client()
+    resource_types = tuple(resource_types)
+
+    run = FhirBulkImport(status="running")
+    db.add(run)
+    db.commit()
+
+    try:
+        run.status_url = kick_off_export(http_client, base_url, resource_types)
+        db.commit()
+        manifest = wait_for_manifest(
+            http_client,
+            run.status_url,
+            poll_interval_seconds=settings.fhir_bulk_poll_interval_seconds,
+            timeout_seconds=settings.fhir_bulk_timeout_seconds,
+            sleep=sleep,
+        )
+
+        counts: dict[str, int] = {}
+        for output in manifest.get("output", []):
+            if output.get("type") not in resource_types:
+                continue
+            for resource_type, count in ingest_resources(
+                db, run.id, iter_ndjson(http_client, output["url"])
+            ).items():
+                counts[resource_type] = counts.get(resource_type, 0) + count
+
+        # Staged batches only become visible here, together, in the run's final commit.
+        _swap_in_staged(db, run.id, resource_types)
+        run.transaction_time = manifest.get("transactionTime")
+        run.resource_counts_json = counts
+        run.status = "completed"
+    except (FhirClientError, httpx.HTTPError, ValueError) as exc:
+        _mark_failed(db, run, str(exc))
+        return run
+    except Exception as exc:
+        # A database error or malformed manifest: never leave the run "running".
+        _mark_failed(db, run, f"{type(exc).__name__}: {exc}")
+        raise
+    run.completed_at = utc_now()
+    db.commit()
+    return run
+
+
+def _mark_failed(db: Session, run: FhirBulkImport, error: str) -> None:
+    db.rollback()
+    _drop_staged(db, run.id)
+    run.status = "failed"
+    run.error = error
+    run.completed_at = utc_now()
+    db.commit()
+
+
+def latest_completed_import(db: Session) -> FhirBulkImport | None:
+    return (
+        db.query(FhirBulkImport)
+        .filter(FhirBulkImport.status == "completed")
+        .order_by(FhirBulkImport.id.desc())
+        .first()
+    )
+
+
+def local_store_enabled(db: Session) -> bool:
+    """Serve reads from ``fhir_resources`` once at least one import has completed."""
+    if get_settings().fhir_local_store_mode != "prefer":
+        return False
+    return latest_completed_import(db) is not None
+
+
+def iter_local_patients(db: Session) -> Iterator[dict[str, Any]]:
+    rows = (
+        db.query(FhirResource.resource_json)
+        .filter(FhirResource.resource_type == "Patient")
+        .order_by(FhirResource.resource_id.asc())
+        .yield_per(500)
+    )
+    for (resource,) in rows:
+        yield resource
+
+
+def local_patient(db: Session, patient_id: str) -> dict[str, Any] | None:
+    row = (
+        db.query(FhirResource.resource_json)
+        .filter(FhirResource.resource_type == "Patient", FhirResource.resource_id == patient_id)
+        .one_or_none()
+    )
+    return row[0] if row is not None else None
+
+
+def local_patient_snapshot(db: Session, patient_id: str) -> dict[str, Any] | None:
+    rows = (
+        db.query(FhirResource.resource_json)
+        .filter(FhirResource.patient_id == patient_id)
+        .order_by(FhirResource.resource_type.asc(), FhirResource.resource_id.asc())
+    )
+    return partition_snapshot(patient_id, (resource for (resource,) in rows))
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any
+from urllib.parse import urlencode
+
+import httpx
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db import get_session_local
+from app.models import FhirResponseCacheEntry
+
+
+def cache_key(url: str, params: dict[str, str] | None = None) -> str:
+    """``base_url + path + query`` with the query sorted so equivalent searches share an entry."""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+def ttl_for(resource_type: str) -> float:
+    settings = get_settings()
+    return settings.fhir_cache_ttls.get(resource_type, settings.fhir_cache_ttl_seconds)
+
+
+@dataclass(frozen=True)
+class CachedFhirResponse:
+    body: bytes
+    content_type: str
+    etag: str | None
+    last_modified: str | None
+    expires_at: float
+
+    def is_fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    def validators(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> httpx.Response:
+        return httpx.Response(200, content=self.body, headers={"Content-Type": self.content_type})
+
+
+class FhirResponseCache:
+    """Caches successful FHIR GETs and revalidates stale entries with conditional requests.
+
+    Subclasses provide storage; freshness, validators and counters live here.
+    """
+
+    mode = "off"
+    # True when lookups do blocking I/O and async callers should use a worker thread.
+    blocking = False
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._revalidated = 0
+        self._evictions = 0
+
+    def _load(self, key: str) -> CachedFhirResponse | None:
+        raise NotImplementedError
+
+    def _save(self, key: str, resource_type: str, entry: CachedFhirResponse) -> None:
+        raise NotImplementedError
+
+    def _entry_count(self) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def lookup(self, key: str) -> tuple[httpx.Response | None, CachedFhirResponse | None]:
+        """Return ``(fresh response, None)`` on a hit, else ``(None, stale entry or None)``."""
+        entry = self._load(key)
+        if entry is not None and entry.is_fresh():
+            self._count("_hits")
+            return entry.to_response(), None
+        return None, entry
+
+    def complete(
+        self,
+        key: str,
+        resource_type: str,
+        stale: CachedFhirResponse | None,
+        response: httpx.Response,
+    ) -> httpx.Response:
+        """Fold a network response into the cache and return what the caller should parse."""
+        expires_at = time.time() + ttl_for(resource_type)
+        if response.status_code == 304 and stale is not None:
+            self._count("_revalidated")
+            refreshed = replace(
+                stale,
+                etag=response.headers.get("ETag") or stale.etag,
+                last_modified=response.headers.get("Last-Modified") or stale.last_modified,
+                expires_at=expires_at,
+            )
+            self._save(key, resource_type, refreshed)
+            return refreshed.to_response()
+
+        self._count("_misses")
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if response.status_code != 200 or "no-store" in cache_control:
+            return response
+
+        self._save(
+            key,
+            resource_type,
+            CachedFhirResponse(
+                body=response.content,
+                content_type=response.headers.get("Content-Type", "application/fhir+json"),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                expires_at=expires_at,
+            ),
+        )
+        return response
+
+    def stats(self) -> dict[str, Any]:
+        entries = self._entry_count()
+        with self._lock:
+            lookups = self._hits + self._misses + self._revalidated
+            return {
+                "mode": self.mode,
+                "entries": entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "revalidated": self._revalidated,
+                "evictions": self._evictions,
+                "hit_rate": ((self._hits + self._revalidated) / lookups) if lookups else 0.0,
+            }
+
+
+class InProcessFhirResponseCache(FhirResponseCache):
+    """LRU bounded by entry count and total body bytes; private to one worker."""
+
+    mode = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedFhirResponse] = OrderedDict()
+        self._bytes = 0
+
+    def _load(self, key: str) -> CachedFhirResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _save(self, key: str, resource_type: str, entry: CachedFhirResponse) -> None:
+        del resource_type
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self._evictions += 1
+
+    def _entry_count(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class DatabaseFhirResponseCache(FhirResponseCache):
+    """Cache rows in ``fhir_response_cache`` so every API worker shares them.
+
+    Eviction drops the least recently stored rows once ``max_entries`` is exceeded. The
+    table is only counted after every ``eviction_interval`` inserted rows, so it can run
+    that far over the bound between sweeps. Hits do not write, so reads stay read-only.
+    """
+
+    mode = "database"
+    blocking = True
+
+    def __init__(self, max_entries: int, eviction_interval: int = 64) -> None:
+        super().__init__()
+        self.max_entries = max_entries
+        self.eviction_interval = max(1, eviction_interval)
+        self._inserts_since_eviction = 0
+
+    def _eviction_due(self) -> bool:
+        with self._lock:
+            self._inserts_since_eviction += 1
+            if self._inserts_since_eviction < self.eviction_interval:
+                return False
+            self._inserts_since_eviction = 0
+            return True
+
+    @staticmethod
+    def _row_key(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _session(self) -> Session:
+        return get_session_local()()
+
+    def _load(self, key: str) -> CachedFhirResponse | None:
+        db = self._session()
+        try:
+            row = (
+                db.query(FhirResponseCacheEntry)
+                .filter(FhirResponseCacheEntry.cache_key == self._row_key(key))
+                .one_or_none()
+            )
+            if row is None:
+                return None
+            return CachedFhirResponse(
+                body=row.body,
+                content_type=row.content_type,
+                etag=row.etag,
+                last_modified=row.last_modified,
+                expires_at=row.expires_at,
+            )
+        finally:
+            db.close()
+
+    def _save(self, key: str, resource_type: str, entry: CachedFhirResponse) -> None:
+        db = self._session()
+        try:
+            row_key = self._row_key(key)
+            row = (
+                db.query(FhirResponseCacheEntry)
+                .filter(FhirResponseCacheEntry.cache_key == row_key)
+                .one_or_none()
+            )
+            inserted = row is None
+            if inserted:
+                row = FhirResponseCacheEntry(cache_key=row_key, url=key)
+                db.add(row)
+            row.resource_type = resource_type
+            row.body = entry.body
+            row.content_type = entry.content_type
+            row.etag = entry.etag
+            row.last_modified = entry.last_modified
+            row.expires_at = entry.expires_at
+            db.flush()
+
+            # Refreshing an existing row cannot grow the table, so only inserts count.
+            if inserted and self._eviction_due():
+                self._evict(db)
+            db.commit()
+        except IntegrityError:
+            # A concurrent worker stored the same key first; losing that race is harmless.
+            db.rollback()
+        finally:
+            db.close()
+
+    def _evict(self, db: Session) -> None:
+        overflow = db.query(FhirResponseCacheEntry).count() - self.max_entries
+        if overflow <= 0:
+            return
+        oldest = (
+            db.query(FhirResponseCacheEntry.id)
+            .order_by(FhirResponseCacheEntry.stored_at.asc(), FhirResponseCacheEntry.id)
+            .limit(overflow)
+            .subquery()
+        )
+        db.query(FhirResponseCacheEntry).filter(
+            FhirResponseCacheEntry.id.in_(oldest.select())
+        ).delete(synchronize_session=False)
+        self._count("_evictions", overflow)
+
+    def _entry_count(self) -> int:
+        db = self._session()
+        try:
+            return db.query(FhirResponseCacheEntry).count()
+        finally:
+            db.close()
+
+    def clear(self) -> None:
+        db = self._session()
+        try:
+            db.query(FhirResponseCacheEntry).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+_cache: FhirResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_fhir_response_cache() -> FhirResponseCache | None:
+    """Process-wide cache chosen by ``FHIR_CACHE_MODE`` (memory, database or off)."""
+    global _cache
+    settings = get_settings()
+    if settings.fhir_cache_mode not in {"memory", "database"}:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            if settings.fhir_cache_mode == "database":
+                _cache = DatabaseFhirResponseCache(max_entries=settings.fhir_cache_max_entries)
+            else:
+                _cache = InProcessFhirResponseCache(
+                    max_entries=settings.fhir_cache_max_entries,
+                    max_bytes=settings.fhir_cache_max_bytes,
+                )
+        return _cache
+
+
+def reset_fhir_response_cache() -> None:
+    global _cache
+    with _cache_lock:
+        _cache = None
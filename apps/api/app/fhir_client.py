@@ -1,16 +1,216 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import importlib.util
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from typing import Any, TypeVar
+from urllib.parse import quote, urlencode
 
 import httpx
+from fastapi.concurrency import run_in_threadpool
 
 from app.config import get_settings
+from app.fhir_cache import FhirResponseCache, cache_key, get_fhir_response_cache
+
+FHIR_ACCEPT_HEADER = "application/fhir+json, application/json"
+
+T = TypeVar("T")
 
 
 class FhirClientError(RuntimeError):
     pass
 
 
+class FhirCircuitOpenError(FhirClientError):
+    pass
+
+
+class FhirCircuitBreaker:
+    """Fails FHIR calls fast after repeated outages instead of waiting out every timeout.
+
+    ``failure_threshold`` consecutive failures (transport errors, timeouts, 5xx) open the
+    circuit. After ``reset_seconds`` it goes half-open and lets ``half_open_max_calls``
+    probes through: a success closes it, a failure re-opens it for another interval.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.half_open_max_calls = max(half_open_max_calls, 1)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._rejected = 0
+
+    def before_call(self) -> None:
+        with self._lock:
+            now = self._clock()
+            # Re-arming in half-open too keeps a probe that never reported back from
+            # wedging the circuit.
+            if self._state != "closed" and now - self._opened_at >= self.reset_seconds:
+                self._state = "half_open"
+                self._probes = 0
+                self._opened_at = now
+            if self._state == "half_open" and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            if self._state != "closed":
+                self._rejected += 1
+                raise FhirCircuitOpenError("FHIR circuit is open; skipping request")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = self._clock()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            state = self._state
+            if state == "open" and self._clock() - self._opened_at >= self.reset_seconds:
+                state = "half_open"
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "rejected_calls": self._rejected,
+            }
+
+
+_breakers: dict[str, FhirCircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_fhir_circuit_breaker(base_url: str | None = None) -> FhirCircuitBreaker:
+    """One breaker per FHIR base URL, shared by the sync and async clients."""
+    settings = get_settings()
+    base_url = (base_url or settings.fhir_base_url).rstrip("/")
+    with _breakers_lock:
+        breaker = _breakers.get(base_url)
+        if breaker is None:
+            breaker = FhirCircuitBreaker(
+                failure_threshold=settings.fhir_breaker_failure_threshold,
+                reset_seconds=settings.fhir_breaker_reset_seconds,
+                half_open_max_calls=settings.fhir_breaker_half_open_max_calls,
+            )
+            _breakers[base_url] = breaker
+        return breaker
+
+
+def reset_fhir_circuit_breakers() -> None:
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def _is_outage(response: httpx.Response) -> bool:
+    return response.status_code >= 500
+
+
+class FhirConnectionStats:
+    """Counts requests against new TCP connections using httpcore trace events."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def trace(self, event_name: str, _info: dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+
+    async def atrace(self, event_name: str, info: dict[str, Any]) -> None:
+        self.trace(event_name, info)
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": (reused / self.requests) if self.requests else 0.0,
+            }
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _client_options() -> dict[str, Any]:
+    settings = get_settings()
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.fhir_max_connections,
+            max_keepalive_connections=settings.fhir_max_keepalive_connections,
+            keepalive_expiry=settings.fhir_keepalive_expiry_seconds,
+        ),
+        # HTTP/2 needs the optional ``h2`` package (``httpx[http2]``).
+        "http2": settings.fhir_http2 and _http2_available(),
+        "timeout": settings.fhir_timeout_seconds,
+        "headers": {"Accept": FHIR_ACCEPT_HEADER},
+    }
+
+
+_http_client: httpx.Client | None = None
+_async_http_client: httpx.AsyncClient | None = None
+_http_client_lock = threading.Lock()
+connection_stats = FhirConnectionStats()
+
+
+def open_fhir_http_client() -> httpx.Client:
+    """Application-lifetime pooled client shared by every ``FhirClient``."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None or _http_client.is_closed:
+            _http_client = httpx.Client(**_client_options())
+        return _http_client
+
+
+def open_fhir_async_http_client() -> httpx.AsyncClient:
+    global _async_http_client
+    with _http_client_lock:
+        if _async_http_client is None or _async_http_client.is_closed:
+            _async_http_client = httpx.AsyncClient(**_client_options())
+        return _async_http_client
+
+
+def close_fhir_http_client() -> None:
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+
+
+async def aclose_fhir_async_http_client() -> None:
+    global _async_http_client
+    with _http_client_lock:
+        client, _async_http_client = _async_http_client, None
+    if client is not None:
+        await client.aclose()
+
+
 DEMO_PATIENTS: list[dict[str, Any]] = [
     {
         "resourceType": "Patient",
@@ -43,80 +243,466 @@ def demo_patient_by_id(patient_id: str) -> dict[str, Any] | None:
     return None
 
 
+SNAPSHOT_SEARCHES: list[tuple[str, str, str]] = [
+    # (snapshot key, resource type, search parameter naming the patient)
+    ("coverage", "Coverage", "beneficiary"),
+    ("conditions", "Condition", "patient"),
+    ("observations", "Observation", "patient"),
+    ("medicationRequests", "MedicationRequest", "patient"),
+    ("serviceRequests", "ServiceRequest", "patient"),
+    ("documentReferences", "DocumentReference", "patient"),
+]
+
+
+def _snapshot_search(search_param: str, patient_id: str) -> dict[str, str]:
+    if search_param == "beneficiary":
+        return {"beneficiary": f"Patient/{patient_id}"}
+    return {search_param: patient_id}
+
+
+def _bundle_params(search: dict[str, str] | None, page_size: int) -> dict[str, str]:
+    params = {"_count": str(page_size)}
+    if search:
+        params.update(search)
+    return params
+
+
+def _bundle_page(
+    resource_type: str, response: httpx.Response
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Resources on one searchset page plus the ``link[rel=next]`` URL, if any."""
+    if response.status_code != 200:
+        raise FhirClientError(
+            f"Unable to fetch {resource_type}: status={response.status_code} body={response.text}"
+        )
+
+    bundle = response.json()
+    next_url = next(
+        (link.get("url") for link in bundle.get("link", []) if link.get("relation") == "next"),
+        None,
+    )
+    return [entry.get("resource", {}) for entry in bundle.get("entry", [])], next_url
+
+
+class _PageCursor:
+    """Shared next-link bookkeeping for the sync and async page iterators."""
+
+    def __init__(self, url: str, params: dict[str, str] | None, max_resources: int | None) -> None:
+        self.url: str | None = url
+        self.params = params
+        if max_resources is None:
+            max_resources = get_settings().fhir_max_resources
+        # A cap of 0 or less means "follow every page".
+        self.remaining: int | None = max_resources if max_resources > 0 else None
+        self._seen: set[str] = set()
+
+    @classmethod
+    def for_search(
+        cls,
+        base_url: str,
+        resource_type: str,
+        search: dict[str, str] | None,
+        page_size: int | None,
+        max_resources: int | None,
+    ) -> "_PageCursor":
+        params = _bundle_params(search, page_size or get_settings().fhir_page_size)
+        return cls(f"{base_url}/{resource_type}", params, max_resources)
+
+    def advance(self, next_url: str | None) -> None:
+        # Next links already carry the full query; a repeated link would loop forever.
+        self.params = None
+        self.url = next_url if next_url and next_url not in self._seen else None
+        if self.url is not None:
+            self._seen.add(self.url)
+
+    def take(self, resources: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if self.remaining is None:
+            return resources
+        taken = resources[: self.remaining]
+        self.remaining -= len(taken)
+        if self.remaining <= 0:
+            self.url = None
+        return taken
+
+
+# Statuses servers use for operations they do not implement. A 400 only counts when its
+# OperationOutcome says ``not-supported``: it is also the answer to one bad patient id.
+_UNSUPPORTED_OPERATION_STATUSES = frozenset({405, 501})
+# Servers get upgraded, so an unsupported mode is probed again after this long.
+_UNSUPPORTED_SNAPSHOT_MODE_TTL_SECONDS = 600.0
+# (base_url, mode) -> monotonic time until which the mode is not probed per request.
+_unsupported_snapshot_modes: dict[tuple[str, str], float] = {}
+
+
+def reset_fhir_snapshot_modes() -> None:
+    _unsupported_snapshot_modes.clear()
+
+
+def _operation_unsupported(response: httpx.Response) -> bool:
+    if response.status_code in _UNSUPPORTED_OPERATION_STATUSES:
+        return True
+    if response.status_code != 400:
+        return False
+    try:
+        outcome = response.json()
+    except ValueError:
+        return False
+    if not isinstance(outcome, dict) or outcome.get("resourceType") != "OperationOutcome":
+        return False
+    return any(
+        isinstance(issue, dict) and issue.get("code") == "not-supported"
+        for issue in outcome.get("issue") or []
+    )
+
+
+_SNAPSHOT_KEYS_BY_TYPE = {resource_type: key for key, resource_type, _ in SNAPSHOT_SEARCHES}
+
+
+def partition_snapshot(
+    patient_id: str, resources: Iterable[dict[str, Any]]
+) -> dict[str, Any] | None:
+    """Split a mixed Bundle into the snapshot shape; None when the Patient is missing."""
+    snapshot: dict[str, Any] = {key: [] for key, _, _ in SNAPSHOT_SEARCHES}
+    patient = None
+    for resource in resources:
+        resource_type = resource.get("resourceType")
+        if resource_type == "Patient" and resource.get("id") == patient_id:
+            patient = resource
+        elif resource_type in _SNAPSHOT_KEYS_BY_TYPE:
+            snapshot[_SNAPSHOT_KEYS_BY_TYPE[resource_type]].append(resource)
+    if patient is None:
+        return None
+    return {"patient": patient, **snapshot, "partial": False, "failed_resources": {}}
+
+
+def _resource_body(
+    resource_type: str, resource_id: str, response: httpx.Response
+) -> dict[str, Any]:
+    if response.status_code != 200:
+        raise FhirClientError(
+            f"Unable to fetch {resource_type}/{resource_id}: status={response.status_code}"
+        )
+
+    return response.json()
+
+
 class FhirClient:
-    def __init__(self, base_url: str | None = None, timeout_seconds: float | None = None) -> None:
+    def __init__(
+        self,
+        base_url: str | None = None,
+        timeout_seconds: float | None = None,
+        http_client: httpx.Client | None = None,
+        response_cache: FhirResponseCache | None = None,
+        circuit_breaker: FhirCircuitBreaker | None = None,
+    ) -> None:
         settings = get_settings()
         self.base_url = (base_url or settings.fhir_base_url).rstrip("/")
         self.timeout_seconds = timeout_seconds or settings.fhir_timeout_seconds
+        self.http_client = http_client or open_fhir_http_client()
+        self.response_cache = response_cache or get_fhir_response_cache()
+        self.circuit_breaker = circuit_breaker or get_fhir_circuit_breaker(self.base_url)
 
-    def _bundle_resources(
-        self, resource_type: str, search: dict[str, str] | None = None
-    ) -> list[dict[str, Any]]:
-        params = {"_count": "50"}
-        if search:
-            params.update(search)
+    def _get(
+        self, resource_type: str, url: str, params: dict[str, str] | None = None
+    ) -> httpx.Response:
+        key = cache_key(url, params)
+        stale = None
+        if self.response_cache is not None:
+            cached, stale = self.response_cache.lookup(key)
+            if cached is not None:
+                return cached
 
         try:
-            with httpx.Client(timeout=self.timeout_seconds) as client:
-                response = client.get(
-                    f"{self.base_url}/{resource_type}",
-                    params=params,
-                    headers={"Accept": "application/fhir+json, application/json"},
-                )
-        except httpx.RequestError as exc:
-            raise FhirClientError(
-                f"Unable to fetch {resource_type}: transport_error={exc}"
-            ) from exc
+            self.circuit_breaker.before_call()
+        except FhirCircuitOpenError:
+            if stale is not None:
+                # Serve the last known body rather than nothing while the server is down.
+                return stale.to_response()
+            raise
 
-        if response.status_code != 200:
-            raise FhirClientError(
-                f"Unable to fetch {resource_type}: status={response.status_code} body={response.text}"
+        connection_stats.record_request()
+        try:
+            response = self.http_client.get(
+                url,
+                params=params,
+                headers=stale.validators() if stale is not None else None,
+                timeout=self.timeout_seconds,
+                extensions={"trace": connection_stats.trace},
             )
+        except httpx.RequestError:
+            self.circuit_breaker.record_failure()
+            raise
+        if _is_outage(response):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        if self.response_cache is None:
+            return response
+        return self.response_cache.complete(key, resource_type, stale, response)
+
+    def iter_resources(
+        self,
+        resource_type: str,
+        search: dict[str, str] | None = None,
+        *,
+        page_size: int | None = None,
+        max_resources: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream search results, fetching the next page only when the current one is used up."""
+        cursor = _PageCursor.for_search(
+            self.base_url, resource_type, search, page_size, max_resources
+        )
+        while cursor.url is not None:
+            try:
+                response = self._get(resource_type, cursor.url, params=cursor.params)
+            except httpx.RequestError as exc:
+                raise FhirClientError(
+                    f"Unable to fetch {resource_type}: transport_error={exc}"
+                ) from exc
 
-        bundle = response.json()
-        return [entry.get("resource", {}) for entry in bundle.get("entry", [])]
+            resources, next_url = _bundle_page(resource_type, response)
+            cursor.advance(next_url)
+            yield from cursor.take(resources)
+
+    def _bundle_resources(
+        self, resource_type: str, search: dict[str, str] | None = None
+    ) -> list[dict[str, Any]]:
+        return list(self.iter_resources(resource_type, search))
 
     def _resource_by_id(self, resource_type: str, resource_id: str) -> dict[str, Any]:
         try:
-            with httpx.Client(timeout=self.timeout_seconds) as client:
-                response = client.get(
-                    f"{self.base_url}/{resource_type}/{resource_id}",
-                    headers={"Accept": "application/fhir+json, application/json"},
-                )
+            response = self._get(resource_type, f"{self.base_url}/{resource_type}/{resource_id}")
         except httpx.RequestError as exc:
             raise FhirClientError(
                 f"Unable to fetch {resource_type}/{resource_id}: transport_error={exc}"
             ) from exc
 
-        if response.status_code != 200:
-            raise FhirClientError(
-                f"Unable to fetch {resource_type}/{resource_id}: status={response.status_code}"
-            )
-
-        return response.json()
+        return _resource_body(resource_type, resource_id, response)
 
     def list_patients(self) -> list[dict[str, Any]]:
         return self._bundle_resources("Patient")
 
+    def iter_patients(self, **kwargs: Any) -> Iterator[dict[str, Any]]:
+        return self.iter_resources("Patient", **kwargs)
+
     def get_patient(self, patient_id: str) -> dict[str, Any]:
         return self._resource_by_id("Patient", patient_id)
 
     def get_patient_snapshot(self, patient_id: str) -> dict[str, Any]:
-        return {
-            "patient": self._resource_by_id("Patient", patient_id),
-            "coverage": self._bundle_resources(
-                "Coverage", {"beneficiary": f"Patient/{patient_id}"}
-            ),
-            "conditions": self._bundle_resources("Condition", {"patient": patient_id}),
-            "observations": self._bundle_resources("Observation", {"patient": patient_id}),
-            "medicationRequests": self._bundle_resources(
-                "MedicationRequest", {"patient": patient_id}
-            ),
-            "serviceRequests": self._bundle_resources("ServiceRequest", {"patient": patient_id}),
-            "documentReferences": self._bundle_resources(
-                "DocumentReference", {"patient": patient_id}
+        snapshot: dict[str, Any] = {"patient": self._resource_by_id("Patient", patient_id)}
+        for key, resource_type, search_param in SNAPSHOT_SEARCHES:
+            snapshot[key] = self._bundle_resources(
+                resource_type, _snapshot_search(search_param, patient_id)
+            )
+        return snapshot
+
+
+class AsyncFhirClient:
+    """Async client used for patient snapshots.
+
+    ``snapshot_strategy`` picks how a snapshot is fetched: ``auto``/``everything`` try
+    ``Patient/{id}/$everything`` in one request, ``revinclude`` uses a single Patient
+    search with ``_revinclude`` (opt-in, since some servers silently ignore unknown
+    parameters), and ``fanout`` issues the per-type searches concurrently. Every
+    strategy falls back to the fan-out when the server rejects the request with a
+    4xx; transport errors, timeouts and 5xx answers raise instead. In the fan-out
+    each call is bounded by ``timeout_seconds`` and a failed related-resource search
+    yields an empty list plus an entry in ``failed_resources``. Only the Patient read
+    itself is required.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        timeout_seconds: float | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        response_cache: FhirResponseCache | None = None,
+        snapshot_strategy: str | None = None,
+        circuit_breaker: FhirCircuitBreaker | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.base_url = (base_url or settings.fhir_base_url).rstrip("/")
+        self.timeout_seconds = timeout_seconds or settings.fhir_timeout_seconds
+        self.http_client = http_client or open_fhir_async_http_client()
+        self.response_cache = response_cache or get_fhir_response_cache()
+        self.circuit_breaker = circuit_breaker or get_fhir_circuit_breaker(self.base_url)
+        self.snapshot_strategy = snapshot_strategy or settings.fhir_snapshot_strategy
+
+    async def _call_cache(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.response_cache is not None and self.response_cache.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def _get(
+        self, resource_type: str, url: str, params: dict[str, str] | None = None
+    ) -> httpx.Response:
+        key = cache_key(url, params)
+        stale = None
+        if self.response_cache is not None:
+            cached, stale = await self._call_cache(self.response_cache.lookup, key)
+            if cached is not None:
+                return cached
+
+        try:
+            self.circuit_breaker.before_call()
+        except FhirCircuitOpenError:
+            if stale is not None:
+                return stale.to_response()
+            raise
+
+        connection_stats.record_request()
+        try:
+            response = await asyncio.wait_for(
+                self.http_client.get(
+                    url,
+                    params=params,
+                    headers=stale.validators() if stale is not None else None,
+                    timeout=self.timeout_seconds,
+                    extensions={"trace": connection_stats.atrace},
+                ),
+                timeout=self.timeout_seconds,
+            )
+        except (httpx.RequestError, asyncio.TimeoutError):
+            self.circuit_breaker.record_failure()
+            raise
+        if _is_outage(response):
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        if self.response_cache is None:
+            return response
+        return await self._call_cache(
+            self.response_cache.complete, key, resource_type, stale, response
+        )
+
+    async def iter_resources(
+        self,
+        resource_type: str,
+        search: dict[str, str] | None = None,
+        *,
+        page_size: int | None = None,
+        max_resources: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        cursor = _PageCursor.for_search(
+            self.base_url, resource_type, search, page_size, max_resources
+        )
+        while cursor.url is not None:
+            try:
+                response = await self._get(resource_type, cursor.url, params=cursor.params)
+            except (httpx.RequestError, asyncio.TimeoutError) as exc:
+                raise FhirClientError(
+                    f"Unable to fetch {resource_type}: transport_error={exc!r}"
+                ) from exc
+
+            resources, next_url = _bundle_page(resource_type, response)
+            cursor.advance(next_url)
+            for resource in cursor.take(resources):
+                yield resource
+
+    async def _bundle_resources(
+        self, resource_type: str, search: dict[str, str] | None = None
+    ) -> list[dict[str, Any]]:
+        return [resource async for resource in self.iter_resources(resource_type, search)]
+
+    async def _resource_by_id(self, resource_type: str, resource_id: str) -> dict[str, Any]:
+        try:
+            response = await self._get(
+                resource_type, f"{self.base_url}/{resource_type}/{resource_id}"
+            )
+        except (httpx.RequestError, asyncio.TimeoutError) as exc:
+            raise FhirClientError(
+                f"Unable to fetch {resource_type}/{resource_id}: transport_error={exc!r}"
+            ) from exc
+
+        return _resource_body(resource_type, resource_id, response)
+
+    async def get_patient(self, patient_id: str) -> dict[str, Any]:
+        return await self._resource_by_id("Patient", patient_id)
+
+    async def get_patient_snapshot(self, patient_id: str) -> dict[str, Any]:
+        strategy = self.snapshot_strategy
+        if strategy in {"auto", "everything"}:
+            url = f"{self.base_url}/Patient/{quote(patient_id, safe='')}/$everything"
+            snapshot = await self._bundle_snapshot("everything", patient_id, url)
+            if snapshot is not None:
+                return snapshot
+        elif strategy == "revinclude":
+            query = urlencode(
+                [("_id", patient_id), ("_count", str(get_settings().fhir_page_size))]
+                + [
+                    ("_revinclude", f"{resource_type}:{search_param}")
+                    for _, resource_type, search_param in SNAPSHOT_SEARCHES
+                ]
+            )
+            snapshot = await self._bundle_snapshot(
+                "revinclude", patient_id, f"{self.base_url}/Patient?{query}"
+            )
+            if snapshot is not None:
+                return snapshot
+        return await self._fan_out_snapshot(patient_id)
+
+    async def _bundle_snapshot(self, mode: str, patient_id: str, url: str) -> dict[str, Any] | None:
+        """Snapshot from one Bundle request (plus its next pages); None means fall back.
+
+        Only a 4xx answer falls back to the fan-out. Transport errors, timeouts and 5xx
+        responses raise, so an outage is not retried through seven more requests.
+        """
+        skip_until = _unsupported_snapshot_modes.get((self.base_url, mode))
+        if skip_until is not None:
+            if time.monotonic() < skip_until:
+                return None
+            _unsupported_snapshot_modes.pop((self.base_url, mode), None)
+
+        settings = get_settings()
+        cap = settings.fhir_max_resources * (len(SNAPSHOT_SEARCHES) + 1)
+        cursor = _PageCursor(url, None, cap)
+        resources: list[dict[str, Any]] = []
+        while cursor.url is not None:
+            try:
+                response = await self._get(f"Patient/${mode}", cursor.url, params=cursor.params)
+            except (httpx.RequestError, asyncio.TimeoutError) as exc:
+                raise FhirClientError(
+                    f"Unable to fetch Patient/${mode}: transport_error={exc!r}"
+                ) from exc
+            if _operation_unsupported(response):
+                _unsupported_snapshot_modes[(self.base_url, mode)] = (
+                    time.monotonic() + _UNSUPPORTED_SNAPSHOT_MODE_TTL_SECONDS
+                )
+                return None
+            if response.status_code != 200 and not _is_outage(response):
+                return None
+
+            page, next_url = _bundle_page("Patient", response)
+            cursor.advance(next_url)
+            resources.extend(cursor.take(page))
+
+        return partition_snapshot(patient_id, resources)
+
+    async def _fan_out_snapshot(self, patient_id: str) -> dict[str, Any]:
+        results = await asyncio.gather(
+            self._resource_by_id("Patient", patient_id),
+            *(
+                self._bundle_resources(resource_type, _snapshot_search(search_param, patient_id))
+                for _, resource_type, search_param in SNAPSHOT_SEARCHES
             ),
-        }
+            return_exceptions=True,
+        )
+
+        patient = results[0]
+        if isinstance(patient, BaseException):
+            raise patient
+
+        snapshot: dict[str, Any] = {"patient": patient, "failed_resources": {}}
+        for (key, _, _), result in zip(SNAPSHOT_SEARCHES, results[1:]):
+            if isinstance(result, FhirClientError):
+                snapshot[key] = []
+                snapshot["failed_resources"][key] = str(result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                snapshot[key] = result
+        snapshot["partial"] = bool(snapshot["failed_resources"])
+        return snapshot
 
 
 def patient_display_name(patient: dict[str, Any]) -> str:
@@ -1,19 +1,55 @@
 from __future__ import annotations
 
+import signal
+import threading
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.config import get_settings
+from app.audit_service import get_audit_sink
+from app.config import get_settings, reload_settings
 from app.db import init_db
+from app.export_jobs import resume_pending_exports, shutdown_export_renderer
+from app.fhir_client import (
+    aclose_fhir_async_http_client,
+    close_fhir_http_client,
+    get_fhir_circuit_breaker,
+    open_fhir_async_http_client,
+    open_fhir_http_client,
+)
+from app.pagination import NEXT_CURSOR_HEADER
+from app.patient_verification import resume_patient_verifications
 from app.routers import audit, auth, cases, denial, exports, fhir, model, settings
+from app.security import shutdown_password_executor
+
+
+def _install_reload_signal() -> None:
+    # SIGHUP re-reads the environment; signal handlers can only be set from the main thread.
+    if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+        return
+    signal.signal(signal.SIGHUP, lambda *_: reload_settings())
 
 
 @asynccontextmanager
 async def app_lifespan(_: FastAPI):
     init_db()
+    _install_reload_signal()
+    audit_sink = get_audit_sink()
+    audit_sink.start()
+    open_fhir_http_client()
+    open_fhir_async_http_client()
+    resume_pending_exports()
+    # FHIR lookups: kept off the startup path so an EHR outage cannot delay serving.
+    threading.Thread(
+        target=resume_patient_verifications, name="patient-verification-resume", daemon=True
+    ).start()
     yield
+    close_fhir_http_client()
+    await aclose_fhir_async_http_client()
+    audit_sink.stop()
+    shutdown_password_executor()
+    shutdown_export_renderer()
 
 
 app = FastAPI(title="PacketPilot API", version="0.2.0", lifespan=app_lifespan)
@@ -26,15 +62,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
 @app.get("/healthz")
-def healthz() -> dict[str, str]:
+def healthz() -> dict[str, object]:
     return {
         "status": "ok",
         "service": "packetpilot-api",
         "version": app.version,
+        "fhir_circuit": get_fhir_circuit_breaker().snapshot(),
     }
 
 
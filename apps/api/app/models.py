@@ -3,7 +3,19 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import JSON, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -60,6 +72,11 @@ class Setting(Base):
 
 class AuditEvent(Base):
     __tablename__ = "audit_events"
+    __table_args__ = (
+        Index("ix_audit_events_org_created_id", "org_id", "created_at", "id"),
+        Index("ix_audit_events_org_entity", "org_id", "entity_type", "entity_id"),
+        Index("ix_audit_events_org_case_created_id", "org_id", "case_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     org_id: Mapped[int] = mapped_column(ForeignKey("orgs.id"), nullable=False, index=True)
@@ -68,10 +85,124 @@ class AuditEvent(Base):
     entity_type: Mapped[str] = mapped_column(String(128), nullable=False)
     entity_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
     metadata_json: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    # Denormalized from the entity/metadata at write time so a case's history is one index scan.
+    case_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
 
     actor: Mapped[User | None] = relationship("User")
 
+    @staticmethod
+    def case_id_for(
+        entity_type: str, entity_id: str | None, metadata_json: dict[str, Any] | None
+    ) -> int | None:
+        raw_case_id: Any = None
+        if entity_type in {"case", "case_denial"}:
+            raw_case_id = entity_id
+        elif isinstance(metadata_json, dict):
+            raw_case_id = metadata_json.get("case_id")
+        try:
+            return int(raw_case_id) if raw_case_id is not None else None
+        except (TypeError, ValueError):
+            return None
+
+
+class AuditArchive(Base):
+    __tablename__ = "audit_archives"
+    __table_args__ = (Index("ix_audit_archives_org_last_event", "org_id", "last_event_at"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    org_id: Mapped[int] = mapped_column(ForeignKey("orgs.id"), nullable=False, index=True)
+    period: Mapped[str] = mapped_column(String(7), nullable=False)
+    storage_path: Mapped[str] = mapped_column(String(1024), nullable=False)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_event_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_event_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # False until the segment's case ids are recorded in ``audit_archive_cases``.
+    cases_indexed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
+
+
+class AuditArchiveCase(Base):
+    """One case with events in an archived segment, so case reads skip unrelated segments."""
+
+    __tablename__ = "audit_archive_cases"
+    __table_args__ = (Index("ix_audit_archive_cases_case_archive", "case_id", "archive_id"),)
+
+    archive_id: Mapped[int] = mapped_column(ForeignKey("audit_archives.id"), primary_key=True)
+    case_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+
+class FhirResponseCacheEntry(Base):
+    __tablename__ = "fhir_response_cache"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    cache_key: Mapped[str] = mapped_column(String(64), nullable=False, unique=True, index=True)
+    url: Mapped[str] = mapped_column(Text, nullable=False)
+    resource_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    content_type: Mapped[str] = mapped_column(String(128), nullable=False)
+    etag: Mapped[str | None] = mapped_column(String(256), nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Epoch seconds, so every worker compares freshness against the same wall clock.
+    expires_at: Mapped[float] = mapped_column(Float, nullable=False)
+    stored_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utc_now, onupdate=utc_now, index=True
+    )
+
+
+class FhirResource(Base):
+    """Local copy of a FHIR resource loaded by bulk ``$export`` ingestion."""
+
+    __tablename__ = "fhir_resources"
+    __table_args__ = (
+        UniqueConstraint("resource_type", "resource_id", name="uq_fhir_resources_type_id"),
+        Index("ix_fhir_resources_patient_type", "patient_id", "resource_type"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    resource_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    resource_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    patient_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    resource_json: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    import_id: Mapped[int | None] = mapped_column(
+        ForeignKey("fhir_bulk_imports.id"), nullable=True, index=True
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utc_now, onupdate=utc_now
+    )
+
+
+class StagedFhirResource(Base):
+    """A resource downloaded by a running import, swapped into ``fhir_resources`` on success."""
+
+    __tablename__ = "fhir_resource_staging"
+    __table_args__ = (
+        UniqueConstraint(
+            "import_id", "resource_type", "resource_id", name="uq_fhir_resource_staging_key"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    import_id: Mapped[int] = mapped_column(ForeignKey("fhir_bulk_imports.id"), nullable=False)
+    resource_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    resource_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    patient_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    resource_json: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    staged_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
+
+
+class FhirBulkImport(Base):
+    __tablename__ = "fhir_bulk_imports"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default="running")
+    status_url: Mapped[str | None] = mapped_column(Text, nullable=True)
+    transaction_time: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    resource_counts_json: Mapped[dict[str, int]] = mapped_column(JSON, nullable=False, default=dict)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
 
 class Case(Base):
     __tablename__ = "cases"
@@ -82,6 +213,12 @@ class Case(Base):
     payer_label: Mapped[str] = mapped_column(String(255), nullable=False)
     service_line_template_id: Mapped[str] = mapped_column(String(128), nullable=False)
     status: Mapped[str] = mapped_column(String(64), nullable=False, default="draft")
+    patient_verification: Mapped[str] = mapped_column(
+        String(32), nullable=False, default="verified"
+    )
+    patient_verified_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     created_by_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
     updated_at: Mapped[datetime] = mapped_column(
@@ -170,6 +307,10 @@ class CaseDenial(Base):
 
 class CaseExport(Base):
     __tablename__ = "case_exports"
+    __table_args__ = (
+        Index("ix_case_exports_case_packet_sha256", "case_id", "packet_sha256"),
+        Index("ix_case_exports_case_created_id", "case_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     case_id: Mapped[int] = mapped_column(ForeignKey("cases.id"), nullable=False, index=True)
@@ -177,6 +318,14 @@ class CaseExport(Base):
     export_type: Mapped[str] = mapped_column(String(32), nullable=False, default="initial")
     packet_json: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
     metrics_json: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
-    pdf_base64: Mapped[str] = mapped_column(Text, nullable=False)
+    packet_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Legacy inline PDF; emptied once the file has moved to the export store.
+    pdf_base64: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    pdf_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    pdf_size_bytes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    pdf_page_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="completed")
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_by_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
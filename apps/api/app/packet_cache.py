@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from app.config import Settings, get_settings
+
+
+@dataclass(frozen=True)
+class PacketFragment:
+    # ``value`` is already canonical (see ``stable_json``) and shared between packets, so
+    # callers must not mutate it; ``json_bytes`` is its ``canonical_json_bytes`` encoding.
+    value: Any
+    json_bytes: bytes
+
+
+class PacketFragmentCache:
+    """Size-bounded LRU of packet fragments keyed by the versions of their source rows.
+
+    Keys carry the row ids and ``updated_at`` (or ``created_at`` for rows that never change),
+    so an edited row simply misses and its old fragment ages out.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, PacketFragment] = OrderedDict()
+        self._settings: Settings | None = None
+        self._hits = 0
+        self._misses = 0
+
+    def _current_settings(self) -> Settings:
+        settings = get_settings()
+        if settings is not self._settings:
+            # Possibly another database: ids in the keys may now name different rows.
+            self._entries.clear()
+            self._settings = settings
+        return settings
+
+    def get(self, key: Hashable) -> PacketFragment | None:
+        with self._lock:
+            self._current_settings()
+            fragment = self._entries.get(key)
+            if fragment is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return fragment
+
+    def put(self, key: Hashable, fragment: PacketFragment) -> None:
+        with self._lock:
+            max_entries = self._current_settings().packet_fragment_cache_max_entries
+            if max_entries <= 0:
+                return
+
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            settings = self._current_settings()
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": settings.packet_fragment_cache_max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+            }
+
+
+_cache = PacketFragmentCache()
+
+
+def get_packet_fragment_cache() -> PacketFragmentCache:
+    return _cache
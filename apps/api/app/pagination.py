@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+from app.audit_archive import as_utc
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{as_utc(created_at).isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at_text, row_id_text = raw.split("|", 1)
+        return as_utc(datetime.fromisoformat(created_at_text)), int(row_id_text)
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
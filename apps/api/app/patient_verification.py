@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from sqlalchemy.orm import Session
+
+from app.audit_service import record_audit_event
+from app.db import get_session_local
+from app.fhir_bulk import local_patient, local_store_enabled
+from app.fhir_client import FhirClient, FhirClientError, demo_patient_by_id
+from app.models import Case, utc_now
+
+PENDING = "pending"
+VERIFIED = "verified"
+NOT_FOUND = "not_found"
+UNAVAILABLE = "unavailable"
+# States a later attempt may still settle: never checked, or FHIR could not be reached.
+UNSETTLED = (PENDING, UNAVAILABLE)
+
+
+def check_patient(db: Session, patient_id: str) -> str:
+    """Look the patient up in the local store, then live FHIR (through the response cache)."""
+    if local_store_enabled(db) and local_patient(db, patient_id) is not None:
+        return VERIFIED
+
+    try:
+        FhirClient().get_patient(patient_id)
+    except FhirClientError as exc:
+        if demo_patient_by_id(patient_id) is not None:
+            return VERIFIED
+        if "status=404" in str(exc):
+            return NOT_FOUND
+        return UNAVAILABLE
+    return VERIFIED
+
+
+def verify_case_patient(case_id: int) -> None:
+    """Background task: resolve an unsettled case's patient and audit the outcome."""
+    db = get_session_local()()
+    try:
+        case = db.get(Case, case_id)
+        if case is None or case.patient_verification not in UNSETTLED:
+            return
+
+        result = check_patient(db, case.patient_id)
+        if result == case.patient_verification:
+            # Still unavailable: nothing changed, so there is nothing to record.
+            return
+        case.patient_verification = result
+        case.patient_verified_at = utc_now()
+        record_audit_event(
+            db,
+            org_id=case.org_id,
+            user_id=case.created_by_user_id,
+            action="case_patient_verification",
+            entity_type="case",
+            entity_id=str(case.id),
+            metadata_json={"patient_id": case.patient_id, "result": result},
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def resume_patient_verifications() -> int:
+    """Re-check cases left ``pending`` by a previous process or ``unavailable`` by an outage."""
+    db = get_session_local()()
+    try:
+        case_ids = [
+            case_id
+            for (case_id,) in db.query(Case.id)
+            .filter(Case.patient_verification.in_(UNSETTLED))
+            .order_by(Case.id.asc())
+            .all()
+        ]
+    finally:
+        db.close()
+
+    for case_id in case_ids:
+        verify_case_patient(case_id)
+    return len(case_ids)
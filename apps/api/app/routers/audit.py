@@ -1,11 +1,19 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
+from app.audit_archive import as_utc, hot_cutoff, search_archived_events
+from app.audit_service import get_audit_sink
+from app.config import get_settings
 from app.db import get_db
 from app.deps import get_current_user
 from app.models import AuditEvent, User
+from app.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from app.schemas import AuditEventResponse
 
 router = APIRouter(prefix="/audit-events", tags=["audit"])
@@ -13,32 +21,120 @@ router = APIRouter(prefix="/audit-events", tags=["audit"])
 
 @router.get("", response_model=list[AuditEventResponse])
 def list_audit_events(
+    response: Response,
     limit: int = 50,
+    cursor: str | None = None,
+    action: str | None = None,
+    entity_type: str | None = None,
+    entity_id: str | None = None,
+    actor_id: int | None = None,
+    actor_email: str | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    include_archived: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> list[AuditEventResponse]:
-    events = (
-        db.query(AuditEvent)
+    page_size = min(max(limit, 1), MAX_PAGE_SIZE)
+    get_audit_sink().drain()
+    if created_after is not None:
+        created_after = as_utc(created_after)
+    if created_before is not None:
+        created_before = as_utc(created_before)
+    cursor_key = decode_cursor(cursor) if cursor else None
+
+    query = (
+        db.query(AuditEvent, User.email)
+        .outerjoin(User, User.id == AuditEvent.user_id)
         .filter(AuditEvent.org_id == current_user.org_id)
-        .order_by(AuditEvent.created_at.desc())
-        .limit(min(max(limit, 1), 200))
+    )
+    if action:
+        query = query.filter(AuditEvent.action == action)
+    if entity_type:
+        query = query.filter(AuditEvent.entity_type == entity_type)
+    if entity_id:
+        query = query.filter(AuditEvent.entity_id == entity_id)
+    if actor_id is not None:
+        query = query.filter(AuditEvent.user_id == actor_id)
+    if actor_email:
+        query = query.filter(User.email == actor_email.lower())
+    if created_after is not None:
+        query = query.filter(AuditEvent.created_at >= created_after)
+    if created_before is not None:
+        query = query.filter(AuditEvent.created_at < created_before)
+    if cursor_key is not None:
+        cursor_created_at, cursor_id = cursor_key
+        query = query.filter(
+            or_(
+                AuditEvent.created_at < cursor_created_at,
+                and_(AuditEvent.created_at == cursor_created_at, AuditEvent.id < cursor_id),
+            )
+        )
+
+    rows = (
+        query.order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc())
+        .limit(page_size + 1)
         .all()
     )
+    items = [
+        {
+            "id": event.id,
+            "action": event.action,
+            "entity_type": event.entity_type,
+            "entity_id": event.entity_id,
+            "actor_email": email,
+            "metadata": event.metadata_json,
+            "created_at": as_utc(event.created_at),
+        }
+        for event, email in rows
+    ]
 
-    email_by_user_id = {
-        user.id: user.email
-        for user in db.query(User).filter(User.org_id == current_user.org_id).all()
-    }
+    # Searching archived months decompresses their segments, so it happens only on request or
+    # once the page reaches back past the hot window the archival job leaves in the table.
+    upper = min(
+        (bound for bound in (created_before, cursor_key and cursor_key[0]) if bound is not None),
+        default=None,
+    )
+    cutoff = hot_cutoff(datetime.now(timezone.utc), get_settings().audit_hot_months)
+    reads_archive = include_archived or (upper is not None and upper <= cutoff)
+    if reads_archive and len(items) <= page_size:
+        # Live rows are exhausted; continue into archived months.
+        def matches(fields: dict[str, Any]) -> bool:
+            return (
+                (not action or fields["action"] == action)
+                and (not entity_type or fields["entity_type"] == entity_type)
+                and (not entity_id or fields["entity_id"] == entity_id)
+                and (actor_id is None or fields["user_id"] == actor_id)
+                and (not actor_email or fields["actor_email"] == actor_email.lower())
+            )
+
+        items.extend(
+            search_archived_events(
+                db,
+                current_user.org_id,
+                limit=page_size + 1 - len(items),
+                predicate=matches,
+                created_after=created_after,
+                created_before=created_before,
+                before=((items[-1]["created_at"], items[-1]["id"]) if items else cursor_key),
+            )
+        )
+
+    if len(items) > page_size:
+        items = items[:page_size]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            items[-1]["created_at"], items[-1]["id"]
+        )
 
     return [
         AuditEventResponse(
-            id=event.id,
-            action=event.action,
-            entity_type=event.entity_type,
-            entity_id=event.entity_id,
-            actor_email=email_by_user_id.get(event.user_id),
-            metadata=event.metadata_json,
-            created_at=event.created_at,
+            id=item["id"],
+            action=item["action"],
+            entity_type=item["entity_type"],
+            entity_id=item["entity_id"],
+            actor_email=item["actor_email"],
+            metadata=item["metadata"],
+            created_at=item["created_at"],
         )
-        for event in events
+        for item in items
     ]
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+from collections.abc import Awaitable
 from datetime import datetime, timezone
+from typing import TypeVar
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from app.audit_service import record_audit_event
+from app.auth_cache import get_auth_user_cache
 from app.db import get_db
 from app.deps import get_current_user
-from app.models import AuditEvent, Org, Setting, User
+from app.models import Org, Setting, User
 from app.schemas import (
     AuthResponse,
     BootstrapRequest,
@@ -16,10 +21,17 @@ from app.schemas import (
     UserCreateRequest,
     UserResponse,
 )
-from app.security import create_access_token, hash_password, verify_password
+from app.security import (
+    PasswordHashingBusy,
+    create_access_token,
+    hash_password_async,
+    verify_password_async,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+T = TypeVar("T")
+
 
 @router.get("/bootstrap-status", response_model=BootstrapStatusResponse)
 def bootstrap_status(db: Session = Depends(get_db)) -> BootstrapStatusResponse:
@@ -27,14 +39,44 @@ def bootstrap_status(db: Session = Depends(get_db)) -> BootstrapStatusResponse:
     return BootstrapStatusResponse(needs_bootstrap=user_count == 0)
 
 
-@router.post("/bootstrap", response_model=AuthResponse)
-def bootstrap_admin(payload: BootstrapRequest, db: Session = Depends(get_db)) -> AuthResponse:
+def _release_connection(db: Session) -> None:
+    # End the read transaction so the pooled connection is not held while bcrypt runs.
+    # Commit (not rollback) keeps loaded instances usable with expire_on_commit=False.
+    db.commit()
+
+
+def _ensure_bootstrap_pending(db: Session) -> None:
     if db.query(User).count() > 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bootstrap already completed.",
         )
 
+
+def _check_bootstrap_pending(db: Session) -> None:
+    try:
+        _ensure_bootstrap_pending(db)
+    finally:
+        _release_connection(db)
+
+
+async def _password_work_or_503(work: Awaitable[T]) -> T:
+    try:
+        return await work
+    except PasswordHashingBusy as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, retry shortly",
+            headers={"Retry-After": "1"},
+        ) from exc
+
+
+def _create_bootstrap_admin(
+    db: Session, payload: BootstrapRequest, password_hash: str
+) -> AuthResponse:
+    # Re-check: another bootstrap may have completed while the password was hashing.
+    _ensure_bootstrap_pending(db)
+
     org = Org(name=payload.organization_name.strip())
     db.add(org)
     db.flush()
@@ -44,7 +86,7 @@ def bootstrap_admin(payload: BootstrapRequest, db: Session = Depends(get_db)) ->
         email=payload.email.lower(),
         full_name=payload.full_name.strip(),
         role="admin",
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
         last_login_at=datetime.now(timezone.utc),
     )
     db.add(admin)
@@ -53,15 +95,14 @@ def bootstrap_admin(payload: BootstrapRequest, db: Session = Depends(get_db)) ->
     settings = Setting(org_id=org.id, deployment_mode="standalone", updated_by_user_id=admin.id)
     db.add(settings)
 
-    db.add(
-        AuditEvent(
-            org_id=org.id,
-            user_id=admin.id,
-            action="login",
-            entity_type="user",
-            entity_id=str(admin.id),
-            metadata_json={"reason": "bootstrap"},
-        )
+    record_audit_event(
+        db,
+        org_id=org.id,
+        user_id=admin.id,
+        action="login",
+        entity_type="user",
+        entity_id=str(admin.id),
+        metadata_json={"reason": "bootstrap"},
     )
     db.commit()
 
@@ -78,22 +119,29 @@ def bootstrap_admin(payload: BootstrapRequest, db: Session = Depends(get_db)) ->
     )
 
 
-@router.post("/login", response_model=AuthResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> AuthResponse:
-    user = db.query(User).filter(User.email == payload.email.lower()).first()
-    if user is None or not verify_password(payload.password, user.password_hash):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+@router.post("/bootstrap", response_model=AuthResponse)
+async def bootstrap_admin(payload: BootstrapRequest, db: Session = Depends(get_db)) -> AuthResponse:
+    await run_in_threadpool(_check_bootstrap_pending, db)
+    password_hash = await _password_work_or_503(hash_password_async(payload.password))
+    return await run_in_threadpool(_create_bootstrap_admin, db, payload, password_hash)
+
+
+def _find_user_by_email(db: Session, email: str) -> User | None:
+    user = db.query(User).filter(User.email == email.lower()).first()
+    _release_connection(db)
+    return user
 
+
+def _complete_login(db: Session, user: User) -> AuthResponse:
     user.last_login_at = datetime.now(timezone.utc)
-    db.add(
-        AuditEvent(
-            org_id=user.org_id,
-            user_id=user.id,
-            action="login",
-            entity_type="user",
-            entity_id=str(user.id),
-            metadata_json={"email": user.email},
-        )
+    record_audit_event(
+        db,
+        org_id=user.org_id,
+        user_id=user.id,
+        action="login",
+        entity_type="user",
+        entity_id=str(user.id),
+        metadata_json={"email": user.email},
     )
     db.commit()
 
@@ -111,6 +159,19 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)) -> AuthResponse:
     )
 
 
+@router.post("/login", response_model=AuthResponse)
+async def login(payload: LoginRequest, db: Session = Depends(get_db)) -> AuthResponse:
+    # DB work runs on the request threadpool and bcrypt on its own bounded pool, so a
+    # login storm cannot hold every request thread while hashing.
+    user = await run_in_threadpool(_find_user_by_email, db, payload.email)
+    if user is None or not await _password_work_or_503(
+        verify_password_async(payload.password, user.password_hash)
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+    return await run_in_threadpool(_complete_login, db, user)
+
+
 @router.get("/me", response_model=UserResponse)
 def me(current_user: User = Depends(get_current_user)) -> UserResponse:
     return UserResponse(
@@ -122,12 +183,17 @@ def me(current_user: User = Depends(get_current_user)) -> UserResponse:
     )
 
 
-@router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(
-    payload: UserCreateRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> UserResponse:
+@router.get("/cache-status")
+def auth_cache_status(current_user: User = Depends(get_current_user)) -> dict[str, object]:
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can view authentication cache status",
+        )
+    return get_auth_user_cache().stats()
+
+
+def _check_new_user_allowed(db: Session, payload: UserCreateRequest, current_user: User) -> None:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -135,31 +201,35 @@ def create_user(
         )
 
     existing = db.query(User).filter(User.email == payload.email.lower()).first()
+    _release_connection(db)
     if existing is not None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="A user with this email already exists",
         )
 
+
+def _insert_user(
+    db: Session, payload: UserCreateRequest, current_user: User, password_hash: str
+) -> UserResponse:
     user = User(
         org_id=current_user.org_id,
         email=payload.email.lower(),
         full_name=payload.full_name.strip(),
         role=payload.role,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
     )
     db.add(user)
     db.flush()
 
-    db.add(
-        AuditEvent(
-            org_id=current_user.org_id,
-            user_id=current_user.id,
-            action="user_create",
-            entity_type="user",
-            entity_id=str(user.id),
-            metadata_json={"created_email": user.email, "role": user.role},
-        )
+    record_audit_event(
+        db,
+        org_id=current_user.org_id,
+        user_id=current_user.id,
+        action="user_create",
+        entity_type="user",
+        entity_id=str(user.id),
+        metadata_json={"created_email": user.email, "role": user.role},
     )
     db.commit()
     db.refresh(user)
@@ -171,3 +241,14 @@ def create_user(
         full_name=user.full_name,
         role=user.role,
     )
+
+
+@router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def create_user(
+    payload: UserCreateRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> UserResponse:
+    await run_in_threadpool(_check_new_user_allowed, db, payload, current_user)
+    password_hash = await _password_work_or_503(hash_password_async(payload.password))
+    return await run_in_threadpool(_insert_user, db, payload, current_user, password_hash)
@@ -3,16 +3,17 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
 from sqlalchemy.orm import Session
 
+from app.audit_service import record_audit_event
 from app.config import get_settings
 from app.document_service import detect_relevant_snippets, extract_text, save_document_bytes
 from app.db import get_db
 from app.deps import get_current_user
-from app.fhir_client import FhirClient, FhirClientError, demo_patient_by_id
 from app.model_service import ModelDocument, get_model_service
-from app.models import AuditEvent, Case, CaseAutofill, CaseDocument, CaseQuestionnaire, User
+from app.models import Case, CaseAutofill, CaseDocument, CaseQuestionnaire, User, utc_now
+from app.patient_verification import NOT_FOUND, PENDING, check_patient, verify_case_patient
 from app.schemas import (
     AutofillFieldFillResponse,
     AutofillRunResponse,
@@ -71,6 +72,7 @@ def _case_response(case: Case) -> CaseResponse:
         payer_label=case.payer_label,
         service_line_template_id=case.service_line_template_id,
         status=case.status,
+        patient_verification=case.patient_verification,
         created_at=case.created_at,
         updated_at=case.updated_at,
     )
@@ -306,21 +308,23 @@ def get_case(
 @router.post("", response_model=CaseResponse, status_code=status.HTTP_201_CREATED)
 def create_case(
     payload: CaseCreateRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> CaseResponse:
     template_id = payload.service_line_template_id.strip()
     _get_template_or_400(template_id)
 
-    fhir = FhirClient()
-    try:
-        fhir.get_patient(payload.patient_id)
-    except FhirClientError as exc:
-        if demo_patient_by_id(payload.patient_id) is None and "status=404" in str(exc):
+    if get_settings().patient_verification_mode == "async":
+        # Checked after the response is sent, so creating a case is only a local write.
+        verification = PENDING
+    else:
+        verification = check_patient(db, payload.patient_id)
+        if verification == NOT_FOUND:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Patient not found in FHIR sandbox",
-            ) from exc
+            )
 
     case = Case(
         org_id=current_user.org_id,
@@ -328,31 +332,36 @@ def create_case(
         payer_label=payload.payer_label.strip(),
         service_line_template_id=template_id,
         status="draft",
+        patient_verification=verification,
+        patient_verified_at=None if verification == PENDING else utc_now(),
         created_by_user_id=current_user.id,
     )
 
     db.add(case)
     db.flush()
 
-    db.add(
-        AuditEvent(
-            org_id=current_user.org_id,
-            user_id=current_user.id,
-            action="case_create",
-            entity_type="case",
-            entity_id=str(case.id),
-            metadata_json={
-                "patient_id": case.patient_id,
-                "payer_label": case.payer_label,
-                "service_line_template_id": case.service_line_template_id,
-                "status": case.status,
-            },
-        )
+    record_audit_event(
+        db,
+        org_id=current_user.org_id,
+        user_id=current_user.id,
+        action="case_create",
+        entity_type="case",
+        entity_id=str(case.id),
+        metadata_json={
+            "patient_id": case.patient_id,
+            "payer_label": case.payer_label,
+            "service_line_template_id": case.service_line_template_id,
+            "status": case.status,
+            "patient_verification": verification,
+        },
     )
 
     db.commit()
     db.refresh(case)
 
+    if verification == PENDING:
+        background_tasks.add_task(verify_case_patient, case.id)
+
     return _case_response(case)
 
 
@@ -367,15 +376,14 @@ def update_case_status(
     case.status = payload.status
     case.updated_at = datetime.now(timezone.utc)
 
-    db.add(
-        AuditEvent(
-            org_id=current_user.org_id,
-            user_id=current_user.id,
-            action="case_status_change",
-            entity_type="case",
-            entity_id=str(case.id),
-            metadata_json={"status": payload.status},
-        )
+    record_audit_event(
+        db,
+        org_id=current_user.org_id,
+        user_id=current_user.id,
+        action="case_status_change",
+        entity_type="case",
+        entity_id=str(case.id),
+        metadata_json={"status": payload.status},
     )
 
     db.commit()
@@ -430,15 +438,14 @@ def update_case_questionnaire(
     questionnaire.clinician_attested_by_user_id = None
     questionnaire.clinician_attested_at = None
 
-    db.add(
-        AuditEvent(
-            org_id=current_user.org_id,
-            user_id=current_user.id,
-            action="questionnaire_save",
-            entity_type="case",
-            entity_id=str(case.id),
-            metadata_json={"case_id": case.id, "template_id": questionnaire.template_id},
-        )
+    record_audit_event(
+        db,
+        org_id=current_user.org_id,
+        user_id=current_user.id,
+        action="questionnaire_save",
+        entity_type="case",
+        entity_id=str(case.id),
+        metadata_json={"case_id": case.id, "template_id": questionnaire.template_id},
     )
 
     db.commit()
@@ -475,19 +482,18 @@ def attest_case_questionnaire(
     questionnaire.clinician_attested_at = datetime.now(timezone.utc)
     questionnaire.updated_at = datetime.now(timezone.utc)
 
-    db.add(
-        AuditEvent(
-            org_id=current_user.org_id,
-            user_id=current_user.id,
-            action="case_attested",
-            entity_type="case",
-            entity_id=str(case.id),
-            metadata_json={
-                "case_id": case.id,
-                "template_id": questionnaire.template_id,
-                "attested_by": current_user.email,
-            },
-        )
+    record_audit_event(
+        db,
+        org_id=current_user.org_id,
+        user_id=current_user.id,
+        action="case_attested",
+        entity_type="case",
+        entity_id=str(case.id),
+        metadata_json={
+            "case_id": case.id,
+            "template_id": questionnaire.template_id,
+            "attested_by": current_user.email,
+        },
     )
 
     db.commit()
@@ -590,15 +596,14 @@ async def upload_case_document(
         for item in snippets
     ]
 
-    db.add(
-        AuditEvent(
-            org_id=current_user.org_id,
-            user_id=current_user.id,
-            action="document_upload",
-            entity_type="case_document",
-            entity_id=str(document.id),
-            metadata_json={"case_id": case_id, "filename": filename, "content_type": content_type},
-        )
+    record_audit_event(
+        db,
+        org_id=current_user.org_id,
+        user_id=current_user.id,
+        action="document_upload",
+        entity_type="case_document",
+        entity_id=str(document.id),
+        metadata_json={"case_id": case_id, "filename": filename, "content_type": content_type},
     )
 
     db.commit()
@@ -715,19 +720,18 @@ def run_case_autofill(
     questionnaire.clinician_attested_by_user_id = None
     questionnaire.clinician_attested_at = None
 
-    db.add(
-        AuditEvent(
-            org_id=current_user.org_id,
-            user_id=current_user.id,
-            action="autofill_run",
-            entity_type="case",
-            entity_id=str(case.id),
-            metadata_json={
-                "case_id": case.id,
-                "num_documents": len(documents),
-                "num_fields": len(saved_fills),
-            },
-        )
+    record_audit_event(
+        db,
+        org_id=current_user.org_id,
+        user_id=current_user.id,
+        action="autofill_run",
+        entity_type="case",
+        entity_id=str(case.id),
+        metadata_json={
+            "case_id": case.id,
+            "num_documents": len(documents),
+            "num_fields": len(saved_fills),
+        },
     )
 
     db.commit()
@@ -5,11 +5,12 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from sqlalchemy.orm import Session
 
+from app.audit_service import record_audit_event
 from app.config import get_settings
 from app.db import get_db
 from app.denial_service import build_appeal_letter, build_gap_report, parse_denial_letter
 from app.document_service import extract_text, save_document_bytes
-from app.models import AuditEvent, Case, CaseDenial, CaseDocument, CaseQuestionnaire, User
+from app.models import Case, CaseDenial, CaseDocument, CaseQuestionnaire, User
 from app.routers.cases import _citation_from_dict, _normalized_content_type, _validate_upload_type
 from app.schemas import CitationResponse, DenialAnalysisResponse, GapReportItemResponse
 from app.template_registry import default_answers, get_service_line_template
@@ -180,20 +181,19 @@ async def upload_denial_letter(
     denial.updated_at = datetime.now(timezone.utc)
     db.add(denial)
 
-    db.add(
-        AuditEvent(
-            org_id=current_user.org_id,
-            user_id=current_user.id,
-            action="denial_upload",
-            entity_type="case_denial",
-            entity_id=str(case.id),
-            metadata_json={
-                "case_id": case.id,
-                "denial_document_id": document.id,
-                "reason_count": len(parsed.reasons),
-                "missing_item_count": len(parsed.missing_items),
-            },
-        )
+    record_audit_event(
+        db,
+        org_id=current_user.org_id,
+        user_id=current_user.id,
+        action="denial_upload",
+        entity_type="case_denial",
+        entity_id=str(case.id),
+        metadata_json={
+            "case_id": case.id,
+            "denial_document_id": document.id,
+            "reason_count": len(parsed.reasons),
+            "missing_item_count": len(parsed.missing_items),
+        },
     )
 
     db.commit()
@@ -1,21 +1,42 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
+import json
+import logging
+import time
+import zipfile
+from collections.abc import Iterator
+from concurrent.futures import Future, as_completed
 from datetime import datetime, timezone
+from functools import partial
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer, load_only
 
-from app.db import get_db
+from app.audit_archive import (
+    archived_event_model,
+    as_utc,
+    iter_archived_events,
+)
+from app.audit_service import get_audit_sink, record_audit_event
+from app.db import get_db, get_session_local
 from app.denial_service import build_appeal_letter
 from app.deps import get_current_user
+from app.config import get_settings
 from app.eval_service import compute_case_metrics
+from app.export_jobs import COMPLETED, FAILED, PENDING, submit_export_render
 from app.export_service import (
-    build_packet_json,
-    build_packet_pdf_bytes,
+    assemble_packet,
     encode_pdf_base64,
+    render_packet_pdf,
     stable_json,
 )
+from app.export_storage import export_pdf_path, read_export_pdf, store_rendered_pdf
 from app.models import (
     AuditEvent,
     Case,
@@ -26,11 +47,23 @@ from app.models import (
     CaseQuestionnaire,
     User,
 )
-from app.schemas import PacketExportListItemResponse, PacketExportRequest, PacketExportResponse
+from app.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.schemas import (
+    BATCH_EXPORT_MAX_CASES,
+    PacketBatchExportRequest,
+    PacketExportListItemResponse,
+    PacketExportRequest,
+    PacketExportResponse,
+    PacketExportStatusResponse,
+)
 from app.template_registry import get_service_line_template, missing_required_fields
 
 router = APIRouter(prefix="/cases", tags=["exports"])
 
+_STATUS_POLL_INTERVAL_SECONDS = 0.25
+
+logger = logging.getLogger(__name__)
+
 
 def _get_case_or_404(db: Session, case_id: int, org_id: int) -> Case:
     case = db.query(Case).filter(Case.id == case_id, Case.org_id == org_id).first()
@@ -54,54 +87,69 @@ def _get_questionnaire_or_404(db: Session, case_id: int, org_id: int) -> CaseQue
 
 
 def _load_case_audit_events(db: Session, case: Case, org_id: int) -> list[AuditEvent]:
-    document_entity_ids = [
-        str(document_id)
-        for (document_id,) in db.query(CaseDocument.id)
-        .filter(CaseDocument.case_id == case.id, CaseDocument.org_id == org_id)
-        .all()
-    ]
-    export_entity_ids = [
-        str(export_id)
-        for (export_id,) in db.query(CaseExport.id)
-        .filter(CaseExport.case_id == case.id, CaseExport.org_id == org_id)
-        .all()
-    ]
+    # Buffered audit events must be visible to the packet's audit summary.
+    get_audit_sink().drain()
 
-    filters = [
-        and_(AuditEvent.entity_type == "case", AuditEvent.entity_id == str(case.id)),
-        and_(AuditEvent.entity_type == "case_denial", AuditEvent.entity_id == str(case.id)),
-    ]
-    if document_entity_ids:
-        filters.append(
-            and_(
-                AuditEvent.entity_type == "case_document",
-                AuditEvent.entity_id.in_(document_entity_ids),
-            )
-        )
-    if export_entity_ids:
-        filters.append(
-            and_(
-                AuditEvent.entity_type == "case_export",
-                AuditEvent.entity_id.in_(export_entity_ids),
-            )
-        )
-
-    return (
+    events = (
         db.query(AuditEvent)
-        .filter(AuditEvent.org_id == org_id, or_(*filters))
+        .options(defer(AuditEvent.metadata_json))
+        .filter(AuditEvent.org_id == org_id, AuditEvent.case_id == case.id)
         .order_by(AuditEvent.created_at.asc(), AuditEvent.id.asc())
         .all()
     )
 
+    # Long-lived cases may have history in archived months; only segments whose case
+    # index lists this case are opened.
+    archived = [
+        archived_event_model(fields)
+        for fields in iter_archived_events(
+            db, org_id, created_after=as_utc(case.created_at), case_id=case.id
+        )
+    ]
+    if not archived:
+        return events
+
+    return sorted([*archived, *events], key=lambda event: (as_utc(event.created_at), event.id))
+
 
 @router.post("/{case_id}/exports/generate", response_model=PacketExportResponse)
 def generate_case_export(
     case_id: int,
     payload: PacketExportRequest,
+    response: Response,
+    include_pdf_base64: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> PacketExportResponse:
     case = _get_case_or_404(db, case_id, current_user.org_id)
+    render_in_background = (payload.mode or get_settings().export_mode) == "async"
+    export_record, reused = _create_case_export(
+        db,
+        case,
+        payload.export_type,
+        current_user,
+        render_in_background=render_in_background,
+    )
+    if export_record.status == PENDING:
+        if not reused:
+            submit_export_render(export_record.id)
+        response.status_code = status.HTTP_202_ACCEPTED
+    return _export_response(export_record, include_pdf_base64, reused=reused)
+
+
+def _create_case_export(
+    db: Session,
+    case: Case,
+    export_type: str,
+    current_user: User,
+    *,
+    render_in_background: bool,
+) -> tuple[CaseExport, bool]:
+    """Assemble the case's packet and record its export; returns ``(export, reused)``.
+
+    Raises ``HTTPException`` when the case is not ready to export. Background exports come back
+    pending and are not queued here.
+    """
     questionnaire = _get_questionnaire_or_404(db, case.id, current_user.org_id)
     template = get_service_line_template(case.service_line_template_id)
     if template is None:
@@ -128,13 +176,13 @@ def generate_case_export(
         .filter(CaseDenial.case_id == case.id, CaseDenial.org_id == current_user.org_id)
         .first()
     )
-    if payload.export_type == "appeal" and denial is None:
+    if export_type == "appeal" and denial is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Appeal export requires an uploaded denial letter",
         )
 
-    if payload.export_type == "appeal" and denial is not None:
+    if export_type == "appeal" and denial is not None:
         refreshed_appeal_draft = build_appeal_letter(
             case_id=case.id,
             payer_label=case.payer_label,
@@ -151,8 +199,18 @@ def generate_case_export(
             denial.updated_at = datetime.now(timezone.utc)
             db.add(denial)
 
+    # Extracted text is never exported, and snippets are only needed for uncached documents.
     documents = (
         db.query(CaseDocument)
+        .options(
+            load_only(
+                CaseDocument.id,
+                CaseDocument.filename,
+                CaseDocument.content_type,
+                CaseDocument.document_kind,
+                CaseDocument.created_at,
+            )
+        )
         .filter(CaseDocument.case_id == case.id, CaseDocument.org_id == current_user.org_id)
         .order_by(CaseDocument.id.asc())
         .all()
@@ -170,18 +228,37 @@ def generate_case_export(
     users_by_id = {user.id: user for user in org_users}
 
     created_at = datetime.now(timezone.utc)
-    packet_json = stable_json(
-        build_packet_json(
-            case=case,
-            questionnaire=questionnaire,
-            documents=documents,
-            autofills=autofills,
-            audit_events=audit_events,
-            users_by_id=users_by_id,
-            export_type=payload.export_type,
-            denial=denial if payload.export_type == "appeal" else None,
-        )
+    packet = assemble_packet(
+        case=case,
+        questionnaire=questionnaire,
+        documents=documents,
+        autofills=autofills,
+        audit_events=audit_events,
+        users_by_id=users_by_id,
+        export_type=export_type,
+        denial=denial if export_type == "appeal" else None,
     )
+    packet_json = packet.packet
+    packet_sha256 = packet.content_hash(export_type)
+    existing_export = _find_export_by_packet(db, case, export_type, packet_sha256)
+    if existing_export is not None:
+        # Nothing in the packet changed since that export; skip metrics, render and storage.
+        record_audit_event(
+            db,
+            org_id=current_user.org_id,
+            user_id=current_user.id,
+            action="packet_export_reused",
+            entity_type="case_export",
+            entity_id=str(existing_export.id),
+            metadata_json={
+                "case_id": case.id,
+                "export_id": existing_export.id,
+                "export_type": export_type,
+            },
+        )
+        db.commit()
+        return existing_export, True
+
     metrics_json = stable_json(
         compute_case_metrics(
             case=case,
@@ -192,72 +269,282 @@ def generate_case_export(
             audit_events=audit_events,
         )
     )
-    pdf_base64 = encode_pdf_base64(build_packet_pdf_bytes(packet_json))
-
     export_record = CaseExport(
         case_id=case.id,
         org_id=current_user.org_id,
-        export_type=payload.export_type,
+        export_type=export_type,
         packet_json=packet_json,
         metrics_json=metrics_json,
-        pdf_base64=pdf_base64,
+        packet_sha256=packet_sha256,
         created_by_user_id=current_user.id,
         created_at=created_at,
     )
+    if render_in_background:
+        # The packet is frozen now; a worker renders the PDF from the stored packet_json.
+        export_record.status = PENDING
+    else:
+        export_record.pdf_sha256, export_record.pdf_size_bytes, export_record.pdf_page_count = (
+            store_rendered_pdf(partial(render_packet_pdf, packet_json))
+        )
+        export_record.status = COMPLETED
+        export_record.completed_at = created_at
     db.add(export_record)
     db.flush()
 
-    db.add(
-        AuditEvent(
-            org_id=current_user.org_id,
-            user_id=current_user.id,
-            action="packet_export",
-            entity_type="case_export",
-            entity_id=str(export_record.id),
-            metadata_json={
-                "case_id": case.id,
-                "export_id": export_record.id,
-                "export_type": payload.export_type,
-                "completeness_score": metrics_json.get("completeness_score"),
-            },
-        )
+    record_audit_event(
+        db,
+        org_id=current_user.org_id,
+        user_id=current_user.id,
+        action="packet_export",
+        entity_type="case_export",
+        entity_id=str(export_record.id),
+        metadata_json={
+            "case_id": case.id,
+            "export_id": export_record.id,
+            "export_type": export_type,
+            "completeness_score": metrics_json.get("completeness_score"),
+        },
     )
     db.commit()
-    db.refresh(export_record)
+    return export_record, False
 
-    return PacketExportResponse(
-        export_id=export_record.id,
-        case_id=case.id,
-        export_type=payload.export_type,
-        packet_json=export_record.packet_json,
-        metrics_json=export_record.metrics_json,
-        pdf_base64=export_record.pdf_base64,
-        created_at=export_record.created_at,
+
+def _find_export_by_packet(
+    db: Session, case: Case, export_type: str, packet_sha256: str
+) -> CaseExport | None:
+    return (
+        db.query(CaseExport)
+        .filter(
+            CaseExport.case_id == case.id,
+            CaseExport.org_id == case.org_id,
+            CaseExport.packet_sha256 == packet_sha256,
+            CaseExport.export_type == export_type,
+            CaseExport.status != FAILED,
+        )
+        .order_by(CaseExport.id.desc())
+        .first()
+    )
+
+
+@router.post("/exports/batch", response_class=StreamingResponse)
+def generate_batch_export(
+    payload: PacketBatchExportRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Export many cases as one ZIP, streamed back as each case's PDF finishes rendering.
+
+    Packets are assembled here; new PDFs render in parallel on the export worker pool, so
+    throughput follows ``EXPORT_WORKERS``. Cases that cannot be exported are listed under
+    ``failures`` in the archive's trailing ``manifest.json`` instead of failing the batch.
+    """
+    case_ids, cases = _select_batch_cases(db, payload, current_user.org_id)
+    failures: list[dict[str, Any]] = []
+    jobs: list[tuple[dict[str, Any], dict[str, Any], Future | None]] = []
+    for case_id in case_ids:
+        case = cases.get(case_id)
+        if case is None:
+            failures.append({"case_id": case_id, "error": "Case not found"})
+            continue
+        try:
+            export_record, reused = _create_case_export(
+                db, case, payload.export_type, current_user, render_in_background=True
+            )
+        except HTTPException as exc:
+            db.rollback()
+            failures.append({"case_id": case_id, "error": exc.detail})
+            continue
+        # Queue as we go so rendering overlaps with assembling the remaining packets. A reused
+        # export that is still pending is queued too; the worker skips it once it has settled.
+        render = submit_export_render(export_record.id) if export_record.status == PENDING else None
+        # Plain values: the stream outlives this request's session.
+        entry = {
+            "case_id": case_id,
+            "export_id": export_record.id,
+            "export_type": export_record.export_type,
+            "reused": reused,
+        }
+        jobs.append((entry, export_record.packet_json, render))
+
+    return StreamingResponse(
+        _iter_batch_zip(jobs, failures, current_user.org_id),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="case-exports-{payload.export_type}-'
+                f'{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.zip"'
+            )
+        },
     )
 
 
+def _select_batch_cases(
+    db: Session, payload: PacketBatchExportRequest, org_id: int
+) -> tuple[list[int], dict[int, Case]]:
+    if (payload.case_ids is None) == (payload.filter is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either case_ids or filter",
+        )
+
+    if payload.case_ids is not None:
+        case_ids = list(dict.fromkeys(payload.case_ids))
+        query = db.query(Case).filter(Case.org_id == org_id, Case.id.in_(case_ids))
+    else:
+        query = (
+            db.query(Case)
+            .join(CaseQuestionnaire, CaseQuestionnaire.case_id == Case.id)
+            .filter(Case.org_id == org_id, CaseQuestionnaire.clinician_attested_at.is_not(None))
+        )
+        if payload.filter.status is not None:
+            query = query.filter(Case.status == payload.filter.status)
+        if payload.filter.attested_since is not None:
+            query = query.filter(
+                CaseQuestionnaire.clinician_attested_at >= as_utc(payload.filter.attested_since)
+            )
+        query = query.order_by(Case.id.asc()).limit(BATCH_EXPORT_MAX_CASES + 1)
+
+    cases = {case.id: case for case in query.all()}
+    if payload.case_ids is None:
+        if len(cases) > BATCH_EXPORT_MAX_CASES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Filter matches more than {BATCH_EXPORT_MAX_CASES} cases; narrow it",
+            )
+        case_ids = list(cases)
+    return case_ids, cases
+
+
+class _ZipStreamSink:
+    """Write-only file for ``zipfile``; without ``seek`` it writes data descriptors instead."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_batch_zip(
+    jobs: list[tuple[dict[str, Any], dict[str, Any], Future | None]],
+    failures: list[dict[str, Any]],
+    org_id: int,
+) -> Iterator[bytes]:
+    # Settled exports go first, then the rest in the order their renders finish.
+    renders = {render: (entry, packet) for entry, packet, render in jobs if render is not None}
+    ready = [(entry, packet) for entry, packet, render in jobs if render is None]
+    exported: list[dict[str, Any]] = []
+    sink = _ZipStreamSink()
+    db = get_session_local()()
+    try:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for entry, packet in itertools.chain(ready, _completed_renders(renders)):
+                export_row = _export_status_row(db, entry["case_id"], entry["export_id"], org_id)
+                if export_row is None or export_row.status != COMPLETED:
+                    error = export_row.error if export_row is not None else None
+                    failures.append(
+                        {
+                            "case_id": entry["case_id"],
+                            "export_id": entry["export_id"],
+                            "error": error or "Export did not finish rendering",
+                        }
+                    )
+                    continue
+
+                stem = f"case-{entry['case_id']}/{entry['export_type']}-{entry['export_id']}"
+                archive.write(export_pdf_path(export_row.pdf_sha256), f"{stem}.pdf")
+                archive.writestr(f"{stem}.packet.json", json.dumps(packet, indent=2))
+                exported.append(
+                    {
+                        **entry,
+                        "pdf": f"{stem}.pdf",
+                        "packet": f"{stem}.packet.json",
+                        "pdf_sha256": export_row.pdf_sha256,
+                    }
+                )
+                yield sink.drain()
+
+            archive.writestr(
+                "manifest.json",
+                json.dumps({"exports": exported, "failures": failures}, indent=2),
+            )
+        yield sink.drain()
+    finally:
+        db.close()
+
+
+def _completed_renders(
+    renders: dict[Future, tuple[dict[str, Any], dict[str, Any]]],
+) -> Iterator[tuple[dict[str, Any], dict[str, Any]]]:
+    for render in as_completed(renders):
+        if render.exception() is not None:
+            logger.error("Batch export render crashed", exc_info=render.exception())
+        yield renders[render]
+
+
 @router.get("/{case_id}/exports", response_model=list[PacketExportListItemResponse])
 def list_case_exports(
     case_id: int,
+    response: Response,
+    limit: int = 50,
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> list[PacketExportListItemResponse]:
+    """Newest exports first, ``limit`` per page; the next page's cursor is in ``X-Next-Cursor``."""
+    page_size = min(max(limit, 1), MAX_PAGE_SIZE)
     case = _get_case_or_404(db, case_id, current_user.org_id)
-    exports = (
-        db.query(CaseExport)
-        .filter(CaseExport.case_id == case.id, CaseExport.org_id == current_user.org_id)
-        .order_by(CaseExport.created_at.desc(), CaseExport.id.desc())
+
+    # Only the listed columns: packet_json and legacy pdf_base64 can be megabytes per row.
+    query = db.query(
+        CaseExport.id,
+        CaseExport.export_type,
+        CaseExport.status,
+        CaseExport.metrics_json,
+        CaseExport.pdf_size_bytes,
+        CaseExport.pdf_page_count,
+        CaseExport.created_at,
+    ).filter(CaseExport.case_id == case.id, CaseExport.org_id == current_user.org_id)
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                CaseExport.created_at < cursor_created_at,
+                and_(CaseExport.created_at == cursor_created_at, CaseExport.id < cursor_id),
+            )
+        )
+    rows = (
+        query.order_by(CaseExport.created_at.desc(), CaseExport.id.desc())
+        .limit(page_size + 1)
         .all()
     )
+
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
+
     return [
         PacketExportListItemResponse(
-            export_id=item.id,
+            export_id=row.id,
             case_id=case.id,
-            export_type=item.export_type,  # type: ignore[arg-type]
-            metrics_json=item.metrics_json,
-            created_at=item.created_at,
+            export_type=row.export_type,  # type: ignore[arg-type]
+            status=row.status,  # type: ignore[arg-type]
+            metrics_json=row.metrics_json,
+            pdf_url=f"/cases/{case.id}/exports/{row.id}/pdf",
+            pdf_size_bytes=row.pdf_size_bytes,
+            pdf_page_count=row.pdf_page_count,
+            created_at=row.created_at,
         )
-        for item in exports
+        for row in rows
     ]
 
 
@@ -265,6 +552,7 @@ def list_case_exports(
 def get_case_export(
     case_id: int,
     export_id: int,
+    include_pdf_base64: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> PacketExportResponse:
@@ -281,12 +569,131 @@ def get_case_export(
     if export_record is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found")
 
+    return _export_response(export_record, include_pdf_base64)
+
+
+@router.get("/{case_id}/exports/{export_id}/status", response_model=PacketExportStatusResponse)
+async def get_case_export_status(
+    case_id: int,
+    export_id: int,
+    wait_seconds: float = Query(default=0, ge=0, le=30),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> PacketExportStatusResponse:
+    """Export state; with ``wait_seconds`` the call long-polls until the export leaves pending."""
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        export_row = await run_in_threadpool(
+            _export_status_row, db, case_id, export_id, current_user.org_id
+        )
+        if export_row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found")
+        if export_row.status != PENDING or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(_STATUS_POLL_INTERVAL_SECONDS)
+
+    return PacketExportStatusResponse(
+        export_id=export_id,
+        case_id=case_id,
+        status=export_row.status,
+        error=export_row.error,
+        pdf_url=(
+            f"/cases/{case_id}/exports/{export_id}/pdf" if export_row.status == COMPLETED else None
+        ),
+        created_at=export_row.created_at,
+        completed_at=export_row.completed_at,
+    )
+
+
+def _export_status_row(db: Session, case_id: int, export_id: int, org_id: int):
+    # End the previous read transaction so each poll sees the worker's latest commit.
+    db.rollback()
+    return (
+        db.query(
+            CaseExport.status,
+            CaseExport.error,
+            CaseExport.pdf_sha256,
+            CaseExport.created_at,
+            CaseExport.completed_at,
+        )
+        .filter(
+            CaseExport.id == export_id,
+            CaseExport.case_id == case_id,
+            CaseExport.org_id == org_id,
+        )
+        .first()
+    )
+
+
+@router.get("/{case_id}/exports/{export_id}/pdf", response_class=FileResponse)
+def download_case_export_pdf(
+    case_id: int,
+    export_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    case = _get_case_or_404(db, case_id, current_user.org_id)
+    export_row = (
+        db.query(CaseExport.export_type, CaseExport.status, CaseExport.pdf_sha256)
+        .filter(
+            CaseExport.id == export_id,
+            CaseExport.case_id == case.id,
+            CaseExport.org_id == current_user.org_id,
+        )
+        .first()
+    )
+    if export_row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found")
+    if export_row.status != COMPLETED or export_row.pdf_sha256 is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export PDF is not available (status: {export_row.status})",
+        )
+
+    # Stored PDFs never change, so the content hash is a strong validator.
+    etag = f'"{export_row.pdf_sha256}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = export_pdf_path(export_row.pdf_sha256)
+    if not path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Export PDF is missing from storage"
+        )
+
+    # FileResponse streams the file in chunks and answers Range/If-Range requests.
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=f"case-{case.id}-{export_row.export_type}-{export_id}.pdf",
+        headers=headers,
+    )
+
+
+def _export_response(
+    export_record: CaseExport, include_pdf_base64: bool, *, reused: bool = False
+) -> PacketExportResponse:
+    pdf_sha256 = export_record.pdf_sha256
     return PacketExportResponse(
         export_id=export_record.id,
-        case_id=case.id,
+        case_id=export_record.case_id,
         export_type=export_record.export_type,  # type: ignore[arg-type]
         packet_json=export_record.packet_json,
         metrics_json=export_record.metrics_json,
-        pdf_base64=export_record.pdf_base64,
+        status=export_record.status,  # type: ignore[arg-type]
+        error=export_record.error,
+        reused=reused,
+        pdf_url=f"/cases/{export_record.case_id}/exports/{export_record.id}/pdf",
+        pdf_sha256=pdf_sha256,
+        pdf_size_bytes=export_record.pdf_size_bytes,
+        pdf_page_count=export_record.pdf_page_count,
+        pdf_base64=(
+            encode_pdf_base64(read_export_pdf(pdf_sha256))
+            if include_pdf_base64 and pdf_sha256 is not None
+            else None
+        ),
         created_at=export_record.created_at,
     )
@@ -1,18 +1,31 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from typing import Any
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.deps import get_current_user
+from app.fhir_bulk import (
+    iter_local_patients,
+    latest_completed_import,
+    local_patient_snapshot,
+    local_store_enabled,
+)
+from app.fhir_cache import get_fhir_response_cache
 from app.fhir_client import (
     DEMO_PATIENTS,
+    AsyncFhirClient,
     FhirClient,
     FhirClientError,
+    connection_stats,
     demo_patient_by_id,
     patient_display_name,
 )
-from app.models import User
+from app.models import FhirBulkImport, User
 from app.schemas import FhirPatientSnapshotResponse, FhirPatientSummaryResponse
 
 router = APIRouter(prefix="/fhir", tags=["fhir"])
@@ -30,16 +43,21 @@ def list_patients(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> list[FhirPatientSummaryResponse]:
-    del db
     del current_user
 
+    if local_store_enabled(db):
+        return _patient_summaries(iter_local_patients(db))
+
     client = FhirClient()
     try:
-        patients = client.list_patients()
+        # Summaries are built page by page so raw Patient resources are never all held at once.
+        return _patient_summaries(client.iter_patients())
     except FhirClientError:
         # Demo-safe fallback so production demos still work without live FHIR connectivity.
-        patients = DEMO_PATIENTS
+        return _patient_summaries(DEMO_PATIENTS)
 
+
+def _patient_summaries(patients: Iterable[dict[str, Any]]) -> list[FhirPatientSummaryResponse]:
     return [
         FhirPatientSummaryResponse(
             id=str(patient.get("id", "")),
@@ -53,17 +71,20 @@ def list_patients(
 
 
 @router.get("/patients/{patient_id}/snapshot", response_model=FhirPatientSnapshotResponse)
-def get_patient_snapshot(
+async def get_patient_snapshot(
     patient_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> FhirPatientSnapshotResponse:
-    del db
     del current_user
 
-    client = FhirClient()
+    local_snapshot = await run_in_threadpool(_local_snapshot, db, patient_id)
+    if local_snapshot is not None:
+        return FhirPatientSnapshotResponse(**local_snapshot)
+
+    client = AsyncFhirClient()
     try:
-        snapshot = client.get_patient_snapshot(patient_id)
+        snapshot = await client.get_patient_snapshot(patient_id)
     except FhirClientError as exc:
         demo_patient = demo_patient_by_id(patient_id)
         if demo_patient is None:
@@ -79,3 +100,50 @@ def get_patient_snapshot(
         }
 
     return FhirPatientSnapshotResponse(**snapshot)
+
+
+def _local_snapshot(db: Session, patient_id: str) -> dict[str, Any] | None:
+    if not local_store_enabled(db):
+        return None
+    return local_patient_snapshot(db, patient_id)
+
+
+@router.get("/local-store")
+def fhir_local_store_status(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> dict[str, object]:
+    del current_user
+    latest = db.query(FhirBulkImport).order_by(FhirBulkImport.id.desc()).first()
+    completed = latest_completed_import(db)
+    return {
+        "serving": local_store_enabled(db),
+        "latest_import": (
+            {
+                "id": latest.id,
+                "status": latest.status,
+                "error": latest.error,
+                "started_at": latest.started_at,
+                "completed_at": latest.completed_at,
+            }
+            if latest is not None
+            else None
+        ),
+        "last_completed_at": completed.completed_at if completed is not None else None,
+        "resource_counts": completed.resource_counts_json if completed is not None else {},
+    }
+
+
+@router.get("/connection-stats")
+def fhir_connection_stats(current_user: User = Depends(get_current_user)) -> dict[str, object]:
+    del current_user
+    return connection_stats.snapshot()
+
+
+@router.get("/cache-stats")
+def fhir_cache_stats(current_user: User = Depends(get_current_user)) -> dict[str, object]:
+    del current_user
+    cache = get_fhir_response_cache()
+    if cache is None:
+        return {"mode": "off"}
+    return cache.stats()
@@ -5,9 +5,10 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
+from app.audit_service import record_audit_event
 from app.db import get_db
 from app.deps import get_current_user
-from app.models import AuditEvent, Setting, User
+from app.models import Setting, User
 from app.schemas import SettingsResponse, SettingsUpdateRequest
 
 router = APIRouter(prefix="/settings", tags=["settings"])
@@ -60,20 +61,19 @@ def update_current_settings(
     settings.updated_by_user_id = current_user.id
     settings.updated_at = datetime.now(timezone.utc)
 
-    db.add(
-        AuditEvent(
-            org_id=current_user.org_id,
-            user_id=current_user.id,
-            action="settings_change",
-            entity_type="settings",
-            entity_id=str(settings.id),
-            metadata_json={
-                "deployment_mode": payload.deployment_mode,
-                "fhir_base_url": payload.fhir_base_url,
-                "fhir_auth_type": payload.fhir_auth_type,
-                "model_endpoint": payload.model_endpoint,
-            },
-        )
+    record_audit_event(
+        db,
+        org_id=current_user.org_id,
+        user_id=current_user.id,
+        action="settings_change",
+        entity_type="settings",
+        entity_id=str(settings.id),
+        metadata_json={
+            "deployment_mode": payload.deployment_mode,
+            "fhir_base_url": payload.fhir_base_url,
+            "fhir_auth_type": payload.fhir_auth_type,
+            "model_endpoint": payload.model_endpoint,
+        },
     )
 
     db.commit()
@@ -9,6 +9,7 @@ RoleType = Literal["coordinator", "clinician", "admin"]
 DeploymentMode = Literal["standalone", "smart_on_fhir"]
 CaseStatus = Literal["draft", "in_review", "submitted", "denied"]
 QuestionnaireFieldState = Literal["missing", "filled", "verified"]
+PatientVerificationState = Literal["pending", "verified", "not_found", "unavailable"]
 
 
 class UserResponse(BaseModel):
@@ -90,6 +91,8 @@ class FhirPatientSnapshotResponse(BaseModel):
     medicationRequests: list[dict[str, Any]]
     serviceRequests: list[dict[str, Any]]
     documentReferences: list[dict[str, Any]]
+    partial: bool = False
+    failed_resources: dict[str, str] = Field(default_factory=dict)
 
 
 class CaseCreateRequest(BaseModel):
@@ -109,6 +112,7 @@ class CaseResponse(BaseModel):
     payer_label: str
     service_line_template_id: str
     status: CaseStatus
+    patient_verification: PatientVerificationState = "verified"
     created_at: datetime
     updated_at: datetime
 
@@ -230,8 +234,31 @@ class DenialAnalysisResponse(BaseModel):
     appeal_letter_draft: str
 
 
+PacketExportStatus = Literal["pending", "completed", "failed"]
+
+
 class PacketExportRequest(BaseModel):
     export_type: Literal["initial", "appeal"] = "initial"
+    # Overrides EXPORT_MODE; "async" returns 202 with a pending export rendered by a worker.
+    mode: Literal["sync", "async"] | None = None
+
+
+BATCH_EXPORT_MAX_CASES = 200
+
+
+class PacketBatchExportFilter(BaseModel):
+    status: CaseStatus | None = None
+    # Only cases attested at or after this time, e.g. the start of the billing day.
+    attested_since: datetime | None = None
+
+
+class PacketBatchExportRequest(BaseModel):
+    export_type: Literal["initial", "appeal"] = "initial"
+    # Exactly one of case_ids or filter; a filter only ever matches attested cases.
+    case_ids: list[int] | None = Field(
+        default=None, min_length=1, max_length=BATCH_EXPORT_MAX_CASES
+    )
+    filter: PacketBatchExportFilter | None = None
 
 
 class AuditSummaryItemResponse(BaseModel):
@@ -248,7 +275,16 @@ class PacketExportResponse(BaseModel):
     export_type: Literal["initial", "appeal"]
     packet_json: dict[str, Any]
     metrics_json: dict[str, Any]
-    pdf_base64: str
+    status: PacketExportStatus = "completed"
+    error: str | None = None
+    # True when an identical packet had already been exported and that export was returned.
+    reused: bool = False
+    pdf_url: str
+    pdf_sha256: str | None = None
+    pdf_size_bytes: int | None = None
+    pdf_page_count: int | None = None
+    # Legacy inline copy of the PDF, only returned with ?include_pdf_base64=true.
+    pdf_base64: str | None = None
     created_at: datetime
 
 
@@ -256,5 +292,20 @@ class PacketExportListItemResponse(BaseModel):
     export_id: int
     case_id: int
     export_type: Literal["initial", "appeal"]
+    status: PacketExportStatus = "completed"
     metrics_json: dict[str, Any]
+    pdf_url: str
+    # Unknown (null) for exports rendered before sizes and page counts were stored.
+    pdf_size_bytes: int | None = None
+    pdf_page_count: int | None = None
+    created_at: datetime
+
+
+class PacketExportStatusResponse(BaseModel):
+    export_id: int
+    case_id: int
+    status: PacketExportStatus
+    error: str | None = None
+    pdf_url: str | None = None
     created_at: datetime
+    completed_at: datetime | None = None
@@ -1,22 +1,109 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 import bcrypt
 import jwt
+from fastapi.concurrency import run_in_threadpool
 
 from app.config import get_settings
 
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(RuntimeError):
+    pass
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    rounds = get_settings().bcrypt_rounds
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
 
 
 def verify_password(password: str, password_hash: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
 
 
+class _PasswordExecutor:
+    """Dedicated, bounded pool for bcrypt so login bursts cannot occupy the request threadpool.
+
+    At most ``workers`` hashes run at once and at most ``max_queue`` more may wait;
+    further submissions fail fast with ``PasswordHashingBusy``.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max(max_queue, 0)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._outstanding = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._outstanding >= self.workers + self.max_queue:
+                raise PasswordHashingBusy("Password hashing queue is full")
+            self._outstanding += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the pool finishes the work, not when the caller stops waiting:
+        # a cancelled request leaves bcrypt running, and that must still hold its slot.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future: Future[Any] | None = None) -> None:
+        with self._lock:
+            self._outstanding -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_password_executor: _PasswordExecutor | None = None
+
+
+def _get_password_executor() -> _PasswordExecutor | None:
+    global _password_executor
+    settings = get_settings()
+    if settings.password_hash_workers <= 0:
+        return None
+    if _password_executor is None:
+        _password_executor = _PasswordExecutor(
+            workers=settings.password_hash_workers, max_queue=settings.password_hash_max_queue
+        )
+    return _password_executor
+
+
+def shutdown_password_executor() -> None:
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown()
+    _password_executor = None
+
+
+async def _run_password_work(fn: Callable[..., T], *args: Any) -> T:
+    executor = _get_password_executor()
+    if executor is None:
+        # PASSWORD_HASH_WORKERS=0 keeps bcrypt on the shared request threadpool.
+        return await run_in_threadpool(fn, *args)
+    return await executor.run(fn, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_work(hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await _run_password_work(verify_password, password, password_hash)
+
+
 def create_access_token(subject: str, org_id: int, role: str) -> str:
     settings = get_settings()
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.jwt_exp_minutes)
@@ -0,0 +1,47 @@
+"""Per-request settings overhead on the auth path.
+
+Run from ``apps/api``::
+
+    uv run python -m benchmarks.bench_auth_settings
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import timeit
+
+os.environ.setdefault("APP_SECRET", "bench-secret-0123456789-abcdefghijklmnopqrstuvwxyz")
+
+from app.config import Settings, get_settings, reload_settings  # noqa: E402
+from app.security import create_access_token, decode_access_token  # noqa: E402
+
+
+def _auth_round_trip() -> None:
+    decode_access_token(create_access_token(subject="1", org_id=1, role="admin"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    reload_settings()
+    settings_parse = timeit.timeit(Settings, number=n) / n
+    settings_cached = timeit.timeit(get_settings, number=n) / n
+    auth_path = timeit.timeit(_auth_round_trip, number=n) / n
+
+    # An authenticated request previously parsed Settings once for encode and once for decode.
+    removed = 2 * (settings_parse - settings_cached)
+    print(f"Settings() parse:          {settings_parse * 1e6:8.2f} us")
+    print(f"get_settings() cached:     {settings_cached * 1e6:8.2f} us")
+    print(f"encode+decode token:       {auth_path * 1e6:8.2f} us")
+    print(
+        f"overhead removed per auth: {removed * 1e6:8.2f} us "
+        f"({removed / (auth_path + removed) * 100:.1f}% of the previous auth path)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Batch export render throughput by export worker count.
+
+Renders a batch of synthetic packets through the export renderer's worker processes into the
+export store, the same path ``POST /cases/exports/batch`` takes for cases without a current
+export. Run from ``apps/api``::
+
+    uv run python -m benchmarks.bench_batch_export --cases 24 --workers 1 2 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import wait
+from functools import partial
+
+from app.config import reload_settings
+from app.export_jobs import _ExportRenderer
+from app.export_storage import store_rendered_pdf
+from benchmarks.bench_export_pdf import _synthetic_packet
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=24)
+    parser.add_argument("--citations", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    os.environ["EXPORT_STORAGE_DIR"] = tempfile.mkdtemp()
+    reload_settings()
+    # Distinct packets so the content-addressed store cannot short-circuit any render.
+    packets = []
+    for index in range(args.cases):
+        packet = _synthetic_packet(args.citations)
+        packet["case_header"]["case_id"] = index
+        packets.append(packet)
+
+    for workers in args.workers:
+        renderer = _ExportRenderer(workers=workers, kind="process")
+        try:
+            # Warm the spawned workers so interpreter start-up is not counted.
+            wait([renderer._render.submit(os.getpid) for _ in range(workers)])
+            started = time.perf_counter()
+            renders = [
+                renderer._dispatch.submit(store_rendered_pdf, partial(renderer._render_pdf, packet))
+                for packet in packets
+            ]
+            sizes = [render.result()[1] for render in renders]
+            elapsed = time.perf_counter() - started
+        finally:
+            renderer.shutdown()
+        print(
+            f"workers={workers:<3} cases={args.cases:<4} elapsed={elapsed:7.2f}s "
+            f"throughput={args.cases / elapsed:6.2f} cases/s "
+            f"avg_pdf={sum(sizes) / len(sizes) / 1024:7.0f}KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
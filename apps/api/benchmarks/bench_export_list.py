@@ -0,0 +1,140 @@
+"""Export list latency for a case with many large exports.
+
+Seeds one case with exports carrying large packets (and, optionally, legacy inline PDFs), then
+compares the previous full-row load of every export with the paginated column projection served
+by ``GET /cases/{case_id}/exports``. Run from ``apps/api``::
+
+    uv run python -m benchmarks.bench_export_list --exports 500 --packet-kib 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+
+os.environ.setdefault("APP_SECRET", "bench-secret-0123456789-abcdefghijklmnopqrstuvwxyz")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("FHIR_BASE_URL", "http://127.0.0.1:9/fhir")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.config import reload_settings  # noqa: E402
+from app.db import get_session_local, init_db, reset_db_engine  # noqa: E402
+from app.models import CaseExport  # noqa: E402
+from app.schemas import PacketExportListItemResponse  # noqa: E402
+
+
+def _legacy_list(case_id: int, org_id: int) -> list[PacketExportListItemResponse]:
+    # The list endpoint before projection: every full row, then a handful of its columns.
+    db = get_session_local()()
+    try:
+        exports = (
+            db.query(CaseExport)
+            .filter(CaseExport.case_id == case_id, CaseExport.org_id == org_id)
+            .order_by(CaseExport.created_at.desc(), CaseExport.id.desc())
+            .all()
+        )
+        return [
+            PacketExportListItemResponse(
+                export_id=item.id,
+                case_id=case_id,
+                export_type=item.export_type,  # type: ignore[arg-type]
+                status=item.status,  # type: ignore[arg-type]
+                metrics_json=item.metrics_json,
+                pdf_url=f"/cases/{case_id}/exports/{item.id}/pdf",
+                created_at=item.created_at,
+            )
+            for item in exports
+        ]
+    finally:
+        db.close()
+
+
+def _median_ms(fn: Callable[[], object], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--exports", type=int, default=500)
+    parser.add_argument("--packet-kib", type=int, default=256)
+    parser.add_argument("--legacy-pdf-kib", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch}/bench.db"
+    os.environ["EXPORT_STORAGE_DIR"] = f"{scratch}/exports"
+    reload_settings()
+    reset_db_engine()
+    init_db()
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        admin = client.post(
+            "/auth/bootstrap",
+            json={
+                "organization_name": "Bench Clinic",
+                "full_name": "Bench Admin",
+                "email": "admin@bench.example",
+                "password": "bench-secret-123",
+            },
+        ).json()
+        headers = {"Authorization": f"Bearer {admin['access_token']}"}
+        org_id = admin["user"]["org_id"]
+        case_id = client.post(
+            "/cases",
+            headers=headers,
+            json={
+                "patient_id": "pat-001",
+                "payer_label": "Aetna Gold",
+                "service_line_template_id": "imaging-mri-lumbar-spine",
+            },
+        ).json()["id"]
+
+        packet = {"citation_map": ["Clinical note excerpt with findings. " * 28] * args.packet_kib}
+        db = get_session_local()()
+        try:
+            for _ in range(args.exports):
+                db.add(
+                    CaseExport(
+                        case_id=case_id,
+                        org_id=org_id,
+                        export_type="initial",
+                        packet_json=packet,
+                        metrics_json={"completeness_score": 87.5},
+                        pdf_base64="A" * (args.legacy_pdf_kib * 1024),
+                        pdf_sha256="0" * 64,
+                        pdf_size_bytes=150_000,
+                        pdf_page_count=12,
+                    )
+                )
+            db.commit()
+        finally:
+            db.close()
+
+        legacy_ms = _median_ms(lambda: _legacy_list(case_id, org_id), args.repeats)
+        page_ms = _median_ms(
+            lambda: client.get(f"/cases/{case_id}/exports", headers=headers).raise_for_status(),
+            args.repeats,
+        )
+
+    print(
+        f"exports={args.exports} packet={args.packet_kib}KiB "
+        f"legacy_pdf={args.legacy_pdf_kib}KiB "
+        f"full_rows={legacy_ms:8.1f}ms first_page={page_ms:7.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
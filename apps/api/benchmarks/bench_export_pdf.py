@@ -0,0 +1,110 @@
+"""Packet PDF rendering on synthetic packets with thousands of citations.
+
+Compares the previous in-memory path (line list, ``BytesIO``, base64 copy) with the streaming
+renderer writing to a file. Peak memory is measured with ``tracemalloc``. The legacy path draws
+fewer lines because it let long lines run off the page instead of wrapping them, so compare
+time per drawn line as well as the totals. Run from ``apps/api``::
+
+    uv run python -m benchmarks.bench_export_pdf --citations 500 5000 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from reportlab.lib.pagesizes import LETTER
+from reportlab.pdfgen import canvas
+
+from app.export_service import _wrap_line, iter_packet_lines, render_packet_pdf
+
+
+def _synthetic_packet(citations: int) -> dict:
+    fields = 12
+    return {
+        "case_header": {"case_id": 1, "patient_id": "syn-000001", "export_type": "initial"},
+        "questionnaire": [
+            {"field_id": f"field_{index}", "value": "documented", "state": "verified"}
+            for index in range(fields)
+        ],
+        "clinical_rationale_draft": "Persistent neurologic deficit after conservative care. " * 40,
+        "citation_map": [
+            {
+                "field_id": f"field_{field}",
+                "value": "documented",
+                "citations": [
+                    {
+                        "doc_id": index,
+                        "page": index % 9 + 1,
+                        "excerpt": f"Clinical note {index}: symptoms persisted despite therapy "
+                        "with documented weakness and reflex changes on examination.",
+                    }
+                    for index in range(field, citations, fields)
+                ],
+            }
+            for field in range(fields)
+        ],
+    }
+
+
+def _legacy_pdf_base64(packet: dict) -> str:
+    # The renderer before streaming: every line in a list, drawn one by one, truncated at 1200.
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=LETTER, pageCompression=0, invariant=1)
+    c.setFont("Helvetica", 10)
+    y = 740
+    for line in list(iter_packet_lines(packet)):
+        if y < 60:
+            c.showPage()
+            c.setFont("Helvetica", 10)
+            y = 740
+        c.drawString(50, y, line[:1200])
+        y -= 14
+    c.save()
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def _measure(fn: Callable[[], object]) -> tuple[float, float]:
+    # Timed without tracemalloc, which slows allocation-heavy code unevenly.
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--citations", type=int, nargs="+", default=[500, 5000, 20000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        destination = Path(scratch) / "packet.pdf"
+        for citations in args.citations:
+            packet = _synthetic_packet(citations)
+            legacy_ms, legacy_mb = _measure(lambda: _legacy_pdf_base64(packet))
+            stream_ms, stream_mb = _measure(lambda: render_packet_pdf(packet, str(destination)))
+            pages = render_packet_pdf(packet, str(destination))
+            source_lines = list(iter_packet_lines(packet))
+            wrapped_lines = sum(len(list(_wrap_line(line))) for line in source_lines)
+            print(
+                f"citations={citations:<6} pages={pages:<5} "
+                f"size={destination.stat().st_size / 1024:8.0f}KiB "
+                f"legacy={legacy_ms:8.1f}ms/{legacy_mb:6.1f}MiB "
+                f"({legacy_ms * 1000 / len(source_lines):5.1f}us/line) "
+                f"streaming={stream_ms:8.1f}ms/{stream_mb:6.1f}MiB "
+                f"({stream_ms * 1000 / wrapped_lines:5.1f}us/line)"
+            )
+
+
+if __name__ == "__main__":
+    main()
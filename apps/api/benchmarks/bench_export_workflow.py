@@ -0,0 +1,142 @@
+"""Export latency across a multi-export workflow on one evidence-heavy case.
+
+Seeds a case with many large evidence documents, then repeats the billing loop of editing one
+answer, re-attesting and exporting, and reports the latency of each export request. Run from
+``apps/api``::
+
+    uv run python -m benchmarks.bench_export_workflow --documents 40 --exports 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("APP_SECRET", "bench-secret-0123456789-abcdefghijklmnopqrstuvwxyz")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("FHIR_BASE_URL", "http://127.0.0.1:9/fhir")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.config import reload_settings  # noqa: E402
+from app.db import get_session_local, init_db, reset_db_engine  # noqa: E402
+from app.models import User  # noqa: E402
+from app.security import hash_password  # noqa: E402
+
+_NOTE = """
+Primary diagnosis: Lumbar radiculopathy
+Symptom duration (weeks): 12
+Neurologic deficit present: yes
+Conservative therapy duration (weeks): 8
+Physical therapy trial documented: yes
+Date of prior imaging: 2025-10-22
+Clinical rationale: Persistent neurologic deficits and failed conservative treatment.
+""".strip()
+
+
+def _seed(client: TestClient, documents: int, note_kib: int) -> tuple[dict, dict, int]:
+    admin = client.post(
+        "/auth/bootstrap",
+        json={
+            "organization_name": "Bench Clinic",
+            "full_name": "Bench Admin",
+            "email": "admin@bench.example",
+            "password": "bench-secret-123",
+        },
+    ).json()
+    db = get_session_local()()
+    try:
+        db.add(
+            User(
+                org_id=admin["user"]["org_id"],
+                email="clinician@bench.example",
+                full_name="Bench Clinician",
+                role="clinician",
+                password_hash=hash_password("bench-secret-123"),
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+    clinician = client.post(
+        "/auth/login", json={"email": "clinician@bench.example", "password": "bench-secret-123"}
+    ).json()
+    admin_headers = {"Authorization": f"Bearer {admin['access_token']}"}
+    clinician_headers = {"Authorization": f"Bearer {clinician['access_token']}"}
+
+    case_id = client.post(
+        "/cases",
+        headers=admin_headers,
+        json={
+            "patient_id": "pat-001",
+            "payer_label": "Aetna Gold",
+            "service_line_template_id": "imaging-mri-lumbar-spine",
+        },
+    ).json()["id"]
+    filler = ("Follow-up visit notes with vitals, history and plan. " * 20 + "\n") * note_kib
+    for index in range(documents):
+        client.post(
+            f"/cases/{case_id}/documents/upload",
+            headers=admin_headers,
+            files={"file": (f"note-{index}.txt", f"{_NOTE}\n{filler}".encode(), "text/plain")},
+        )
+    client.post(f"/cases/{case_id}/autofill", headers=admin_headers)
+    return admin_headers, clinician_headers, case_id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--note-kib", type=int, default=64)
+    parser.add_argument("--exports", type=int, default=10)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{scratch}/bench.db"
+    os.environ["EXPORT_STORAGE_DIR"] = f"{scratch}/exports"
+    os.environ["UPLOAD_DIR"] = f"{scratch}/documents"
+    reload_settings()
+    reset_db_engine()
+    init_db()
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        _, headers, case_id = _seed(client, args.documents, args.note_kib)
+        latencies = []
+        for round_index in range(args.exports):
+            client.put(
+                f"/cases/{case_id}/questionnaire",
+                headers=headers,
+                json={
+                    "answers": {
+                        "clinical_rationale": {
+                            "value": f"Persistent deficits, revision {round_index}.",
+                            "state": "verified",
+                        }
+                    }
+                },
+            )
+            client.post(f"/cases/{case_id}/attest", headers=headers)
+            started = time.perf_counter()
+            response = client.post(
+                f"/cases/{case_id}/exports/generate",
+                headers=headers,
+                json={"export_type": "initial"},
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.text
+
+    print(
+        f"documents={args.documents} note={args.note_kib}KiB exports={args.exports} "
+        f"first={latencies[0]:7.1f}ms "
+        f"repeat_p50={statistics.median(latencies[1:] or latencies):7.1f}ms "
+        f"repeat_max={max(latencies[1:] or latencies):7.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
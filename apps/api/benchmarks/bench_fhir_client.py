@@ -0,0 +1,125 @@
+"""Patient snapshot latency against the synthetic mock FHIR server.
+
+Compares snapshot strategies and the response cache with per-request server latency injected.
+The mock server runs in a subprocess so its threads do not compete with the client for the GIL.
+Run from ``apps/api``::
+
+    uv run python -m benchmarks.bench_fhir_client --patients 2000 --latency-ms 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app.config import reload_settings
+from app.db import init_db
+from app.fhir_cache import reset_fhir_response_cache
+from app.fhir_client import AsyncFhirClient, connection_stats, reset_fhir_circuit_breakers
+
+
+async def _run_case(
+    base_url: str, patient_ids: list[str], strategy: str, concurrency: int
+) -> list[float]:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=concurrency * 7, max_keepalive_connections=concurrency * 7
+        )
+    ) as http:
+        client = AsyncFhirClient(base_url=base_url, http_client=http, snapshot_strategy=strategy)
+
+        async def one(patient_id: str) -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                await client.get_patient_snapshot(patient_id)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(one(patient_id) for patient_id in patient_ids))
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--resources-per-patient", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--hot-patients", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "scripts.mock_fhir_server",
+            "--port",
+            str(args.port),
+            "--patients",
+            str(args.patients),
+            "--resources-per-patient",
+            str(args.resources_per_patient),
+            "--latency-ms",
+            str(args.latency_ms),
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        _run(args, server, f"http://127.0.0.1:{args.port}/fhir")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def _run(args: argparse.Namespace, server: subprocess.Popen, base_url: str) -> None:
+    while True:
+        if server.poll() is not None:
+            raise SystemExit("mock FHIR server exited before becoming ready")
+        try:
+            httpx.get(f"{base_url}/Patient/pat-001", timeout=1).raise_for_status()
+            break
+        except httpx.HTTPError:
+            time.sleep(0.1)
+
+    rng = random.Random(1)
+    hot = [f"syn-{index:06d}" for index in range(min(args.hot_patients, args.patients))]
+    patient_ids = [rng.choice(hot) for _ in range(args.requests)]
+
+    for cache_mode in ("off", "memory"):
+        for strategy in ("fanout", "everything"):
+            os.environ["FHIR_CACHE_MODE"] = cache_mode
+            reload_settings()
+            init_db()
+            reset_fhir_response_cache()
+            reset_fhir_circuit_breakers()
+            before = connection_stats.snapshot()
+
+            started = time.perf_counter()
+            latencies = asyncio.run(_run_case(base_url, patient_ids, strategy, args.concurrency))
+            elapsed = time.perf_counter() - started
+            after = connection_stats.snapshot()
+            print(
+                f"cache={cache_mode:<6} strategy={strategy:<10} "
+                f"p50={statistics.median(latencies):7.2f}ms "
+                f"max={max(latencies):7.2f}ms "
+                f"throughput={len(latencies) / elapsed:7.1f}/s "
+                f"upstream_requests={after['requests'] - before['requests']} "
+                f"new_connections={after['new_connections'] - before['new_connections']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Latency of unrelated endpoints while a burst of logins is in flight.
+
+Starts the API under uvicorn in a subprocess against a throwaway SQLite database, then measures
+``GET /healthz`` and ``GET /cases`` with and without a concurrent login storm.
+Run from ``apps/api``::
+
+    uv run python -m benchmarks.bench_login_storm
+    PASSWORD_HASH_WORKERS=0 uv run python -m benchmarks.bench_login_storm  # bcrypt inline
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+PASSWORD = "super-secret-123"
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _probe(base_url: str, token: str, duration: float) -> dict[str, list[float]]:
+    latencies: dict[str, list[float]] = {"/healthz": [], "/cases": []}
+    headers = {"Authorization": f"Bearer {token}"}
+    deadline = time.perf_counter() + duration
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        while time.perf_counter() < deadline:
+            for path in latencies:
+                started = time.perf_counter()
+                client.get(path, headers=headers).raise_for_status()
+                latencies[path].append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def _login_storm(base_url: str, concurrency: int, stop: threading.Event) -> int:
+    def worker() -> int:
+        count = 0
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            while not stop.is_set():
+                client.post(
+                    "/auth/login", json={"email": "admin@example.com", "password": PASSWORD}
+                )
+                count += 1
+        return count
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker) for _ in range(concurrency)]
+        return sum(future.result() for future in futures)
+
+
+def _report(label: str, latencies: dict[str, list[float]]) -> None:
+    for path, samples in latencies.items():
+        print(
+            f"{label:<14} {path:<9} n={len(samples):<5} "
+            f"p50={statistics.median(samples):7.2f}ms p99={_percentile(samples, 99):7.2f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="packetpilot-bench-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{workdir}/bench.db",
+        "UPLOAD_DIR": f"{workdir}/uploads",
+        "APP_SECRET": "bench-secret-0123456789-abcdefghijklmnopqrstuvwxyz",
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(args.port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        _run(args, server)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def _run(args: argparse.Namespace, server: subprocess.Popen) -> None:
+    base_url = f"http://127.0.0.1:{args.port}"
+    while True:
+        if server.poll() is not None:
+            raise SystemExit("uvicorn exited before becoming ready")
+        try:
+            httpx.get(f"{base_url}/healthz", timeout=1).raise_for_status()
+            break
+        except httpx.HTTPError:
+            time.sleep(0.1)
+
+    bootstrap = httpx.post(
+        f"{base_url}/auth/bootstrap",
+        json={
+            "organization_name": "Bench Clinic",
+            "full_name": "Bench Admin",
+            "email": "admin@example.com",
+            "password": PASSWORD,
+        },
+        timeout=60,
+    )
+    bootstrap.raise_for_status()
+    token = bootstrap.json()["access_token"]
+
+    _report("idle", _probe(base_url, token, args.duration))
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as storm_pool:
+        storm = storm_pool.submit(_login_storm, base_url, args.concurrency, stop)
+        time.sleep(0.5)
+        _report("login storm", _probe(base_url, token, args.duration))
+        stop.set()
+        logins = storm.result()
+
+    print(f"logins completed during storm: {logins}")
+
+
+if __name__ == "__main__":
+    main()
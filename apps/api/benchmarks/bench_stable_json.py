@@ -0,0 +1,70 @@
+"""stable_json canonicalization of large export packets.
+
+Compares the one-pass canonicalizer with the previous ``json.loads(json.dumps(...))`` round
+trip, for both the structure and the canonical bytes used for the packet hash. Run from
+``apps/api``::
+
+    uv run python -m benchmarks.bench_stable_json --citations 1000 10000 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+import tracemalloc
+from collections.abc import Callable
+
+from app.export_service import canonical_json_bytes, stable_json
+from benchmarks.bench_export_pdf import _synthetic_packet
+
+
+def _round_trip(data: dict) -> dict:
+    return json.loads(json.dumps(data, sort_keys=True, ensure_ascii=True))
+
+
+def _round_trip_bytes(data: dict) -> bytes:
+    canonical = _round_trip(data)
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=True).encode(
+        "ascii"
+    )
+
+
+def _one_pass_bytes(data: dict) -> bytes:
+    return canonical_json_bytes(stable_json(data))
+
+
+def _peak_mib(fn: Callable[[], object]) -> float:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--citations", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for citations in args.citations:
+        packet = _synthetic_packet(citations)
+        assert stable_json(packet) == _round_trip(packet)
+        assert _one_pass_bytes(packet) == _round_trip_bytes(packet)
+
+        for label, fn in (
+            ("round-trip", lambda: _round_trip(packet)),
+            ("one-pass", lambda: stable_json(packet)),
+            ("round-trip+bytes", lambda: _round_trip_bytes(packet)),
+            ("one-pass+bytes", lambda: _one_pass_bytes(packet)),
+        ):
+            seconds = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+            print(
+                f"citations={citations:<6} {label:<17} {seconds * 1000:8.2f}ms "
+                f"peak={_peak_mib(fn):6.1f}MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
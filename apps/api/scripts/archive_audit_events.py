@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import argparse
+
+from app.audit_archive import archive_cold_audit_events
+from app.db import get_session_local, init_db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Move audit events older than the hot window into compressed archives."
+    )
+    parser.add_argument("--hot-months", type=int, default=None)
+    parser.add_argument("--archive-dir", default=None)
+    args = parser.parse_args()
+
+    init_db()
+    db = get_session_local()()
+    try:
+        archives = archive_cold_audit_events(
+            db, hot_months=args.hot_months, archive_dir=args.archive_dir
+        )
+    finally:
+        db.close()
+
+    for archive in archives:
+        print(
+            f"org={archive.org_id} period={archive.period} "
+            f"events={archive.event_count} path={archive.storage_path}"
+        )
+    print(f"Archived {sum(item.event_count for item in archives)} audit events.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+
+from app.db import get_session_local, init_db
+from app.fhir_bulk import BULK_RESOURCE_TYPES, run_bulk_import
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Preload the local patient store from a FHIR Bulk Data $export."
+    )
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument(
+        "--types",
+        default=",".join(BULK_RESOURCE_TYPES),
+        help="Comma-separated resource types to export.",
+    )
+    args = parser.parse_args()
+
+    init_db()
+    db = get_session_local()()
+    try:
+        run = run_bulk_import(
+            db,
+            base_url=args.base_url,
+            resource_types=[item.strip() for item in args.types.split(",") if item.strip()],
+        )
+    finally:
+        db.close()
+
+    if run.status != "completed":
+        raise SystemExit(f"Bulk import {run.id} failed: {run.error}")
+    for resource_type, count in sorted(run.resource_counts_json.items()):
+        print(f"{resource_type}: {count}")
+    print(f"Bulk import {run.id} completed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,25 @@
+"""Local FHIR R4 stand-in for demos and load tests.
+
+Serves the two fixed demo patients plus an optional synthetic population. Resources are indexed
+by id and by patient reference, searches page with ``Bundle.link[rel=next]``, responses carry
+ETags (``If-None-Match`` answers 304), and latency and error rates can be injected::
+
+    python scripts/mock_fhir_server.py --patients 5000 --resources-per-patient 40 \\
+        --latency-ms 20 --error-rate 0.01
+"""
+
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import random
+import threading
+import time
+from dataclasses import dataclass
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from urllib.parse import parse_qs, urlparse
+from typing import Any
+from urllib.parse import parse_qs, urlencode, urlparse
 
 PATIENTS = [
     {
@@ -79,85 +95,374 @@ RESOURCE_INDEX = {
     ],
 }
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+LAST_UPDATED = "2026-01-01T00:00:00Z"
+_PATIENT_REFERENCE_FIELDS = ("subject", "patient", "beneficiary")
+
+_GIVEN_NAMES = ["Avery", "Jordan", "Riley", "Casey", "Morgan", "Quinn", "Skyler", "Rowan"]
+_FAMILY_NAMES = ["Cole", "Shaw", "Patel", "Nguyen", "Garcia", "Okafor", "Larsen", "Kim"]
+_CONDITIONS = ["Lumbar radiculopathy", "Osteoarthritis of knee", "Migraine", "Type 2 diabetes"]
+_OBSERVATIONS = ["Pain score", "Blood pressure", "HbA1c", "BMI", "Heart rate"]
+_MEDICATIONS = ["Naproxen", "Metformin", "Gabapentin", "Sumatriptan"]
+_SERVICES = ["MRI lumbar spine", "Physical therapy", "Knee arthroscopy", "Sleep study"]
+_PAYERS = ["Aetna Gold", "Blue Shield PPO", "UnitedHealthcare Choice", "Medicare Part B"]
+
+
+def _patient_reference(resource: dict[str, Any]) -> str | None:
+    for field in _PATIENT_REFERENCE_FIELDS:
+        reference = (resource.get(field) or {}).get("reference") or ""
+        if reference.startswith("Patient/"):
+            return reference.split("/", 1)[1]
+    return None
+
+
+class FhirStore:
+    """In-memory resources with an id index and a (type, patient) index for searches."""
+
+    def __init__(self) -> None:
+        self.by_id: dict[str, dict[str, dict[str, Any]]] = {}
+        self.by_patient: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        self.by_type: dict[str, list[dict[str, Any]]] = {}
+
+    def add(self, resource: dict[str, Any]) -> None:
+        resource_type = resource["resourceType"]
+        resource.setdefault("meta", {"versionId": "1", "lastUpdated": LAST_UPDATED})
+        self.by_id.setdefault(resource_type, {})[resource["id"]] = resource
+        self.by_type.setdefault(resource_type, []).append(resource)
+        patient_id = _patient_reference(resource)
+        if patient_id is not None:
+            self.by_patient.setdefault((resource_type, patient_id), []).append(resource)
+
+    def get(self, resource_type: str, resource_id: str) -> dict[str, Any] | None:
+        return self.by_id.get(resource_type, {}).get(resource_id)
 
-def _bundle(resources: list[dict]) -> dict:
-    return {
-        "resourceType": "Bundle",
-        "type": "searchset",
-        "total": len(resources),
-        "entry": [{"resource": resource} for resource in resources],
-    }
+    def search(self, resource_type: str, query: dict[str, str]) -> list[dict[str, Any]]:
+        if "_id" in query:
+            resource = self.get(resource_type, query["_id"])
+            return [resource] if resource is not None else []
+        for param in ("patient", "subject", "beneficiary"):
+            if param in query:
+                patient_id = query[param].removeprefix("Patient/")
+                return self.by_patient.get((resource_type, patient_id), [])
+        return self.by_type.get(resource_type, [])
+
+    def compartment(self, patient_id: str) -> list[dict[str, Any]]:
+        patient = self.get("Patient", patient_id)
+        related = [
+            resource
+            for resource_type in self.by_type
+            for resource in self.by_patient.get((resource_type, patient_id), [])
+        ]
+        return [patient, *related] if patient is not None else related
+
+    def counts(self) -> dict[str, int]:
+        return {resource_type: len(items) for resource_type, items in self.by_type.items()}
+
+
+def build_store(patients: int = 0, resources_per_patient: int = 12, seed: int = 7) -> FhirStore:
+    """Fixed demo data plus ``patients`` synthetic patients with related resources."""
+    store = FhirStore()
+    for patient in PATIENTS:
+        store.add(json.loads(json.dumps(patient)))
+    for resources in RESOURCE_INDEX.values():
+        for resource in resources:
+            store.add(json.loads(json.dumps(resource)))
+
+    rng = random.Random(seed)
+    related_types = ["Condition", "Observation", "MedicationRequest", "ServiceRequest"]
+    for index in range(patients):
+        patient_id = f"syn-{index:06d}"
+        reference = {"reference": f"Patient/{patient_id}"}
+        store.add(
+            {
+                "resourceType": "Patient",
+                "id": patient_id,
+                "name": [
+                    {"given": [rng.choice(_GIVEN_NAMES)], "family": rng.choice(_FAMILY_NAMES)}
+                ],
+                "gender": rng.choice(["female", "male"]),
+                "birthDate": f"{rng.randint(1940, 2010)}-{rng.randint(1, 12):02d}-"
+                f"{rng.randint(1, 28):02d}",
+            }
+        )
+        store.add(
+            {
+                "resourceType": "Coverage",
+                "id": f"{patient_id}-cov",
+                "status": "active",
+                "beneficiary": reference,
+                "payor": [{"display": rng.choice(_PAYERS)}],
+            }
+        )
+        store.add(
+            {
+                "resourceType": "DocumentReference",
+                "id": f"{patient_id}-doc",
+                "status": "current",
+                "subject": reference,
+                "description": "Clinical note",
+            }
+        )
+        for item in range(max(resources_per_patient - 2, 0)):
+            resource_type = related_types[item % len(related_types)]
+            resource: dict[str, Any] = {
+                "resourceType": resource_type,
+                "id": f"{patient_id}-{resource_type.lower()}-{item}",
+                "subject": reference,
+                "status": "active",
+            }
+            if resource_type == "Condition":
+                resource["code"] = {"text": rng.choice(_CONDITIONS)}
+            elif resource_type == "Observation":
+                resource["status"] = "final"
+                resource["code"] = {"text": rng.choice(_OBSERVATIONS)}
+                resource["valueString"] = str(rng.randint(1, 200))
+            elif resource_type == "MedicationRequest":
+                resource["medicationCodeableConcept"] = {"text": rng.choice(_MEDICATIONS)}
+            else:
+                resource["code"] = {"text": rng.choice(_SERVICES)}
+            store.add(resource)
+    return store
+
+
+@dataclass(frozen=True)
+class FaultInjection:
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
 
 
 class FhirHandler(BaseHTTPRequestHandler):
+    # Keep-alive so clients can reuse pooled connections.
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without TCP_NODELAY every response waits on a
+    # delayed ACK (~40ms), which would swamp injected latency in benchmarks.
+    disable_nagle_algorithm = True
+    store: FhirStore = build_store()
+    faults = FaultInjection()
+
+    def _base_url(self) -> str:
+        return f"http://{self.headers.get('Host', 'localhost')}/fhir"
+
     def _write_json(self, status_code: int, payload: dict) -> None:
-        body = json.dumps(payload).encode("utf-8")
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+        if status_code == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
         self.send_response(status_code)
         self.send_header("Content-Type", "application/fhir+json")
         self.send_header("Content-Length", str(len(body)))
+        if status_code == 200:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Thu, 01 Jan 2026 00:00:00 GMT")
         self.end_headers()
         self.wfile.write(body)
 
+    def _write_ndjson(self, resources: list[dict[str, Any]]) -> None:
+        body = b"".join(
+            json.dumps(item, separators=(",", ":")).encode("utf-8") + b"\n" for item in resources
+        )
+        self.send_response(200)
+        self.send_header("Content-Type", "application/fhir+ndjson")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_found(self, diagnostics: str) -> None:
+        self._write_json(
+            404,
+            {
+                "resourceType": "OperationOutcome",
+                "issue": [{"severity": "error", "code": "not-found", "diagnostics": diagnostics}],
+            },
+        )
+
+    def _inject_faults(self) -> bool:
+        faults = self.faults
+        if faults.latency_ms or faults.latency_jitter_ms:
+            delay = faults.latency_ms + random.uniform(0, faults.latency_jitter_ms)
+            time.sleep(delay / 1000)
+        if faults.error_rate and random.random() < faults.error_rate:
+            self._write_json(
+                faults.error_status,
+                {
+                    "resourceType": "OperationOutcome",
+                    "issue": [{"severity": "error", "code": "transient"}],
+                },
+            )
+            return True
+        return False
+
+    def _write_page(
+        self, path: str, query: dict[str, str], resources: list[dict[str, Any]]
+    ) -> None:
+        count = min(max(int(query.get("_count", DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+        offset = max(int(query.get("_offset", 0)), 0)
+        page = resources[offset : offset + count]
+
+        def link(relation: str, page_offset: int) -> dict[str, str]:
+            params = {**query, "_count": str(count), "_offset": str(page_offset)}
+            return {"relation": relation, "url": f"{self._base_url()}/{path}?{urlencode(params)}"}
+
+        links = [link("self", offset)]
+        if offset + count < len(resources):
+            links.append(link("next", offset + count))
+        self._write_json(
+            200,
+            {
+                "resourceType": "Bundle",
+                "type": "searchset",
+                "total": len(resources),
+                "link": links,
+                "entry": [
+                    {
+                        "fullUrl": f"{self._base_url()}/{item['resourceType']}/{item['id']}",
+                        "resource": item,
+                    }
+                    for item in page
+                ],
+            },
+        )
+
     def do_GET(self) -> None:  # noqa: N802
         parsed = urlparse(self.path)
         segments = [segment for segment in parsed.path.split("/") if segment]
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
 
         if len(segments) < 2 or segments[0] != "fhir":
-            self._write_json(404, {"issue": [{"diagnostics": "not found"}]})
+            self._not_found("not found")
+            return
+        if self._inject_faults():
             return
 
-        resource_type = segments[1]
-        query = parse_qs(parsed.query)
-
-        if resource_type == "Patient":
-            if len(segments) == 3:
-                patient = next((item for item in PATIENTS if item["id"] == segments[2]), None)
-                if patient is None:
-                    self._write_json(404, {"issue": [{"diagnostics": "patient not found"}]})
-                    return
-                self._write_json(200, patient)
-                return
+        resource_type, rest = segments[1], segments[2:]
+        if resource_type == "$export-status":
+            self._write_export_manifest(query)
+            return
+        if resource_type == "$export-file" and rest:
+            self._write_ndjson(self.store.by_type.get(rest[0], []))
+            return
+        if resource_type == "Patient" and rest == ["$export"]:
+            self.send_response(202)
+            self.send_header(
+                "Content-Location",
+                f"{self._base_url()}/$export-status?{urlencode({'_type': query.get('_type', '')})}",
+            )
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
 
-            self._write_json(200, _bundle(PATIENTS))
+        if not rest:
+            self._write_page(resource_type, query, self.store.search(resource_type, query))
             return
 
-        resources = RESOURCE_INDEX.get(resource_type)
-        if resources is None:
-            self._write_json(200, _bundle([]))
+        resource = self.store.get(resource_type, rest[0])
+        if resource is None:
+            self._not_found(f"{resource_type}/{rest[0]} not found")
             return
+        if len(rest) == 1:
+            self._write_json(200, resource)
+            return
+        if resource_type == "Patient" and rest[1:] == ["$everything"]:
+            self._write_page(
+                f"Patient/{rest[0]}/$everything", query, self.store.compartment(rest[0])
+            )
+            return
+        self._write_json(
+            400,
+            {
+                "resourceType": "OperationOutcome",
+                "issue": [{"severity": "error", "code": "not-supported"}],
+            },
+        )
 
-        beneficiary = (query.get("beneficiary") or [None])[0]
-        patient_id = (query.get("patient") or [None])[0]
-
-        if beneficiary:
-            filtered = [
-                item
-                for item in resources
-                if item.get("beneficiary", {}).get("reference") == beneficiary
-            ]
-        elif patient_id:
-            filtered = [
-                item
-                for item in resources
-                if item.get("subject", {}).get("reference") == f"Patient/{patient_id}"
-            ]
-        else:
-            filtered = resources
-
-        self._write_json(200, _bundle(filtered))
+    def _write_export_manifest(self, query: dict[str, str]) -> None:
+        requested = [item for item in query.get("_type", "").split(",") if item]
+        types = requested or list(self.store.by_type)
+        self._write_json(
+            200,
+            {
+                "transactionTime": LAST_UPDATED,
+                "request": f"{self._base_url()}/Patient/$export",
+                "requiresAccessToken": False,
+                "output": [
+                    {
+                        "type": resource_type,
+                        "url": f"{self._base_url()}/$export-file/{resource_type}",
+                        "count": len(self.store.by_type.get(resource_type, [])),
+                    }
+                    for resource_type in types
+                    if resource_type in self.store.by_type
+                ],
+                "error": [],
+            },
+        )
 
     def log_message(self, format: str, *args: object) -> None:  # noqa: A003
         return
 
 
+class _MockFhirServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The stdlib default backlog of 5 drops connections under concurrent load tests.
+    request_queue_size = 256
+
+
+def build_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    *,
+    store: FhirStore | None = None,
+    faults: FaultInjection | None = None,
+) -> ThreadingHTTPServer:
+    handler = type(
+        "ConfiguredFhirHandler",
+        (FhirHandler,),
+        {"store": store or build_store(), "faults": faults or FaultInjection()},
+    )
+    return _MockFhirServer((host, port), handler)
+
+
+def serve_in_background(server: ThreadingHTTPServer) -> threading.Thread:
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--host", default="127.0.0.1")
     parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--patients", type=int, default=0, help="Synthetic patients to generate.")
+    parser.add_argument("--resources-per-patient", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
     args = parser.parse_args()
 
-    server = ThreadingHTTPServer((args.host, args.port), FhirHandler)
-    print(f"Mock FHIR server listening on http://{args.host}:{args.port}/fhir")
+    store = build_store(args.patients, args.resources_per_patient, args.seed)
+    server = build_server(
+        args.host,
+        args.port,
+        store=store,
+        faults=FaultInjection(
+            latency_ms=args.latency_ms,
+            latency_jitter_ms=args.latency_jitter_ms,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+        ),
+    )
+    counts = ", ".join(f"{name}={count}" for name, count in sorted(store.counts().items()))
+    print(f"Mock FHIR server listening on http://{args.host}:{args.port}/fhir ({counts})")
     server.serve_forever()
 
 
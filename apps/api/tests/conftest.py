@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Iterator
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from threading import Thread
@@ -84,6 +85,17 @@ RESOURCE_INDEX = {
 }
 
 
+def _compartment(patient_id: str) -> list[dict]:
+    reference = f"Patient/{patient_id}"
+    return [
+        item
+        for resources in RESOURCE_INDEX.values()
+        for item in resources
+        if reference
+        in {item.get("subject", {}).get("reference"), item.get("beneficiary", {}).get("reference")}
+    ]
+
+
 def _bundle(resources: list[dict]) -> dict:
     return {
         "resourceType": "Bundle",
@@ -94,6 +106,9 @@ def _bundle(resources: list[dict]) -> dict:
 
 
 class _FhirHandler(BaseHTTPRequestHandler):
+    # Keep-alive so clients can reuse pooled connections.
+    protocol_version = "HTTP/1.1"
+
     def _write_json(self, status_code: int, payload: dict) -> None:
         body = json.dumps(payload).encode("utf-8")
         self.send_response(status_code)
@@ -114,11 +129,17 @@ class _FhirHandler(BaseHTTPRequestHandler):
         query = parse_qs(parsed.query)
 
         if resource_type == "Patient":
-            if len(segments) == 3:
+            if len(segments) >= 3:
                 patient = next((item for item in PATIENTS if item["id"] == segments[2]), None)
                 if patient is None:
                     self._write_json(404, {"issue": [{"diagnostics": "patient not found"}]})
                     return
+                if segments[3:] == ["$everything"]:
+                    self._write_json(200, _bundle([patient, *_compartment(patient["id"])]))
+                    return
+                if len(segments) > 3:
+                    self._write_json(400, {"issue": [{"diagnostics": "unsupported operation"}]})
+                    return
                 self._write_json(200, patient)
                 return
 
@@ -154,6 +175,16 @@ class _FhirHandler(BaseHTTPRequestHandler):
         return
 
 
+@pytest.fixture(autouse=True)
+def _drop_settings_snapshot() -> Iterator[None]:
+    yield
+    # Autouse fixtures are set up before a test's monkeypatch, so this teardown runs after
+    # the environment is restored and no snapshot of patched variables outlives the test.
+    from app.config import get_settings
+
+    get_settings.cache_clear()
+
+
 @pytest.fixture()
 def fhir_base_url() -> str:
     server = ThreadingHTTPServer(("127.0.0.1", 0), _FhirHandler)
@@ -182,9 +213,24 @@ def client(
     monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
     monkeypatch.setenv("APP_SECRET", "test-secret-0123456789-abcdefghijklmnopqrstuvwxyz")
     monkeypatch.setenv("FHIR_BASE_URL", fhir_base_url)
-
+    monkeypatch.setenv("EXPORT_STORAGE_DIR", str(tmp_path / "exports"))
+    monkeypatch.setenv("UPLOAD_DIR", str(tmp_path / "uploads"))
+    # Minimum bcrypt cost keeps auth-heavy tests fast.
+    monkeypatch.setenv("BCRYPT_ROUNDS", "4")
+
+    from app.audit_service import reset_audit_sink
+    from app.auth_cache import get_auth_user_cache
+    from app.config import reload_settings
     from app.db import init_db, reset_db_engine
-
+    from app.fhir_cache import reset_fhir_response_cache
+    from app.fhir_client import reset_fhir_circuit_breakers, reset_fhir_snapshot_modes
+
+    reload_settings()
+    get_auth_user_cache().clear()
+    reset_audit_sink()
+    reset_fhir_response_cache()
+    reset_fhir_circuit_breakers()
+    reset_fhir_snapshot_modes()
     reset_db_engine()
     init_db()
 
@@ -193,4 +239,5 @@ def client(
     with TestClient(app) as test_client:
         yield test_client
 
+    reset_audit_sink()
     reset_db_engine()
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import audit_archive
+from app.audit_archive import (
+    archive_cold_audit_events,
+    archived_case_id,
+    backfill_audit_archive_cases,
+    hot_cutoff,
+    iter_archived_events,
+)
+from app.db import get_engine, get_session_local
+from app.models import AuditArchive, AuditArchiveCase, AuditEvent, User
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def _bootstrap_and_token(client: TestClient) -> str:
+    response = client.post(
+        "/auth/bootstrap",
+        json={
+            "organization_name": "Northwind Clinic",
+            "full_name": "Alex Kim",
+            "email": "admin@northwind.com",
+            "password": "super-secret-123",
+        },
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _seed_old_events(count: int) -> None:
+    db = get_session_local()()
+    try:
+        admin = db.query(User).one()
+        start = datetime(2026, 1, 30, tzinfo=timezone.utc)
+        for index in range(count):
+            db.add(
+                AuditEvent(
+                    org_id=admin.org_id,
+                    user_id=admin.id,
+                    action="case_status_change",
+                    entity_type="case",
+                    entity_id=str(index % 2),
+                    metadata_json={"index": index},
+                    created_at=start + timedelta(days=index),
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_hot_cutoff_rolls_back_whole_months() -> None:
+    assert hot_cutoff(NOW, 3) == datetime(2026, 7, 1, tzinfo=timezone.utc)
+    assert hot_cutoff(datetime(2026, 2, 3, tzinfo=timezone.utc), 4) == datetime(
+        2025, 10, 1, tzinfo=timezone.utc
+    )
+
+
+def test_archived_case_id_derives_null_and_missing_values() -> None:
+    fields = {"entity_type": "case", "entity_id": "7", "metadata": None}
+
+    assert archived_case_id(fields) == 7
+    assert archived_case_id({**fields, "case_id": None}) == 7
+    assert archived_case_id({**fields, "case_id": 9}) == 9
+
+
+def test_archive_moves_cold_months_and_stays_queryable(client: TestClient, tmp_path: Path) -> None:
+    token = _bootstrap_and_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    _seed_old_events(4)
+    login = client.post(
+        "/auth/login", json={"email": "admin@northwind.com", "password": "super-secret-123"}
+    )
+    assert login.status_code == 200
+
+    db = get_session_local()()
+    try:
+        archives = archive_cold_audit_events(
+            db, now=NOW, hot_months=3, archive_dir=str(tmp_path / "archive")
+        )
+        assert [(item.period, item.event_count) for item in archives] == [
+            ("2026-01", 2),
+            ("2026-02", 2),
+        ]
+        assert all(Path(item.storage_path).exists() for item in archives)
+        assert db.query(AuditArchive).count() == 2
+        assert db.query(AuditEvent).count() == 2
+    finally:
+        db.close()
+
+    seen: list[dict] = []
+    cursor: str | None = None
+    while True:
+        params: dict[str, str | int] = {"limit": 2, "include_archived": "true"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/audit-events", headers=headers, params=params)
+        assert page.status_code == 200
+        seen.extend(page.json())
+        cursor = page.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert [event["action"] for event in seen] == ["login"] * 2 + ["case_status_change"] * 4
+    assert [event["metadata"]["index"] for event in seen[2:]] == [3, 2, 1, 0]
+    assert all(event["actor_email"] == "admin@northwind.com" for event in seen)
+
+    filtered = client.get(
+        "/audit-events",
+        headers=headers,
+        params={"entity_type": "case", "entity_id": "1", "created_before": "2026-02-01T00:00:00Z"},
+    )
+    assert [event["metadata"]["index"] for event in filtered.json()] == [1]
+
+
+def test_plain_audit_queries_do_not_open_archive_segments(
+    client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    token = _bootstrap_and_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    _seed_old_events(4)
+    # The archival job always leaves the newest row live, so make that a recent one.
+    client.post(
+        "/auth/login", json={"email": "admin@northwind.com", "password": "super-secret-123"}
+    )
+    db = get_session_local()()
+    try:
+        archive_cold_audit_events(db, now=NOW, hot_months=3, archive_dir=str(tmp_path / "archive"))
+    finally:
+        db.close()
+
+    opened: list[str] = []
+    read_segment = audit_archive.read_archive_segment
+
+    def counting_read(archive: AuditArchive):
+        opened.append(archive.period)
+        return read_segment(archive)
+
+    monkeypatch.setattr(audit_archive, "read_archive_segment", counting_read)
+
+    # Matches nothing in the hot table, which used to scan every archived month.
+    case_one = {"entity_type": "case", "entity_id": "1"}
+    filtered = client.get("/audit-events", headers=headers, params=case_one)
+    assert filtered.json() == []
+    assert opened == []
+
+    archived = client.get(
+        "/audit-events", headers=headers, params={**case_one, "include_archived": "true"}
+    )
+    assert [event["metadata"]["index"] for event in archived.json()] == [3, 1]
+    assert sorted(opened) == ["2026-01", "2026-02"]
+
+
+def test_case_reads_only_open_segments_that_hold_the_case(
+    client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _bootstrap_and_token(client)
+    _seed_old_events(4)
+    client.post(
+        "/auth/login", json={"email": "admin@northwind.com", "password": "super-secret-123"}
+    )
+    db = get_session_local()()
+    try:
+        archive_cold_audit_events(db, now=NOW, hot_months=3, archive_dir=str(tmp_path / "archive"))
+        org_id = db.query(User).one().org_id
+        indexed = db.query(AuditArchiveCase.case_id).distinct()
+        assert sorted(case_id for (case_id,) in indexed) == [0, 1]
+
+        opened: list[str] = []
+        read_segment = audit_archive.read_archive_segment
+
+        def counting_read(archive: AuditArchive):
+            opened.append(archive.period)
+            return read_segment(archive)
+
+        monkeypatch.setattr(audit_archive, "read_archive_segment", counting_read)
+
+        assert list(iter_archived_events(db, org_id, case_id=7)) == []
+        assert opened == []
+
+        events = list(iter_archived_events(db, org_id, case_id=1))
+        assert [fields["metadata"]["index"] for fields in events] == [1, 3]
+        assert opened == ["2026-01", "2026-02"]
+
+        # Segments archived before the case index existed are read once to build it.
+        db.query(AuditArchiveCase).delete()
+        db.query(AuditArchive).update({AuditArchive.cases_indexed: False})
+        db.commit()
+        opened.clear()
+        assert list(iter_archived_events(db, org_id, case_id=7)) == []
+        assert len(opened) == 2
+
+        assert backfill_audit_archive_cases(get_engine()) == 2
+        db.expire_all()
+        opened.clear()
+        assert list(iter_archived_events(db, org_id, case_id=7)) == []
+        assert opened == []
+    finally:
+        db.close()
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import fcntl
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.audit_service import (
+    BufferedAuditSink,
+    _serialize_event,
+    get_audit_sink,
+    reset_audit_sink,
+    record_audit_event,
+)
+from app.config import reload_settings
+from app.db import get_session_local
+from app.models import AuditEvent, User
+
+
+@pytest.fixture()
+def wal_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "audit-wal.ndjson"
+    monkeypatch.setenv("AUDIT_SINK_MODE", "buffered")
+    monkeypatch.setenv("AUDIT_WAL_PATH", str(path))
+    # Long interval so the test observes events before the background flush.
+    monkeypatch.setenv("AUDIT_FLUSH_INTERVAL_SECONDS", "60")
+    return path
+
+
+@pytest.fixture()
+def buffered_client(wal_path: Path, client: TestClient) -> TestClient:
+    return client
+
+
+def _audit_row_count() -> int:
+    db = get_session_local()()
+    try:
+        return db.query(AuditEvent).count()
+    finally:
+        db.close()
+
+
+def _bootstrap(client: TestClient) -> str:
+    response = client.post(
+        "/auth/bootstrap",
+        json={
+            "organization_name": "Northwind Clinic",
+            "full_name": "Alex Kim",
+            "email": "admin@northwind.com",
+            "password": "super-secret-123",
+        },
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def test_buffered_sink_writes_wal_then_bulk_inserts(
+    buffered_client: TestClient, wal_path: Path
+) -> None:
+    token = _bootstrap(buffered_client)
+    login = buffered_client.post(
+        "/auth/login", json={"email": "admin@northwind.com", "password": "super-secret-123"}
+    )
+    assert login.status_code == 200
+
+    sink = get_audit_sink()
+    assert isinstance(sink, BufferedAuditSink)
+    assert sink.wal_path.parent == wal_path.parent
+    assert _audit_row_count() == 0
+    assert len(sink.wal_path.read_text(encoding="utf-8").splitlines()) == 2
+
+    events = buffered_client.get("/audit-events", headers={"Authorization": f"Bearer {token}"})
+    assert events.status_code == 200
+    assert [event["action"] for event in events.json()] == ["login", "login"]
+    assert _audit_row_count() == 2
+    assert not sink.wal_path.exists()
+
+
+def test_buffered_sink_drops_events_from_rolled_back_transactions(
+    buffered_client: TestClient,
+) -> None:
+    _bootstrap(buffered_client)
+    sink = get_audit_sink()
+    sink.flush()
+
+    db = get_session_local()()
+    try:
+        admin = db.query(User).first()
+        assert admin is not None
+        record_audit_event(
+            db,
+            org_id=admin.org_id,
+            user_id=admin.id,
+            action="case_create",
+            entity_type="case",
+            entity_id="1",
+        )
+        db.rollback()
+        db.commit()
+    finally:
+        db.close()
+
+    assert sink.runtime_status()["buffered"] == 0
+
+
+def test_buffered_sink_replays_wal_without_duplicates(
+    buffered_client: TestClient, wal_path: Path
+) -> None:
+    _bootstrap(buffered_client)
+    get_audit_sink().flush()
+    assert _audit_row_count() == 1
+
+    db = get_session_local()()
+    try:
+        existing = db.query(AuditEvent).one()
+        already_inserted = {
+            "org_id": existing.org_id,
+            "user_id": existing.user_id,
+            "action": existing.action,
+            "entity_type": existing.entity_type,
+            "entity_id": existing.entity_id,
+            "metadata_json": existing.metadata_json,
+            "created_at": existing.created_at.replace(tzinfo=timezone.utc),
+        }
+    finally:
+        db.close()
+
+    lost = dict(already_inserted, action="settings_change", created_at=datetime.now(timezone.utc))
+    wal_path.write_text(
+        _serialize_event(already_inserted) + "\n" + _serialize_event(lost) + "\n{torn",
+        encoding="utf-8",
+    )
+
+    sink = BufferedAuditSink(str(wal_path), flush_interval_seconds=60, batch_size=50)
+    sink.start()
+    sink.stop()
+
+    assert sink.runtime_status()["replayed"] == 1
+    assert _audit_row_count() == 2
+    assert not wal_path.exists()
+
+
+def test_audit_readers_drain_a_backlog_larger_than_one_batch(
+    buffered_client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("AUDIT_BATCH_SIZE", "1")
+    reload_settings()
+    reset_audit_sink()
+    assert get_audit_sink().batch_size == 1
+    token = _bootstrap(buffered_client)
+    for _ in range(3):
+        buffered_client.post(
+            "/auth/login", json={"email": "admin@northwind.com", "password": "super-secret-123"}
+        )
+    assert get_audit_sink().runtime_status()["buffered"] == 4
+
+    events = buffered_client.get("/audit-events", headers={"Authorization": f"Bearer {token}"})
+
+    assert len(events.json()) == 4
+    assert get_audit_sink().runtime_status()["buffered"] == 0
+
+
+def _record_case_create(db, admin: User) -> None:
+    record_audit_event(
+        db,
+        org_id=admin.org_id,
+        user_id=admin.id,
+        action="case_create",
+        entity_type="case",
+        entity_id="1",
+    )
+
+
+def test_buffered_sink_writes_the_wal_before_the_commit_returns(
+    buffered_client: TestClient, wal_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _bootstrap(buffered_client)
+    crashed = get_audit_sink()
+    crashed.drain()
+    # The process dies right after the business commit, before the hand-off to the buffer.
+    monkeypatch.setattr(BufferedAuditSink, "committed", lambda self, token: None)
+
+    db = get_session_local()()
+    try:
+        _record_case_create(db, db.query(User).one())
+        db.commit()
+    finally:
+        db.close()
+
+    assert crashed.runtime_status()["buffered"] == 0
+    assert '"case_create"' in crashed.wal_path.read_text(encoding="utf-8")
+    crashed._release_wal_locked()
+
+    sink = BufferedAuditSink(str(wal_path), flush_interval_seconds=60, batch_size=50)
+    sink.start()
+    sink.stop()
+
+    assert sink.runtime_status()["replayed"] == 1
+    assert _audit_row_count() == 2
+
+
+def test_buffered_sink_removes_events_of_a_failed_commit_from_the_wal(
+    buffered_client: TestClient, wal_path: Path
+) -> None:
+    _bootstrap(buffered_client)
+    get_audit_sink().drain()
+
+    db = get_session_local()()
+    try:
+        admin = db.query(User).one()
+        _record_case_create(db, admin)
+        db.add(
+            User(
+                org_id=admin.org_id,
+                email=admin.email,
+                full_name="Duplicate",
+                role="admin",
+                password_hash=admin.password_hash,
+            )
+        )
+        with pytest.raises(IntegrityError):
+            db.commit()
+        db.rollback()
+    finally:
+        db.close()
+
+    assert not get_audit_sink().wal_path.exists()
+    assert get_audit_sink().runtime_status()["buffered"] == 0
+
+
+def test_buffered_sink_leaves_live_workers_wal_files_alone(
+    buffered_client: TestClient, wal_path: Path
+) -> None:
+    _bootstrap(buffered_client)
+    get_audit_sink().drain()
+    db = get_session_local()()
+    try:
+        admin = db.query(User).one()
+        event = {
+            "org_id": admin.org_id,
+            "user_id": admin.id,
+            "action": "settings_change",
+            "entity_type": "org",
+            "entity_id": str(admin.org_id),
+            "metadata_json": None,
+            "created_at": datetime.now(timezone.utc),
+        }
+    finally:
+        db.close()
+
+    # Another worker's file, locked the way a live sink holds its own.
+    other_wal = wal_path.with_name("audit-wal.4242-0badcafe.ndjson")
+    other_wal.write_text(_serialize_event(event) + "\n", encoding="utf-8")
+    other_owner = other_wal.with_suffix(".ndjson.lock").open("a")
+    fcntl.flock(other_owner.fileno(), fcntl.LOCK_EX)
+
+    sink = BufferedAuditSink(str(wal_path), flush_interval_seconds=60, batch_size=50)
+    sink.start()
+    sink.stop()
+    assert sink.runtime_status()["replayed"] == 0
+    assert other_wal.exists()
+    assert _audit_row_count() == 1
+
+    # Once that worker has exited, the next one to start replays its file.
+    other_owner.close()
+    sink = BufferedAuditSink(str(wal_path), flush_interval_seconds=60, batch_size=50)
+    sink.start()
+    sink.stop()
+    assert sink.runtime_status()["replayed"] == 1
+    assert not other_wal.exists()
+    assert _audit_row_count() == 2
@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.auth_cache import get_auth_user_cache
+from app.config import reload_settings
+from app.db import get_engine, get_session_local
+from app.models import User
 
 
 def test_bootstrap_creates_first_admin(client: TestClient) -> None:
@@ -84,3 +91,83 @@ def test_admin_can_create_clinician_user(client: TestClient) -> None:
         json={"email": "clinician@northwind.com", "password": "clinician-secret-123"},
     )
     assert login.status_code == 200
+
+
+def _count_queries() -> list[str]:
+    statements: list[str] = []
+
+    @event.listens_for(get_engine(), "before_cursor_execute")
+    def _record(_conn, _cursor, statement, _params, _context, _executemany) -> None:  # noqa: ANN001
+        statements.append(statement)
+
+    return statements
+
+
+def test_authenticated_requests_skip_user_lookup_when_cached(client: TestClient) -> None:
+    bootstrap = client.post(
+        "/auth/bootstrap",
+        json={
+            "organization_name": "Northwind Clinic",
+            "full_name": "Alex Kim",
+            "email": "admin@northwind.com",
+            "password": "super-secret-123",
+        },
+    )
+    headers = {"Authorization": f"Bearer {bootstrap.json()['access_token']}"}
+
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    statements = _count_queries()
+    me = client.get("/auth/me", headers=headers)
+    assert me.status_code == 200
+    assert me.json()["email"] == "admin@northwind.com"
+    assert statements == []
+
+    stats = client.get("/auth/cache-status", headers=headers).json()
+    assert stats["enabled"] is True
+    assert stats["hits"] >= 2
+    assert stats["hit_rate"] > 0
+
+
+def test_user_changes_invalidate_cached_identity(client: TestClient) -> None:
+    bootstrap = client.post(
+        "/auth/bootstrap",
+        json={
+            "organization_name": "Northwind Clinic",
+            "full_name": "Alex Kim",
+            "email": "admin@northwind.com",
+            "password": "super-secret-123",
+        },
+    )
+    headers = {"Authorization": f"Bearer {bootstrap.json()['access_token']}"}
+    assert client.get("/auth/me", headers=headers).json()["role"] == "admin"
+
+    db = get_session_local()()
+    try:
+        admin = db.query(User).one()
+        admin.role = "coordinator"
+        db.commit()
+    finally:
+        db.close()
+
+    assert client.get("/auth/me", headers=headers).json()["role"] == "coordinator"
+
+
+def test_user_cache_bypass_switch(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    bootstrap = client.post(
+        "/auth/bootstrap",
+        json={
+            "organization_name": "Northwind Clinic",
+            "full_name": "Alex Kim",
+            "email": "admin@northwind.com",
+            "password": "super-secret-123",
+        },
+    )
+    headers = {"Authorization": f"Bearer {bootstrap.json()['access_token']}"}
+    monkeypatch.setenv("AUTH_USER_CACHE_ENABLED", "0")
+    reload_settings()
+
+    client.get("/auth/me", headers=headers)
+    statements = _count_queries()
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert any("FROM users" in statement for statement in statements)
+    assert get_auth_user_cache().stats()["entries"] == 0
@@ -3,6 +3,8 @@ from __future__ import annotations
 import pytest
 from fastapi.testclient import TestClient
 
+from app.config import reload_settings
+
 
 def _bootstrap_and_token(client: TestClient) -> str:
     response = client.post(
@@ -195,6 +197,7 @@ def test_document_upload_rejects_oversized_files(
     case_id = _create_case(client, token)
     headers = {"Authorization": f"Bearer {token}"}
     monkeypatch.setenv("MAX_UPLOAD_BYTES", "32")
+    reload_settings()
 
     upload = client.post(
         f"/cases/{case_id}/documents/upload",
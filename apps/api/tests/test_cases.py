@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import pytest
 from fastapi.testclient import TestClient
 
+from app.config import reload_settings
+from app.db import get_session_local
+from app.models import Case, User
+from app.patient_verification import resume_patient_verifications
+
 
 def _bootstrap_and_token(client: TestClient) -> str:
     response = client.post(
@@ -84,3 +90,100 @@ def test_case_status_update_writes_audit_event(client: TestClient) -> None:
     actions = [event["action"] for event in events.json()]
     assert "case_create" in actions
     assert "case_status_change" in actions
+
+
+def test_async_patient_verification_resolves_after_response(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    token = _bootstrap_and_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    monkeypatch.setenv("PATIENT_VERIFICATION_MODE", "async")
+    reload_settings()
+
+    created = {}
+    for patient_id in ("pat-001", "pat-missing"):
+        response = client.post(
+            "/cases",
+            headers=headers,
+            json={
+                "patient_id": patient_id,
+                "payer_label": "Aetna Gold",
+                "service_line_template_id": "imaging-mri-lumbar-spine",
+            },
+        )
+        assert response.status_code == 201
+        assert response.json()["patient_verification"] == "pending"
+        created[patient_id] = response.json()["id"]
+
+    verified = client.get(f"/cases/{created['pat-001']}", headers=headers)
+    assert verified.json()["patient_verification"] == "verified"
+    missing = client.get(f"/cases/{created['pat-missing']}", headers=headers)
+    assert missing.json()["patient_verification"] == "not_found"
+
+    events = client.get(
+        "/audit-events", headers=headers, params={"action": "case_patient_verification"}
+    )
+    results = {item["entity_id"]: item["metadata"]["result"] for item in events.json()}
+    assert results == {
+        str(created["pat-001"]): "verified",
+        str(created["pat-missing"]): "not_found",
+    }
+
+
+def test_sync_patient_verification_rejects_unknown_patient(client: TestClient) -> None:
+    token = _bootstrap_and_token(client)
+
+    response = client.post(
+        "/cases",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "patient_id": "pat-missing",
+            "payer_label": "Aetna Gold",
+            "service_line_template_id": "imaging-mri-lumbar-spine",
+        },
+    )
+
+    assert response.status_code == 400
+
+
+def test_unsettled_patient_verifications_are_resumed_on_startup(client: TestClient) -> None:
+    token = _bootstrap_and_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    db = get_session_local()()
+    try:
+        admin = db.query(User).one()
+        # Left behind by a restart before the background task ran, and by a FHIR outage.
+        cases = [
+            Case(
+                org_id=admin.org_id,
+                patient_id=patient_id,
+                payer_label="Aetna Gold",
+                service_line_template_id="imaging-mri-lumbar-spine",
+                status="draft",
+                patient_verification=state,
+                created_by_user_id=admin.id,
+            )
+            for patient_id, state in (
+                ("pat-001", "pending"),
+                ("pat-missing", "pending"),
+                ("pat-001", "unavailable"),
+            )
+        ]
+        db.add_all(cases)
+        db.commit()
+        case_ids = [case.id for case in cases]
+    finally:
+        db.close()
+
+    assert resume_patient_verifications() == 3
+
+    states = [
+        client.get(f"/cases/{case_id}", headers=headers).json()["patient_verification"]
+        for case_id in case_ids
+    ]
+    assert states == ["verified", "not_found", "verified"]
+    assert resume_patient_verifications() == 0
+    events = client.get(
+        "/audit-events", headers=headers, params={"action": "case_patient_verification"}
+    )
+    assert sorted(int(item["entity_id"]) for item in events.json()) == case_ids
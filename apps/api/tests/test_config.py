@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import pytest
+
+from app.config import get_settings, reload_settings
+
+
+def test_get_settings_returns_cached_snapshot(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("JWT_EXP_MINUTES", "15")
+    first = reload_settings()
+    monkeypatch.setenv("JWT_EXP_MINUTES", "30")
+
+    assert get_settings() is first
+    assert get_settings().jwt_exp_minutes == 15
+
+    reloaded = reload_settings()
+    assert reloaded is not first
+    assert reloaded.jwt_exp_minutes == 30
+
+
+def test_settings_snapshot_is_read_only() -> None:
+    settings = reload_settings()
+
+    with pytest.raises(AttributeError):
+        settings.max_upload_bytes = 1
+    assert isinstance(settings.allowed_upload_extensions, frozenset)
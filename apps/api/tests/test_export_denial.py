@@ -1,11 +1,24 @@
 from __future__ import annotations
 
 import base64
+import io
+import json
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
-
-from app.db import get_session_local
-from app.models import User
+from sqlalchemy import update
+
+from app import export_jobs
+from app.audit_archive import archive_cold_audit_events
+from app.config import reload_settings
+from app.db import backfill_audit_case_ids, get_engine, get_session_local, init_db
+from app.export_jobs import shutdown_export_renderer
+from app.export_service import packet_content_hash
+from app.models import AuditEvent, CaseExport, User
+from app.packet_cache import get_packet_fragment_cache
 from app.security import hash_password
 
 
@@ -123,8 +136,12 @@ def test_generate_initial_export_schema(client: TestClient) -> None:
     assert "completeness_score" in payload["metrics_json"]
     assert "instrumentation_events" in payload["metrics_json"]
 
-    pdf_bytes = base64.b64decode(payload["pdf_base64"])
-    assert pdf_bytes.startswith(b"%PDF")
+    assert payload["pdf_base64"] is None
+    pdf = client.get(payload["pdf_url"], headers={"Authorization": f"Bearer {clinician_token}"})
+    assert pdf.status_code == 200
+    assert pdf.headers["content-type"] == "application/pdf"
+    assert pdf.content.startswith(b"%PDF")
+    assert len(pdf.content) == payload["pdf_size_bytes"]
 
     listed = client.get(
         f"/cases/{case_id}/exports",
@@ -141,12 +158,13 @@ def test_generate_initial_export_schema(client: TestClient) -> None:
     detail = client.get(
         f"/cases/{case_id}/exports/{payload['export_id']}",
         headers={"Authorization": f"Bearer {clinician_token}"},
+        params={"include_pdf_base64": "true"},
     )
     assert detail.status_code == 200
     detail_payload = detail.json()
     assert detail_payload["export_id"] == payload["export_id"]
     assert detail_payload["packet_json"] == payload["packet_json"]
-    assert detail_payload["pdf_base64"] == payload["pdf_base64"]
+    assert base64.b64decode(detail_payload["pdf_base64"]) == pdf.content
 
     repeat = client.post(
         f"/cases/{case_id}/exports/generate",
@@ -157,7 +175,112 @@ def test_generate_initial_export_schema(client: TestClient) -> None:
     repeat_payload = repeat.json()
     assert repeat_payload["packet_json"] == payload["packet_json"]
     assert repeat_payload["metrics_json"] == payload["metrics_json"]
-    assert repeat_payload["pdf_base64"] == payload["pdf_base64"]
+    assert repeat_payload["pdf_sha256"] == payload["pdf_sha256"]
+    assert repeat_payload["export_id"] == payload["export_id"]
+    assert repeat_payload["reused"] is True
+
+
+def _attested_case(client: TestClient) -> tuple[dict[str, str], int]:
+    admin_token = _bootstrap_and_token(client)
+    _create_clinician_user()
+    clinician_token = _login(client, "clinician@northwind.com", "clinician-secret-123")
+    case_id = _create_case(client, admin_token)
+    _upload_evidence(client, admin_token, case_id)
+    client.post(f"/cases/{case_id}/autofill", headers={"Authorization": f"Bearer {admin_token}"})
+    _attest_case(client, clinician_token, case_id)
+
+    return {"Authorization": f"Bearer {clinician_token}"}, case_id
+
+
+def _attested_case_with_export(client: TestClient) -> tuple[dict[str, str], dict]:
+    headers, case_id = _attested_case(client)
+    export = client.post(
+        f"/cases/{case_id}/exports/generate", headers=headers, json={"export_type": "initial"}
+    )
+    assert export.status_code == 200
+    return headers, export.json()
+
+
+def test_export_pdf_download_supports_range_and_etag(client: TestClient) -> None:
+    headers, payload = _attested_case_with_export(client)
+
+    full = client.get(payload["pdf_url"], headers=headers)
+    assert full.headers["etag"] == f'"{payload["pdf_sha256"]}"'
+    assert full.headers["accept-ranges"] == "bytes"
+
+    partial = client.get(payload["pdf_url"], headers={**headers, "Range": "bytes=0-7"})
+    assert partial.status_code == 206
+    assert partial.content == full.content[:8]
+    assert partial.headers["content-range"] == f"bytes 0-7/{payload['pdf_size_bytes']}"
+
+    cached = client.get(
+        payload["pdf_url"], headers={**headers, "If-None-Match": full.headers["etag"]}
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_legacy_inline_pdfs_move_to_the_export_store(client: TestClient) -> None:
+    headers, payload = _attested_case_with_export(client)
+    pdf = client.get(payload["pdf_url"], headers=headers).content
+
+    db = get_session_local()()
+    try:
+        record = db.get(CaseExport, payload["export_id"])
+        record.pdf_base64 = base64.b64encode(pdf).decode("utf-8")
+        record.pdf_sha256 = None
+        record.pdf_size_bytes = None
+        db.commit()
+    finally:
+        db.close()
+
+    init_db()
+
+    db = get_session_local()()
+    try:
+        record = db.get(CaseExport, payload["export_id"])
+        assert record.pdf_base64 == ""
+        assert record.pdf_sha256 == payload["pdf_sha256"]
+        assert record.pdf_size_bytes == len(pdf)
+    finally:
+        db.close()
+    assert client.get(payload["pdf_url"], headers=headers).content == pdf
+
+
+def test_restart_leaves_pending_and_failed_exports_without_a_pdf(client: TestClient) -> None:
+    headers, payload = _attested_case_with_export(client)
+
+    db = get_session_local()()
+    try:
+        completed = db.get(CaseExport, payload["export_id"])
+        unrendered = [
+            CaseExport(
+                case_id=completed.case_id,
+                org_id=completed.org_id,
+                export_type="initial",
+                packet_json=completed.packet_json,
+                status=status,
+                error="renderer exploded" if status == "failed" else None,
+            )
+            for status in ("pending", "failed")
+        ]
+        db.add_all(unrendered)
+        db.commit()
+        unrendered_ids = [item.id for item in unrendered]
+    finally:
+        db.close()
+
+    init_db()
+
+    db = get_session_local()()
+    try:
+        for export_id in unrendered_ids:
+            record = db.get(CaseExport, export_id)
+            assert record.pdf_sha256 is None
+            assert record.pdf_size_bytes is None
+        assert db.get(CaseExport, payload["export_id"]).pdf_sha256 == payload["pdf_sha256"]
+    finally:
+        db.close()
 
 
 def test_denial_to_appeal_export_schema(client: TestClient) -> None:
@@ -260,3 +383,299 @@ Please provide:
     assert appeal.status_code == 200
     draft = appeal.json()["packet_json"]["denial"]["appeal_letter_draft"]
     assert updated_rationale in draft
+
+
+def test_async_export_renders_in_a_worker_process(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    headers, case_id = _attested_case(client)
+    monkeypatch.setenv("EXPORT_MODE", "async")
+    reload_settings()
+
+    export = client.post(
+        f"/cases/{case_id}/exports/generate",
+        headers=headers,
+        json={"export_type": "initial"},
+    )
+    assert export.status_code == 202
+    payload = export.json()
+    assert payload["status"] == "pending"
+    assert payload["pdf_sha256"] is None
+    assert "case_header" in payload["packet_json"]
+
+    listed = client.get(f"/cases/{case_id}/exports", headers=headers).json()
+    assert {item["status"] for item in listed} <= {"pending", "completed"}
+
+    status_url = f"/cases/{case_id}/exports/{payload['export_id']}/status"
+    state = client.get(status_url, headers=headers, params={"wait_seconds": 30}).json()
+    assert state["status"] == "completed"
+    assert state["pdf_url"] == payload["pdf_url"]
+
+    pdf = client.get(payload["pdf_url"], headers=headers)
+    assert pdf.status_code == 200
+    assert pdf.content.startswith(b"%PDF")
+
+
+def test_async_export_failure_is_reported(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    headers, case_id = _attested_case(client)
+    monkeypatch.setenv("EXPORT_WORKER_KIND", "thread")
+    reload_settings()
+    shutdown_export_renderer()
+
+    def broken_render(packet: dict, out: str) -> int:
+        raise RuntimeError("renderer exploded")
+
+    monkeypatch.setattr(export_jobs, "render_packet_pdf", broken_render)
+    export = client.post(
+        f"/cases/{case_id}/exports/generate",
+        headers=headers,
+        json={"export_type": "initial", "mode": "async"},
+    )
+    assert export.status_code == 202
+
+    status_url = f"/cases/{case_id}/exports/{export.json()['export_id']}/status"
+    state = client.get(status_url, headers=headers, params={"wait_seconds": 10}).json()
+    assert state["status"] == "failed"
+    assert state["error"] == "renderer exploded"
+    assert state["pdf_url"] is None
+
+    pdf = client.get(export.json()["pdf_url"], headers=headers)
+    assert pdf.status_code == 409
+
+
+def test_unchanged_packet_reuses_the_previous_export(client: TestClient) -> None:
+    headers, first = _attested_case_with_export(client)
+    case_id = first["case_id"]
+    assert first["reused"] is False
+
+    again = client.post(
+        f"/cases/{case_id}/exports/generate", headers=headers, json={"export_type": "initial"}
+    )
+    assert again.json()["export_id"] == first["export_id"]
+    assert again.json()["reused"] is True
+    assert len(client.get(f"/cases/{case_id}/exports", headers=headers).json()) == 1
+
+    reused_events = client.get(
+        "/audit-events", headers=headers, params={"action": "packet_export_reused"}
+    ).json()
+    assert [event["entity_id"] for event in reused_events] == [str(first["export_id"])]
+
+    client.put(
+        f"/cases/{case_id}/questionnaire",
+        headers=headers,
+        json={
+            "answers": {"clinical_rationale": {"value": "Revised rationale.", "state": "verified"}}
+        },
+    )
+    _attest_case(client, headers["Authorization"].removeprefix("Bearer "), case_id)
+    changed = client.post(
+        f"/cases/{case_id}/exports/generate", headers=headers, json={"export_type": "initial"}
+    )
+    assert changed.json()["export_id"] != first["export_id"]
+    assert changed.json()["reused"] is False
+    assert changed.json()["pdf_sha256"] != first["pdf_sha256"]
+
+
+def test_archiving_the_audit_history_keeps_the_packet_reusable(
+    client: TestClient, tmp_path: Path
+) -> None:
+    headers, first = _attested_case_with_export(client)
+
+    db = get_session_local()()
+    try:
+        archives = archive_cold_audit_events(
+            db,
+            now=datetime(2099, 1, 1, tzinfo=timezone.utc),
+            hot_months=1,
+            archive_dir=str(tmp_path / "archive"),
+        )
+    finally:
+        db.close()
+    assert archives
+    # Rebuild every audit fragment from the archived records, not the live rows.
+    get_packet_fragment_cache().clear()
+
+    again = client.post(
+        f"/cases/{first['case_id']}/exports/generate",
+        headers=headers,
+        json={"export_type": "initial"},
+    )
+    assert again.json()["reused"] is True
+    assert again.json()["export_id"] == first["export_id"]
+
+
+def test_reexport_rebuilds_only_the_changed_packet_fragments(client: TestClient) -> None:
+    headers, first = _attested_case_with_export(client)
+    case_id = first["case_id"]
+    cache = get_packet_fragment_cache()
+
+    client.put(
+        f"/cases/{case_id}/questionnaire",
+        headers=headers,
+        json={"answers": {"symptom_duration_weeks": {"value": "14", "state": "verified"}}},
+    )
+    _attest_case(client, headers["Authorization"].removeprefix("Bearer "), case_id)
+    before = cache.stats()
+    changed = client.post(
+        f"/cases/{case_id}/exports/generate", headers=headers, json={"export_type": "initial"}
+    ).json()
+    after = cache.stats()
+
+    # The questionnaire and the two audit entries for the edit and the attestation.
+    assert after["misses"] - before["misses"] == 3
+    assert after["hits"] > before["hits"]
+    packet = changed["packet_json"]
+    assert {"field_id": "symptom_duration_weeks", "value": "14"}.items() <= next(
+        item for item in packet["questionnaire"] if item["field_id"] == "symptom_duration_weeks"
+    ).items()
+    assert [item["document_id"] for item in packet["evidence_documents"]] == [
+        item["document_id"] for item in first["packet_json"]["evidence_documents"]
+    ]
+
+    db = get_session_local()()
+    try:
+        stored = db.get(CaseExport, changed["export_id"])
+        assert stored.packet_sha256 == packet_content_hash(packet, "initial")
+    finally:
+        db.close()
+
+    # Rebuilt from scratch, the packet hashes the same and the export is reused.
+    cache.clear()
+    again = client.post(
+        f"/cases/{case_id}/exports/generate", headers=headers, json={"export_type": "initial"}
+    ).json()
+    assert again["reused"] is True
+    assert again["export_id"] == changed["export_id"]
+
+
+def test_export_list_pages_through_a_column_projection(client: TestClient) -> None:
+    headers, rendered = _attested_case_with_export(client)
+    case_id = rendered["case_id"]
+    assert rendered["pdf_page_count"] >= 1
+
+    db = get_session_local()()
+    try:
+        export = db.get(CaseExport, rendered["export_id"])
+        for _ in range(4):
+            db.add(
+                CaseExport(
+                    case_id=case_id,
+                    org_id=export.org_id,
+                    export_type="initial",
+                    packet_json={"padding": "x" * 100_000},
+                    metrics_json={"completeness_score": 50.0},
+                    pdf_base64="",
+                    created_at=export.created_at,
+                )
+            )
+        db.commit()
+    finally:
+        db.close()
+
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get(f"/cases/{case_id}/exports", headers=headers, params=params)
+        assert page.status_code == 200
+        pages.append(page.json())
+        cursor = page.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert [len(items) for items in pages] == [2, 2, 1]
+    listed = [item for items in pages for item in items]
+    # Same created_at for every row, so the id breaks the tie across page boundaries.
+    assert [item["export_id"] for item in listed] == sorted(
+        (item["export_id"] for item in listed), reverse=True
+    )
+    assert "packet_json" not in listed[-1]
+    assert listed[-1]["export_id"] == rendered["export_id"]
+    assert listed[-1]["pdf_size_bytes"] == rendered["pdf_size_bytes"]
+    assert listed[-1]["pdf_page_count"] == rendered["pdf_page_count"]
+    assert listed[-1]["pdf_url"] == rendered["pdf_url"]
+    assert listed[0]["pdf_page_count"] is None
+
+    invalid = client.get(f"/cases/{case_id}/exports", headers=headers, params={"cursor": "%%"})
+    assert invalid.status_code == 400
+
+
+def test_audit_events_carry_case_id_for_the_packet_summary(client: TestClient) -> None:
+    headers, payload = _attested_case_with_export(client)
+    case_id = payload["case_id"]
+    other_case_id = _create_case(client, headers["Authorization"].removeprefix("Bearer "))
+
+    db = get_session_local()()
+    try:
+        by_action = {(event.action, event.case_id) for event in db.query(AuditEvent).all()}
+        assert ("document_upload", case_id) in by_action
+        assert ("packet_export", case_id) in by_action
+        assert ("case_create", other_case_id) in by_action
+        assert ("login", None) in by_action
+
+        # Rows written before the column existed are backfilled from entity/metadata.
+        expected = {event.id: event.case_id for event in db.query(AuditEvent).all()}
+        db.execute(update(AuditEvent).values(case_id=None))
+        db.commit()
+        backfill_audit_case_ids(get_engine())
+        db.expire_all()
+        assert {event.id: event.case_id for event in db.query(AuditEvent).all()} == expected
+    finally:
+        db.close()
+
+    summary = payload["packet_json"]["audit_log_summary"]
+    assert summary
+    assert {item["action"] for item in summary} >= {"case_create", "document_upload"}
+    assert all(item["entity_id"] != str(other_case_id) for item in summary)
+
+
+def test_batch_export_streams_a_zip_with_a_failure_manifest(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("EXPORT_WORKER_KIND", "thread")
+    reload_settings()
+    shutdown_export_renderer()
+    headers, exported = _attested_case_with_export(client)
+    token = headers["Authorization"].removeprefix("Bearer ")
+    fresh_case_id = _create_case(client, token)
+    _upload_evidence(client, token, fresh_case_id)
+    client.post(f"/cases/{fresh_case_id}/autofill", headers=headers)
+    _attest_case(client, token, fresh_case_id)
+    unattested_case_id = _create_case(client, token)
+
+    response = client.post(
+        "/cases/exports/batch",
+        headers=headers,
+        json={"case_ids": [exported["case_id"], fresh_case_id, unattested_case_id, 9999]},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    manifest = json.loads(archive.read("manifest.json"))
+    by_case = {entry["case_id"]: entry for entry in manifest["exports"]}
+    assert set(by_case) == {exported["case_id"], fresh_case_id}
+    assert by_case[exported["case_id"]]["export_id"] == exported["export_id"]
+    assert by_case[exported["case_id"]]["reused"] is True
+    assert by_case[fresh_case_id]["reused"] is False
+    for entry in by_case.values():
+        assert archive.read(entry["pdf"]).startswith(b"%PDF")
+        assert "case_header" in json.loads(archive.read(entry["packet"]))
+    assert {failure["case_id"] for failure in manifest["failures"]} == {unattested_case_id, 9999}
+
+    fresh_export = client.get(f"/cases/{fresh_case_id}/exports", headers=headers).json()
+    assert [item["status"] for item in fresh_export] == ["completed"]
+
+    filtered = client.post("/cases/exports/batch", headers=headers, json={"filter": {}})
+    manifest = json.loads(zipfile.ZipFile(io.BytesIO(filtered.content)).read("manifest.json"))
+    assert [entry["case_id"] for entry in manifest["exports"]] == [
+        exported["case_id"],
+        fresh_case_id,
+    ]
+    assert all(entry["reused"] for entry in manifest["exports"])
+    assert manifest["failures"] == []
+
+    ambiguous = client.post("/cases/exports/batch", headers=headers, json={})
+    assert ambiguous.status_code == 400
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.denial_service import build_appeal_letter
+from app.export_service import (
+    _TEXT_WIDTH,
+    _text_width,
+    _wrap_line,
+    build_packet_pdf_bytes,
+    render_packet_pdf,
+)
+
+
+def _packet(citations: int, rationale: str = "Persistent deficits.") -> dict:
+    return {
+        "case_header": {"case_id": 7, "patient_id": "pat-001", "export_type": "initial"},
+        "questionnaire": [{"field_id": "diagnosis", "value": "Radiculopathy", "state": "verified"}],
+        "clinical_rationale_draft": rationale,
+        "citation_map": [
+            {
+                "field_id": "diagnosis",
+                "value": "Radiculopathy",
+                "citations": [
+                    {"doc_id": index, "page": 1, "excerpt": f"Excerpt number {index}"}
+                    for index in range(citations)
+                ],
+            }
+        ],
+    }
+
+
+def test_wrap_line_fits_page_width_and_keeps_every_word() -> None:
+    line = "  • " + " ".join(f"word{index}" for index in range(400))
+
+    wrapped = list(_wrap_line(line))
+
+    assert len(wrapped) > 1
+    assert all(_text_width(item) <= _TEXT_WIDTH for item in wrapped)
+    assert all(item.startswith("  ") for item in wrapped)
+    assert " ".join(item.strip() for item in wrapped).split() == line.split()
+
+
+def test_wrap_line_breaks_tokens_wider_than_a_line() -> None:
+    token = "x" * 500
+
+    wrapped = list(_wrap_line(token))
+
+    assert all(_text_width(item) <= _TEXT_WIDTH for item in wrapped)
+    assert "".join(item.strip() for item in wrapped) == token
+
+
+def test_render_packet_pdf_streams_long_packets_to_a_file(tmp_path: Path) -> None:
+    rationale = " ".join(["necessity"] * 600) + " FINALWORD"
+    destination = tmp_path / "packet.pdf"
+
+    pages = render_packet_pdf(_packet(citations=500, rationale=rationale), str(destination))
+
+    content = destination.read_bytes()
+    assert content.startswith(b"%PDF")
+    assert pages > 10
+    assert content.count(b"/Type /Page\n") == pages
+    # Uncompressed page streams: the tail of the long rationale is wrapped, not truncated.
+    assert b"FINALWORD" in content
+    assert b"Excerpt number 499" in content
+
+
+def test_render_packet_pdf_keeps_appeal_letter_line_breaks() -> None:
+    letter = build_appeal_letter(
+        case_id=7,
+        payer_label="Aetna Gold",
+        reasons=["Insufficient imaging history", "Conservative therapy not documented"],
+        missing_items=["Physical therapy notes"],
+        clinical_rationale="Persistent deficits.",
+        citations=[{"doc_id": 3, "page": 2, "excerpt": "Weakness noted on exam"}],
+    )
+    packet = {**_packet(citations=0), "denial": {"appeal_letter_draft": letter}}
+
+    content = build_packet_pdf_bytes(packet)
+
+    # One text line per physical line: the salutation stands alone, followed by a blank line,
+    # and every bullet starts its own line rather than being reflowed into a paragraph.
+    assert b"(Dear Prior Authorization Reviewer,) Tj T*  T* (We respectfully" in content
+    assert b"(Denial reasons noted:) Tj T* (- Insufficient imaging history) Tj T*" in content
+    assert b"(- Conservative therapy not documented) Tj T*" in content
+    assert b"(- Doc #3, page 2: Weakness noted on exam) Tj T*" in content
+    # No raw newline reaches a ``Tj`` string.
+    assert b"\n" not in content.split(b"(Appeal Letter Draft)")[1].split(b" ET")[0]
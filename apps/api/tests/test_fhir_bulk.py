@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import fhir_bulk
+from app.db import get_session_local
+from app.fhir_bulk import run_bulk_import
+from app.models import FhirBulkImport, FhirResource, StagedFhirResource
+
+BASE_URL = "http://ehr.test/fhir"
+
+EXPORT_FILES = {
+    "Patient": [
+        {"resourceType": "Patient", "id": "bulk-001", "name": [{"text": "Robin Hale"}]},
+        {"resourceType": "Patient", "id": "bulk-002", "name": [{"text": "Sam Ortiz"}]},
+    ],
+    "Coverage": [
+        {
+            "resourceType": "Coverage",
+            "id": "cov-9",
+            "beneficiary": {"reference": "Patient/bulk-001"},
+        }
+    ],
+    "Observation": [
+        {
+            "resourceType": "Observation",
+            "id": f"obs-{index}",
+            "subject": {"reference": f"Patient/bulk-00{index % 2 + 1}"},
+        }
+        for index in range(4)
+    ],
+}
+
+
+class _BulkServer:
+    def __init__(self, pending_polls: int = 1) -> None:
+        self.pending_polls = pending_polls
+        self.requests: list[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append(path)
+        if path == "/fhir/Patient/$export":
+            assert request.headers["Prefer"] == "respond-async"
+            return httpx.Response(202, headers={"Content-Location": f"{BASE_URL}/bulk-status/1"})
+        if path == "/fhir/bulk-status/1":
+            if self.pending_polls:
+                self.pending_polls -= 1
+                return httpx.Response(202, headers={"Retry-After": "3", "X-Progress": "50%"})
+            return httpx.Response(
+                200,
+                json={
+                    "transactionTime": "2026-10-19T02:00:00Z",
+                    "output": [
+                        {"type": name, "url": f"{BASE_URL}/bulk-files/{name}.ndjson"}
+                        for name in EXPORT_FILES
+                    ],
+                },
+            )
+        name = path.rsplit("/", 1)[-1].removesuffix(".ndjson")
+        body = "\n".join(json.dumps(item) for item in EXPORT_FILES[name]) + "\n"
+        return httpx.Response(200, content=body.encode("utf-8"))
+
+
+def _import(server: _BulkServer):
+    sleeps: list[float] = []
+    db = get_session_local()()
+    try:
+        run = run_bulk_import(
+            db,
+            base_url=BASE_URL,
+            http_client=httpx.Client(transport=httpx.MockTransport(server)),
+            sleep=sleeps.append,
+        )
+        return run, sleeps
+    finally:
+        db.close()
+
+
+def _headers(client: TestClient) -> dict[str, str]:
+    response = client.post(
+        "/auth/bootstrap",
+        json={
+            "organization_name": "Northwind Clinic",
+            "full_name": "Alex Kim",
+            "email": "admin@northwind.com",
+            "password": "super-secret-123",
+        },
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_bulk_import_polls_and_ingests_ndjson(client: TestClient) -> None:
+    run, sleeps = _import(_BulkServer(pending_polls=2))
+
+    assert run.status == "completed"
+    assert sleeps == [3.0, 3.0]
+    assert run.resource_counts_json == {"Patient": 2, "Coverage": 1, "Observation": 4}
+
+    db = get_session_local()()
+    try:
+        coverage = db.query(FhirResource).filter(FhirResource.resource_type == "Coverage").one()
+        assert coverage.patient_id == "bulk-001"
+    finally:
+        db.close()
+
+
+def test_bulk_import_replaces_rows_missing_from_the_next_export(client: TestClient) -> None:
+    _import(_BulkServer())
+    removed = EXPORT_FILES["Observation"].pop()
+    try:
+        run, _ = _import(_BulkServer())
+    finally:
+        EXPORT_FILES["Observation"].append(removed)
+
+    assert run.status == "completed"
+    db = get_session_local()()
+    try:
+        assert (
+            db.query(FhirResource).filter(FhirResource.resource_type == "Observation").count() == 3
+        )
+    finally:
+        db.close()
+
+
+def test_bulk_import_replaces_rows_loaded_before_imports_were_tracked(
+    client: TestClient,
+) -> None:
+    db = get_session_local()()
+    try:
+        db.add(
+            FhirResource(
+                resource_type="Observation",
+                resource_id="obs-legacy",
+                patient_id="bulk-001",
+                resource_json={"resourceType": "Observation", "id": "obs-legacy"},
+                import_id=None,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    run, _ = _import(_BulkServer())
+
+    assert run.status == "completed"
+    db = get_session_local()()
+    try:
+        assert db.query(FhirResource).filter(FhirResource.resource_id == "obs-legacy").count() == 0
+    finally:
+        db.close()
+
+
+def test_failed_import_leaves_no_staged_batch_visible(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _import(_BulkServer())
+    original = EXPORT_FILES["Patient"]
+    EXPORT_FILES["Patient"] = [{**patient, "name": [{"text": "Renamed"}]} for patient in original]
+    monkeypatch.setattr(fhir_bulk, "_STAGE_BATCH_SIZE", 2)
+    stage_batch = fhir_bulk._stage_batch
+    calls = []
+
+    def fail_second_batch(db, import_id, batch):
+        calls.append(sorted(batch))
+        if len(calls) == 2:
+            raise httpx.ReadError("connection reset")
+        stage_batch(db, import_id, batch)
+
+    monkeypatch.setattr(fhir_bulk, "_stage_batch", fail_second_batch)
+    try:
+        run, _ = _import(_BulkServer())
+    finally:
+        EXPORT_FILES["Patient"] = original
+
+    assert run.status == "failed"
+    assert calls[0] == [("Patient", "bulk-001"), ("Patient", "bulk-002")]
+    db = get_session_local()()
+    try:
+        names = [
+            row.resource_json["name"][0]["text"]
+            for row in db.query(FhirResource)
+            .filter(FhirResource.resource_type == "Patient")
+            .order_by(FhirResource.resource_id)
+        ]
+        assert names == ["Robin Hale", "Sam Ortiz"]
+        assert db.query(StagedFhirResource).count() == 0
+    finally:
+        db.close()
+
+
+def test_bulk_import_records_unexpected_errors_before_raising(client: TestClient) -> None:
+    server = _BulkServer(pending_polls=0)
+
+    def malformed_manifest(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/fhir/bulk-status/1":
+            return httpx.Response(200, json={"output": [{"type": "Patient"}]})
+        return server(request)
+
+    db = get_session_local()()
+    try:
+        with pytest.raises(KeyError):
+            run_bulk_import(
+                db,
+                base_url=BASE_URL,
+                http_client=httpx.Client(transport=httpx.MockTransport(malformed_manifest)),
+            )
+    finally:
+        db.close()
+
+    db = get_session_local()()
+    try:
+        run = db.query(FhirBulkImport).one()
+        assert run.status == "failed"
+        assert run.error == "KeyError: 'url'"
+        assert run.completed_at is not None
+    finally:
+        db.close()
+
+
+def test_patient_reads_use_the_local_store_after_import(client: TestClient) -> None:
+    headers = _headers(client)
+    _import(_BulkServer())
+
+    patients = client.get("/fhir/patients", headers=headers)
+    assert [item["id"] for item in patients.json()] == ["bulk-001", "bulk-002"]
+
+    snapshot = client.get("/fhir/patients/bulk-001/snapshot", headers=headers)
+    assert snapshot.status_code == 200
+    assert [item["id"] for item in snapshot.json()["coverage"]] == ["cov-9"]
+    assert [item["id"] for item in snapshot.json()["observations"]] == ["obs-0", "obs-2"]
+
+    # The live FHIR server knows nothing about bulk-002; creating a case must not ask it.
+    case = client.post(
+        "/cases",
+        headers=headers,
+        json={
+            "patient_id": "bulk-002",
+            "payer_label": "Aetna Gold",
+            "service_line_template_id": "imaging-mri-lumbar-spine",
+        },
+    )
+    assert case.status_code == 201
+
+    status = client.get("/fhir/local-store", headers=headers).json()
+    assert status["serving"] is True
+    assert status["resource_counts"]["Observation"] == 4
+
+
+def test_failed_export_is_recorded_and_not_served(client: TestClient) -> None:
+    headers = _headers(client)
+
+    def failing(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500, json={"resourceType": "OperationOutcome"})
+
+    db = get_session_local()()
+    try:
+        run = run_bulk_import(
+            db, base_url=BASE_URL, http_client=httpx.Client(transport=httpx.MockTransport(failing))
+        )
+    finally:
+        db.close()
+
+    assert run.status == "failed"
+    status = client.get("/fhir/local-store", headers=headers).json()
+    assert status["serving"] is False
+    assert status["latest_import"]["status"] == "failed"
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.fhir_cache import (
+    DatabaseFhirResponseCache,
+    InProcessFhirResponseCache,
+    cache_key,
+)
+from app.fhir_client import FhirClient
+
+BASE_URL = "http://fhir.test/fhir"
+
+
+class _EtagServer:
+    """Serves Patient reads with an ETag and answers matching If-None-Match with 304."""
+
+    def __init__(self) -> None:
+        self.version = 1
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        etag = f'W/"{self.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        body = {"resourceType": "Patient", "id": "pat-001", "meta": {"versionId": self.version}}
+        return httpx.Response(
+            200,
+            content=json.dumps(body),
+            headers={"Content-Type": "application/fhir+json", "ETag": etag},
+        )
+
+
+def _client(server: _EtagServer, cache) -> FhirClient:
+    return FhirClient(
+        base_url=BASE_URL,
+        http_client=httpx.Client(transport=httpx.MockTransport(server)),
+        response_cache=cache,
+    )
+
+
+def test_cache_key_sorts_query_parameters() -> None:
+    assert cache_key(f"{BASE_URL}/Observation", {"patient": "p1", "_count": "50"}) == cache_key(
+        f"{BASE_URL}/Observation", {"_count": "50", "patient": "p1"}
+    )
+
+
+def test_fresh_entries_skip_the_network_and_stale_ones_revalidate(
+    monkeypatch: pytest.MonkeyPatch, client: TestClient
+) -> None:
+    server = _EtagServer()
+    cache = InProcessFhirResponseCache(max_entries=8, max_bytes=1024 * 1024)
+    fhir = _client(server, cache)
+
+    assert fhir.get_patient("pat-001")["meta"]["versionId"] == 1
+    assert fhir.get_patient("pat-001")["meta"]["versionId"] == 1
+    assert len(server.requests) == 1
+
+    monkeypatch.setattr("app.fhir_cache.time.time", lambda: 10**12)
+    assert fhir.get_patient("pat-001")["meta"]["versionId"] == 1
+    assert server.requests[-1].headers["If-None-Match"] == 'W/"1"'
+
+    server.version = 2
+    monkeypatch.setattr("app.fhir_cache.time.time", lambda: 2 * 10**12)
+    assert fhir.get_patient("pat-001")["meta"]["versionId"] == 2
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["revalidated"], stats["misses"]) == (1, 1, 2)
+
+
+def test_in_process_cache_evicts_least_recently_used() -> None:
+    server = _EtagServer()
+    cache = InProcessFhirResponseCache(max_entries=2, max_bytes=1024 * 1024)
+    fhir = _client(server, cache)
+
+    for patient_id in ("a", "b", "a", "c"):
+        fhir.get_patient(patient_id)
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+    fhir.get_patient("a")
+    assert len(server.requests) == 3
+
+
+def test_database_cache_is_shared_between_clients(client: TestClient) -> None:
+    server = _EtagServer()
+    cache = DatabaseFhirResponseCache(max_entries=1, eviction_interval=1)
+
+    _client(server, cache).get_patient("pat-001")
+    other_worker = _client(server, DatabaseFhirResponseCache(max_entries=1, eviction_interval=1))
+    assert other_worker.get_patient("pat-001")["id"] == "pat-001"
+    assert len(server.requests) == 1
+
+    other_worker.get_patient("pat-002")
+    assert cache.stats()["entries"] == 1
+
+
+def test_database_cache_counts_rows_only_every_eviction_interval(client: TestClient) -> None:
+    server = _EtagServer()
+    cache = DatabaseFhirResponseCache(max_entries=1, eviction_interval=3)
+    fhir = _client(server, cache)
+
+    fhir.get_patient("a")
+    fhir.get_patient("b")
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 0
+
+    fhir.get_patient("c")
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["evictions"] == 2
+
+
+def test_cache_stats_endpoint(client: TestClient) -> None:
+    bootstrap = client.post(
+        "/auth/bootstrap",
+        json={
+            "organization_name": "Northwind Clinic",
+            "full_name": "Alex Kim",
+            "email": "admin@northwind.com",
+            "password": "super-secret-123",
+        },
+    )
+    headers = {"Authorization": f"Bearer {bootstrap.json()['access_token']}"}
+    assert client.get("/fhir/patients", headers=headers).status_code == 200
+    assert client.get("/fhir/patients", headers=headers).status_code == 200
+
+    stats = client.get("/fhir/cache-stats", headers=headers).json()
+    assert stats["mode"] == "memory"
+    assert (stats["hits"], stats["misses"]) == (1, 1)
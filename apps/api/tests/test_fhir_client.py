@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import fhir_client
+from app.fhir_cache import InProcessFhirResponseCache
+from app.fhir_client import (
+    AsyncFhirClient,
+    FhirCircuitBreaker,
+    FhirCircuitOpenError,
+    FhirClient,
+    FhirClientError,
+    connection_stats,
+    get_fhir_circuit_breaker,
+    reset_fhir_snapshot_modes,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_snapshot_modes() -> Iterator[None]:
+    # Unsupported snapshot modes are remembered per base URL for the whole process.
+    reset_fhir_snapshot_modes()
+    yield
+    reset_fhir_snapshot_modes()
+
+
+def _mock_fhir(failing: set[str], delay_seconds: float = 0.0) -> httpx.AsyncClient:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        resource_type = request.url.path.strip("/").split("/")[0]
+        if delay_seconds and resource_type in failing:
+            await asyncio.sleep(delay_seconds)
+        elif resource_type in failing:
+            return httpx.Response(500, text="boom")
+        if resource_type == "Patient":
+            return httpx.Response(200, json={"resourceType": "Patient", "id": "pat-001"})
+        resource = {"resourceType": resource_type, "id": f"{resource_type}-1"}
+        return httpx.Response(
+            200, json={"resourceType": "Bundle", "entry": [{"resource": resource}]}
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_snapshot_reuses_one_pooled_connection(client: TestClient, fhir_base_url: str) -> None:
+    before = connection_stats.snapshot()
+
+    snapshot = FhirClient(base_url=fhir_base_url).get_patient_snapshot("pat-001")
+
+    after = connection_stats.snapshot()
+    assert snapshot["patient"]["id"] == "pat-001"
+    assert after["requests"] - before["requests"] == 7
+    assert after["new_connections"] - before["new_connections"] == 1
+
+
+def test_connection_stats_endpoint(client: TestClient) -> None:
+    bootstrap = client.post(
+        "/auth/bootstrap",
+        json={
+            "organization_name": "Northwind Clinic",
+            "full_name": "Alex Kim",
+            "email": "admin@northwind.com",
+            "password": "super-secret-123",
+        },
+    )
+    headers = {"Authorization": f"Bearer {bootstrap.json()['access_token']}"}
+    assert client.get("/fhir/patients", headers=headers).status_code == 200
+
+    stats = client.get("/fhir/connection-stats", headers=headers)
+    assert stats.status_code == 200
+    assert stats.json()["requests"] >= 1
+    assert set(stats.json()) == {
+        "requests",
+        "new_connections",
+        "reused_connections",
+        "reuse_ratio",
+    }
+
+
+def test_async_snapshot_matches_sync_client(client: TestClient, fhir_base_url: str) -> None:
+    async def fetch() -> dict:
+        async with httpx.AsyncClient() as http_client:
+            return await AsyncFhirClient(
+                base_url=fhir_base_url, http_client=http_client
+            ).get_patient_snapshot("pat-001")
+
+    before = connection_stats.snapshot()["requests"]
+    snapshot = asyncio.run(fetch())
+    # The mock server implements $everything, so the snapshot is a single request.
+    assert connection_stats.snapshot()["requests"] - before == 1
+    expected = FhirClient(base_url=fhir_base_url).get_patient_snapshot("pat-001")
+
+    assert snapshot.pop("partial") is False
+    assert snapshot.pop("failed_resources") == {}
+    assert snapshot == expected
+
+
+def test_async_snapshot_flags_failed_and_timed_out_resources() -> None:
+    async def fetch() -> dict:
+        async with (
+            _mock_fhir({"Observation"}) as failing,
+            _mock_fhir({"Condition"}, delay_seconds=5) as slow,
+        ):
+            errored = await AsyncFhirClient(
+                base_url="http://fhir-errors.test",
+                http_client=failing,
+                snapshot_strategy="fanout",
+            ).get_patient_snapshot("pat-001")
+            timed_out = await AsyncFhirClient(
+                base_url="http://fhir-slow.test",
+                timeout_seconds=0.2,
+                http_client=slow,
+                snapshot_strategy="fanout",
+            ).get_patient_snapshot("pat-001")
+        return {"errored": errored, "timed_out": timed_out}
+
+    results = asyncio.run(fetch())
+
+    errored = results["errored"]
+    assert errored["partial"] is True
+    assert errored["observations"] == []
+    assert "status=500" in errored["failed_resources"]["observations"]
+    assert set(errored["failed_resources"]) == {"observations"}
+    assert errored["coverage"][0]["resourceType"] == "Coverage"
+
+    timed_out = results["timed_out"]
+    assert set(timed_out["failed_resources"]) == {"conditions"}
+    assert timed_out["medicationRequests"][0]["resourceType"] == "MedicationRequest"
+
+
+class _PagedObservations:
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.pages_served = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.pages_served += 1
+        offset = int(request.url.params.get("_offset", "0"))
+        count = int(request.url.params["_count"])
+        entries = [
+            {"resource": {"resourceType": "Observation", "id": f"obs-{index}"}}
+            for index in range(offset, min(offset + count, self.total))
+        ]
+        links = []
+        if offset + count < self.total:
+            links.append(
+                {
+                    "relation": "next",
+                    "url": f"http://fhir-paged.test/Observation?_count={count}"
+                    f"&_offset={offset + count}&patient=pat-001",
+                }
+            )
+        return httpx.Response(200, json={"resourceType": "Bundle", "link": links, "entry": entries})
+
+
+def test_iter_resources_follows_next_links_lazily(client: TestClient) -> None:
+    server = _PagedObservations(total=7)
+    fhir = FhirClient(
+        base_url="http://fhir-paged.test",
+        http_client=httpx.Client(transport=httpx.MockTransport(server)),
+    )
+
+    stream = fhir.iter_resources("Observation", {"patient": "pat-001"}, page_size=3)
+    assert next(stream)["id"] == "obs-0"
+    assert server.pages_served == 1
+
+    assert [item["id"] for item in stream] == [f"obs-{index}" for index in range(1, 7)]
+    assert server.pages_served == 3
+
+
+def test_iter_resources_stops_at_the_cap(client: TestClient) -> None:
+    server = _PagedObservations(total=500)
+    fhir = FhirClient(
+        base_url="http://fhir-capped.test",
+        http_client=httpx.Client(transport=httpx.MockTransport(server)),
+    )
+
+    resources = list(fhir.iter_resources("Observation", page_size=20, max_resources=45))
+
+    assert len(resources) == 45
+    assert server.pages_served == 3
+
+
+def test_snapshot_falls_back_to_fan_out_when_everything_is_unsupported() -> None:
+    requests: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if request.url.path.endswith("$everything"):
+            return httpx.Response(501, json={"resourceType": "OperationOutcome"})
+        if request.url.path == "/Patient/pat-001":
+            return httpx.Response(200, json={"resourceType": "Patient", "id": "pat-001"})
+        return httpx.Response(200, json={"resourceType": "Bundle", "entry": []})
+
+    async def fetch() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            fhir = AsyncFhirClient(
+                base_url="http://fhir-no-everything.test", http_client=http_client
+            )
+            await fhir.get_patient_snapshot("pat-001")
+            await fhir.get_patient_snapshot("pat-002")
+
+    asyncio.run(fetch())
+
+    # $everything is probed once per server, then snapshots go straight to the fan-out.
+    assert sum(path.endswith("$everything") for path in requests) == 1
+    assert len(requests) == 1 + 7 * 2
+
+
+@pytest.mark.parametrize("failure", ["timeout", "server_error"])
+def test_snapshot_does_not_retry_an_everything_outage_through_the_fan_out(failure: str) -> None:
+    requests: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if failure == "timeout":
+            raise httpx.ReadTimeout("FHIR is slow", request=request)
+        return httpx.Response(503, text="unavailable")
+
+    async def fetch() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            await AsyncFhirClient(
+                base_url=f"http://fhir-everything-{failure}.test",
+                http_client=http_client,
+                circuit_breaker=FhirCircuitBreaker(failure_threshold=5, reset_seconds=60),
+            ).get_patient_snapshot("pat-001")
+
+    with pytest.raises(FhirClientError):
+        asyncio.run(fetch())
+
+    assert requests == ["/Patient/pat-001/$everything"]
+
+
+def _everything_snapshots(
+    base_url: str, everything_response: httpx.Response, patient_ids: list[str]
+) -> list[str]:
+    requests: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if request.url.path == "/Patient/pat-bad/$everything":
+            return everything_response
+        if request.url.path.endswith("$everything"):
+            patient = {"resourceType": "Patient", "id": request.url.path.split("/")[2]}
+            return httpx.Response(
+                200, json={"resourceType": "Bundle", "entry": [{"resource": patient}]}
+            )
+        if request.url.path.startswith("/Patient/"):
+            return httpx.Response(200, json={"resourceType": "Patient", "id": "pat-bad"})
+        return httpx.Response(200, json={"resourceType": "Bundle", "entry": []})
+
+    async def fetch() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            fhir = AsyncFhirClient(base_url=base_url, http_client=http_client)
+            for patient_id in patient_ids:
+                await fhir.get_patient_snapshot(patient_id)
+
+    asyncio.run(fetch())
+    return [path for path in requests if path.endswith("$everything")]
+
+
+def test_snapshot_keeps_using_everything_after_a_per_patient_bad_request() -> None:
+    invalid = httpx.Response(
+        400,
+        json={"resourceType": "OperationOutcome", "issue": [{"code": "invalid"}]},
+    )
+
+    probes = _everything_snapshots(
+        "http://fhir-invalid.test", invalid, ["pat-bad", "pat-001", "pat-002"]
+    )
+
+    assert probes == [
+        "/Patient/pat-bad/$everything",
+        "/Patient/pat-001/$everything",
+        "/Patient/pat-002/$everything",
+    ]
+
+
+def test_snapshot_skips_a_not_supported_everything_until_the_ttl_expires(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    not_supported = httpx.Response(
+        400,
+        json={"resourceType": "OperationOutcome", "issue": [{"code": "not-supported"}]},
+    )
+
+    probes = _everything_snapshots(
+        "http://fhir-not-supported.test", not_supported, ["pat-bad", "pat-001"]
+    )
+    assert probes == ["/Patient/pat-bad/$everything"]
+
+    monkeypatch.setattr(fhir_client, "_UNSUPPORTED_SNAPSHOT_MODE_TTL_SECONDS", 0.0)
+    probes = _everything_snapshots(
+        "http://fhir-not-supported-yet.test", not_supported, ["pat-bad", "pat-001"]
+    )
+    assert probes == [
+        "/Patient/pat-bad/$everything",
+        "/Patient/pat-001/$everything",
+    ]
+
+
+def test_revinclude_snapshot_partitions_one_bundle() -> None:
+    seen: list[httpx.Request] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        resources = [
+            {"resourceType": "Patient", "id": "pat-001"},
+            {"resourceType": "Coverage", "id": "cov-1"},
+            {"resourceType": "Observation", "id": "obs-1"},
+            {"resourceType": "Observation", "id": "obs-2"},
+            {"resourceType": "DocumentReference", "id": "doc-1"},
+        ]
+        return httpx.Response(
+            200,
+            json={"resourceType": "Bundle", "entry": [{"resource": item} for item in resources]},
+        )
+
+    async def fetch() -> dict:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            return await AsyncFhirClient(
+                base_url="http://fhir-revinclude.test",
+                http_client=http_client,
+                snapshot_strategy="revinclude",
+            ).get_patient_snapshot("pat-001")
+
+    snapshot = asyncio.run(fetch())
+
+    assert len(seen) == 1
+    assert seen[0].url.params.get_list("_revinclude")[:2] == [
+        "Coverage:beneficiary",
+        "Condition:patient",
+    ]
+    assert snapshot["patient"]["id"] == "pat-001"
+    assert [item["id"] for item in snapshot["observations"]] == ["obs-1", "obs-2"]
+    assert snapshot["conditions"] == []
+    assert snapshot["partial"] is False
+
+
+def test_circuit_breaker_opens_probes_and_closes() -> None:
+    now = [0.0]
+    breaker = FhirCircuitBreaker(failure_threshold=2, reset_seconds=30, clock=lambda: now[0])
+
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(FhirCircuitOpenError):
+        breaker.before_call()
+    assert breaker.snapshot()["state"] == "open"
+
+    now[0] = 31
+    breaker.before_call()
+    # Only one half-open probe at a time.
+    with pytest.raises(FhirCircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.snapshot()["state"] == "open"
+
+    now[0] = 62
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.snapshot() == {"state": "closed", "consecutive_failures": 0, "rejected_calls": 2}
+
+
+def test_open_circuit_fails_fast_and_serves_stale_cache(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: list[str] = []
+    outage = [False]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if outage[0]:
+            raise httpx.ConnectTimeout("FHIR is down", request=request)
+        return httpx.Response(200, json={"resourceType": "Patient", "id": "pat-001"})
+
+    breaker = FhirCircuitBreaker(failure_threshold=2, reset_seconds=60)
+    fhir = FhirClient(
+        base_url="http://fhir-outage.test",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        response_cache=InProcessFhirResponseCache(max_entries=8, max_bytes=1024 * 1024),
+        circuit_breaker=breaker,
+    )
+    fhir.get_patient("pat-001")
+    monkeypatch.setattr("app.fhir_cache.time.time", lambda: 10**12)
+
+    outage[0] = True
+    for _ in range(2):
+        with pytest.raises(FhirClientError):
+            fhir.get_patient("pat-002")
+    calls_when_opened = len(calls)
+
+    with pytest.raises(FhirCircuitOpenError):
+        fhir.get_patient("pat-002")
+    assert fhir.get_patient("pat-001")["id"] == "pat-001"
+    assert len(calls) == calls_when_opened
+
+
+def test_healthz_reports_fhir_circuit_state(client: TestClient) -> None:
+    breaker = get_fhir_circuit_breaker()
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    response = client.get("/healthz")
+
+    assert response.json()["fhir_circuit"]["state"] == "open"
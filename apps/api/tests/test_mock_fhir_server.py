@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.fhir_client import AsyncFhirClient, FhirClient
+from scripts.mock_fhir_server import (
+    FaultInjection,
+    build_server,
+    build_store,
+    serve_in_background,
+)
+
+
+@pytest.fixture()
+def synthetic_fhir() -> Iterator[str]:
+    server = build_server(store=build_store(patients=120, resources_per_patient=30))
+    thread = serve_in_background(server)
+    host, port = server.server_address
+    try:
+        yield f"http://{host}:{port}/fhir"
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+def test_synthetic_patients_page_through_next_links(
+    client: TestClient, synthetic_fhir: str
+) -> None:
+    fhir = FhirClient(base_url=synthetic_fhir)
+
+    patients = list(fhir.iter_patients(page_size=25, max_resources=0))
+
+    assert len(patients) == 122
+    assert len({patient["id"] for patient in patients}) == 122
+
+
+def test_everything_returns_the_indexed_compartment(
+    client: TestClient, synthetic_fhir: str
+) -> None:
+    async def fetch() -> dict:
+        async with httpx.AsyncClient() as http_client:
+            return await AsyncFhirClient(
+                base_url=synthetic_fhir, http_client=http_client
+            ).get_patient_snapshot("syn-000042")
+
+    snapshot = asyncio.run(fetch())
+
+    assert snapshot["patient"]["id"] == "syn-000042"
+    assert len(snapshot["coverage"]) == 1
+    related = sum(
+        len(snapshot[key])
+        for key in ("conditions", "observations", "medicationRequests", "serviceRequests")
+    )
+    assert related == 28
+
+
+def test_responses_carry_etags(synthetic_fhir: str) -> None:
+    first = httpx.get(f"{synthetic_fhir}/Patient/syn-000001")
+    assert first.status_code == 200
+
+    again = httpx.get(
+        f"{synthetic_fhir}/Patient/syn-000001", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert again.status_code == 304
+
+
+def test_injected_errors() -> None:
+    server = build_server(faults=FaultInjection(error_rate=1.0, error_status=503))
+    thread = serve_in_background(server)
+    host, port = server.server_address
+    try:
+        response = httpx.get(f"http://{host}:{port}/fhir/Patient/pat-001")
+        assert response.status_code == 503
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from app.config import reload_settings
+from app.security import (
+    PasswordHashingBusy,
+    _PasswordExecutor,
+    hash_password,
+    verify_password_async,
+)
+
+
+def test_hash_password_uses_configured_cost(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("BCRYPT_ROUNDS", "5")
+    reload_settings()
+
+    password_hash = hash_password("super-secret-123")
+
+    assert password_hash.startswith("$2b$05$")
+    assert asyncio.run(verify_password_async("super-secret-123", password_hash)) is True
+
+
+def test_password_executor_rejects_work_beyond_queue_limit() -> None:
+    executor = _PasswordExecutor(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario() -> None:
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(PasswordHashingBusy):
+            await executor.run(lambda: "rejected")
+
+        release.set()
+        assert await running is True
+        assert await queued == "queued"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_cancelled_caller_keeps_its_slot_until_the_hash_finishes() -> None:
+    executor = _PasswordExecutor(workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario() -> None:
+        abandoned = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0)
+        abandoned.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await abandoned
+
+        # bcrypt is still running in the pool, so there is no room for more work.
+        with pytest.raises(PasswordHashingBusy):
+            await executor.run(lambda: "rejected")
+
+        release.set()
+        for _ in range(100):
+            try:
+                assert await executor.run(lambda: "accepted") == "accepted"
+                return
+            except PasswordHashingBusy:
+                await asyncio.sleep(0.01)
+        pytest.fail("slot was never released")
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
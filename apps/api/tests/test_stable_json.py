@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import enum
+import hashlib
+import json
+
+import pytest
+
+from app.export_service import canonical_json_bytes, packet_content_hash, stable_json
+
+
+class _Priority(enum.IntEnum):
+    HIGH = 1
+
+
+def _round_trip(data: dict) -> dict:
+    return json.loads(json.dumps(data, sort_keys=True, ensure_ascii=True))
+
+
+SAMPLES = [
+    {"b": 1, "a": [3, {"z": None, "y": True}], "c": "ünïcødé ✓"},
+    {"nested": {"10": 1, "2": 2}, "tuple": (1, "two", 3.5), "empty": {}, "list": []},
+    {"ints": {10: "ten", 2: "two"}, "floats": {1.5: "x"}, "flags": {True: 1}},
+    {"enum": _Priority.HIGH, "big": 2**70, "neg": -0.0, "float": 1e-300},
+]
+
+
+@pytest.mark.parametrize("data", SAMPLES)
+def test_stable_json_matches_a_json_round_trip(data: dict) -> None:
+    result = stable_json(data)
+
+    assert result == _round_trip(data)
+    assert json.dumps(result) == json.dumps(_round_trip(data))
+
+
+def test_stable_json_returns_an_independent_copy() -> None:
+    data = {"items": [{"value": 1}]}
+
+    result = stable_json(data)
+    result["items"][0]["value"] = 2
+
+    assert data["items"][0]["value"] == 1
+
+
+def test_stable_json_rejects_values_json_cannot_encode() -> None:
+    with pytest.raises(TypeError):
+        stable_json({"when": object()})
+
+
+def test_packet_hash_uses_the_canonical_bytes() -> None:
+    packet = stable_json(SAMPLES[0])
+
+    expected = json.dumps(
+        {"export_type": "initial", "packet": packet},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=True,
+    ).encode("ascii")
+
+    assert canonical_json_bytes({"packet": packet, "export_type": "initial"}) == expected
+    assert packet_content_hash(packet, "initial") == hashlib.sha256(expected).hexdigest()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+API_ROOT = Path(__file__).resolve().parents[1]
+# CI uploads this directory, so the ``-X importtime`` report is kept with each run.
+ARTIFACT_DIR = API_ROOT / "test-artifacts"
+# Imported on first use only: PDF rendering, PDF text extraction and MedGemma inference.
+LAZY_PACKAGES = frozenset({"reportlab", "pypdf", "transformers", "torch"})
+# Wall-clock budget for ``import app.main`` under -X importtime (which inflates it). It
+# depends on the machine, so it is only enforced where STARTUP_IMPORT_BUDGET_US is set.
+STARTUP_IMPORT_BUDGET_US = os.getenv("STARTUP_IMPORT_BUDGET_US")
+
+
+def _import_app_main() -> tuple[str, dict[str, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=API_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, total, module = line.removeprefix("import time:").split("|")
+        cumulative[module.strip()] = int(total)
+    return result.stderr, cumulative
+
+
+def _write_report(report: str) -> Path:
+    ARTIFACT_DIR.mkdir(exist_ok=True)
+    path = ARTIFACT_DIR / "importtime-app-main.txt"
+    path.write_text(report)
+    return path
+
+
+def test_startup_leaves_heavy_dependencies_unimported() -> None:
+    report, cumulative = _import_app_main()
+    _write_report(report)
+
+    eager = sorted(module for module in cumulative if module.split(".")[0] in LAZY_PACKAGES)
+    assert eager == []
+
+
+@pytest.mark.skipif(
+    STARTUP_IMPORT_BUDGET_US is None, reason="set STARTUP_IMPORT_BUDGET_US to enforce"
+)
+def test_startup_import_time_stays_within_budget() -> None:
+    # Best of three keeps a noisy neighbour from failing the budget.
+    report, cumulative = min(
+        (_import_app_main() for _ in range(3)), key=lambda run: run[1]["app.main"]
+    )
+    report_path = _write_report(report)
+
+    assert cumulative["app.main"] <= int(
+        STARTUP_IMPORT_BUDGET_US
+    ), f"import app.main took {cumulative['app.main'] / 1000:.0f}ms; see {report_path}"
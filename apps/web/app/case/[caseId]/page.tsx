@@ -20,7 +20,7 @@ import {
 } from "@/components/citation-drawer";
 import { AuthGuard } from "@/components/auth-guard";
 import { WorkspaceFrame } from "@/components/workspace-frame";
-import { apiRequest } from "@/lib/api";
+import { apiDownload, apiRequest } from "@/lib/api";
 import { getSessionUser } from "@/lib/session";
 
 type CaseStatus = "draft" | "in_review" | "submitted" | "denied";
@@ -123,21 +123,39 @@ type DenialAnalysis = {
   appeal_letter_draft: string;
 };
 
+type PacketExportStatus = "pending" | "completed" | "failed";
+
 type PacketExportRecord = {
   export_id: number;
   case_id: number;
   export_type: "initial" | "appeal";
+  status: PacketExportStatus;
   metrics_json: Record<string, unknown>;
+  pdf_url: string;
+  pdf_size_bytes: number | null;
+  pdf_page_count: number | null;
   created_at: string;
 };
 
+type PacketExportState = {
+  export_id: number;
+  status: PacketExportStatus;
+  error: string | null;
+};
+
 type PacketExportDetail = {
   export_id: number;
   case_id: number;
   export_type: "initial" | "appeal";
   packet_json: Record<string, unknown>;
   metrics_json: Record<string, unknown>;
-  pdf_base64: string;
+  status: PacketExportStatus;
+  error: string | null;
+  reused: boolean;
+  pdf_url: string;
+  pdf_sha256: string | null;
+  pdf_size_bytes: number | null;
+  pdf_page_count: number | null;
   created_at: string;
 };
 
@@ -583,22 +601,10 @@ function CaseWorkspaceScreen() {
   }
 
   function downloadText(filename: string, content: string, mimeType: string) {
-    const blob = new Blob([content], { type: mimeType });
-    const url = URL.createObjectURL(blob);
-    const anchor = document.createElement("a");
-    anchor.href = url;
-    anchor.download = filename;
-    anchor.click();
-    URL.revokeObjectURL(url);
+    downloadBlob(filename, new Blob([content], { type: mimeType }));
   }
 
-  function downloadBase64(filename: string, base64Content: string, mimeType: string) {
-    const binary = window.atob(base64Content);
-    const bytes = new Uint8Array(binary.length);
-    for (let index = 0; index < binary.length; index += 1) {
-      bytes[index] = binary.charCodeAt(index);
-    }
-    const blob = new Blob([bytes], { type: mimeType });
+  function downloadBlob(filename: string, blob: Blob) {
     const url = URL.createObjectURL(blob);
     const anchor = document.createElement("a");
     anchor.href = url;
@@ -614,11 +620,27 @@ function CaseWorkspaceScreen() {
     setError(null);
 
     try {
-      const payload = await apiRequest<PacketExportDetail>(`/cases/${caseRecord.id}/exports/generate`, {
+      let payload = await apiRequest<PacketExportDetail>(`/cases/${caseRecord.id}/exports/generate`, {
         method: "POST",
         auth: true,
         body: { export_type: exportType },
       });
+      // Background exports come back pending; long-poll until the worker has rendered the PDF.
+      while (payload.status === "pending") {
+        const state = await apiRequest<PacketExportState>(
+          `/cases/${caseRecord.id}/exports/${payload.export_id}/status?wait_seconds=20`,
+          { auth: true },
+        );
+        if (state.status === "failed") {
+          throw new Error(state.error ?? "Export rendering failed");
+        }
+        if (state.status === "completed") {
+          payload = await apiRequest<PacketExportDetail>(
+            `/cases/${caseRecord.id}/exports/${payload.export_id}`,
+            { auth: true },
+          );
+        }
+      }
 
       setExportDownloads((current) => ({ ...current, [payload.export_id]: payload }));
       setExports((current) => [
@@ -626,12 +648,22 @@ function CaseWorkspaceScreen() {
           export_id: payload.export_id,
           case_id: payload.case_id,
           export_type: payload.export_type,
+          status: payload.status,
           metrics_json: payload.metrics_json,
+          pdf_url: payload.pdf_url,
+          pdf_size_bytes: payload.pdf_size_bytes,
+          pdf_page_count: payload.pdf_page_count,
           created_at: payload.created_at,
         },
         ...current.filter((item) => item.export_id !== payload.export_id),
       ]);
-      setToast(exportType === "appeal" ? "Appeal packet generated" : "Packet generated");
+      setToast(
+        payload.reused
+          ? `Packet unchanged; reusing export #${payload.export_id}`
+          : exportType === "appeal"
+            ? "Appeal packet generated"
+            : "Packet generated",
+      );
       setTimeout(() => setToast(null), 2400);
       await refreshExports();
     } catch (exportError) {
@@ -1422,17 +1454,19 @@ function CaseWorkspaceScreen() {
                       <p className="text-xs text-[var(--pp-color-muted)]">
                         {new Date(item.created_at).toLocaleString()} · Completeness:{" "}
                         {String(item.metrics_json?.completeness_score ?? "N/A")}
+                        {item.pdf_page_count ? ` · ${item.pdf_page_count} pages` : ""}
+                        {item.pdf_size_bytes ? ` · ${Math.max(1, Math.round(item.pdf_size_bytes / 1024))} KB` : ""}
+                        {item.status === "completed" ? "" : ` · ${item.status === "pending" ? "Rendering…" : "Render failed"}`}
                       </p>
                       <div className="flex flex-wrap gap-2">
                         <Button
                           variant="ghost"
                           onClick={() =>
-                            void fetchExportDetail(item.export_id)
-                              .then((detail) =>
-                                downloadBase64(
+                            void apiDownload(item.pdf_url, { auth: true })
+                              .then((blob) =>
+                                downloadBlob(
                                   `case-${item.case_id}-${item.export_type}-${item.export_id}.pdf`,
-                                  detail.pdf_base64,
-                                  "application/pdf",
+                                  blob,
                                 ),
                               )
                               .catch((downloadError) =>
@@ -10,6 +10,16 @@ type RequestOptions = {
 };
 
 export async function apiRequest<T>(path: string, options: RequestOptions = {}): Promise<T> {
+  const response = await apiFetch(path, options);
+  return (await response.json()) as T;
+}
+
+export async function apiDownload(path: string, options: RequestOptions = {}): Promise<Blob> {
+  const response = await apiFetch(path, options);
+  return await response.blob();
+}
+
+async function apiFetch(path: string, options: RequestOptions): Promise<Response> {
   const { method = "GET", body, auth = false, headers: customHeaders = {} } = options;
   const isFormData = typeof FormData !== "undefined" && body instanceof FormData;
   const headers: Record<string, string> = {
@@ -47,5 +57,5 @@ export async function apiRequest<T>(path: string, options: RequestOptions = {}):
     throw new Error(message);
   }
 
-  return (await response.json()) as T;
+  return response;
 }
@@ -194,7 +194,8 @@ if [[ "$(echo "$appeal_export" | jq -r '.packet_json | type')" != "object" ]]; t
   echo "$appeal_export"
   exit 1
 fi
-if [[ -z "$(echo "$initial_export" | jq -r '.pdf_base64 // empty')" ]]; then
+initial_pdf_url="$(echo "$initial_export" | jq -r '.pdf_url // empty')"
+if [[ -z "$initial_pdf_url" ]]; then
   echo "Initial export PDF payload missing."
   echo "$initial_export"
   exit 1
@@ -207,15 +208,9 @@ echo "$initial_export" | jq '.packet_json' >"$case_dir/packet.json"
 echo "$initial_export" | jq '.metrics_json' >"$case_dir/metrics.json"
 echo "$appeal_export" | jq '.packet_json' >"$case_dir/appeal.packet.json"
 
-python3 - "$case_dir/packet.pdf" "$(echo "$initial_export" | jq -r '.pdf_base64')" <<'PY'
-import base64
-import sys
-
-path = sys.argv[1]
-payload = sys.argv[2]
-with open(path, "wb") as handle:
-    handle.write(base64.b64decode(payload))
-PY
+curl -fsS "$API_URL$initial_pdf_url" \
+  -H "Authorization: Bearer $clinician_token" \
+  -o "$case_dir/packet.pdf"
 
 echo "Demo complete."
 echo "Case: $case_id"